@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Grammar analysis time as a function of the number of productions
+
+Run with `python -m benchmarks.ebnf_analysis`.
+"""
+
+import time
+
+from ebnf_compiler.analysis import analyze
+from ebnf_compiler.parser import Parser
+from ebnf_compiler.scanner import Scanner
+
+SIZES = [100, 1000, 5000, 20000]
+
+
+def name(i: int) -> str:
+    res = "p"
+    while True:
+        res += chr(ord("a") + i % 26)
+        i //= 26
+        if i == 0:
+            return res
+
+
+def make_grammar(size: int) -> str:
+    """A chain of productions, each with options, repetitions and groups, that
+    refer to the next ones and back to the first one."""
+    lines = []
+    for i in range(size):
+        a, b = name((i + 1) % size), name((i + 2) % size)
+        lines.append(
+            f'{name(i)} = "k{i % 97}" [ {a} ] {{ "," {b} }}'
+            f' | ( "x" | "y" ) "t{i % 61}".'
+        )
+    return "\n".join(lines)
+
+
+def main():
+    from loguru import logger
+
+    logger.remove()
+    print(f"{'productions':>12} {'rules':>8} {'analysis [ms]':>14} {'conflicts':>10}")
+    for size in SIZES:
+        scanner = Scanner()
+        scanner.open_text(make_grammar(size))
+        syntax = Parser(scanner=scanner, fast_ast=True).parse()
+        start = time.perf_counter()
+        result = analyze(syntax)
+        conflicts = sum(1 for _ in result.conflicts())
+        result.left_recursion()
+        elapsed = time.perf_counter() - start
+        rules = len(result.grammar.rules)
+        print(f"{size:>12} {rules:>8} {elapsed * 1000:>14.1f} {conflicts:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Generated LL(1) parser versus the hand-written `ebnf_compiler.Parser`
+
+Run with `python -m benchmarks.ebnf_generated_parser`. Both parsers read the
+same grammars. The hand-written parser scans on demand and builds a tree; the
+generated parser is given the whole token stream (`Scanner.tokenize`) and only
+recognizes it, so the scan is timed separately.
+"""
+
+import time
+import types
+
+from benchmarks.ebnf_analysis import make_grammar
+from ebnf_compiler.generator import generate
+from ebnf_compiler.parser import Parser
+from ebnf_compiler.scanner import Scanner
+from ebnf_compiler.tokens import Token
+
+SIZES = [100, 1000, 10000]
+REPEAT = 3
+
+EBNF = """
+syntax = { production }.
+production = identifier "=" expression ".".
+expression = term { "|" term }.
+term = factor { factor }.
+factor = identifier | literal | "(" expression ")" | "[" expression "]"
+    | "{" expression "}".
+"""
+
+
+def best(f) -> float:
+    res = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        f()
+        res = min(res, time.perf_counter() - start)
+    return res
+
+
+def hand_written(src: str, fast_ast: bool) -> None:
+    scanner = Scanner()
+    scanner.open_text(src)
+    Parser(scanner=scanner, fast_ast=fast_ast).parse()
+
+
+def tokenize(src: str):
+    scanner = Scanner()
+    scanner.open_text(src)
+    return scanner.tokenize()
+
+
+def main():
+    from loguru import logger
+
+    logger.remove()
+    scanner = Scanner()
+    scanner.open_text(EBNF)
+    generated = types.ModuleType("generated")
+    code = generate(Parser(scanner=scanner, fast_ast=True).parse())
+    exec(compile(code, "generated", "exec"), generated.__dict__)
+    classes = {Token.IDENT: "identifier", Token.LITERAL: "literal"}
+
+    print(
+        f"{'productions':>12} {'tokens':>8} {'ast0 [ms]':>10} {'fast [ms]':>10}"
+        f" {'scan [ms]':>10} {'keys [ms]':>10} {'parse [ms]':>11}"
+    )
+    for size in SIZES:
+        src = make_grammar(size)
+        ast0 = best(lambda src=src: hand_written(src, False))
+        fast = best(lambda src=src: hand_written(src, True))
+        scan = best(lambda src=src: tokenize(src))
+        tokens = tokenize(src)
+        keys = best(lambda tokens=tokens: tokens.keys(classes))
+        ids = [generated.TERMINAL_IDS[k] for k in tokens.keys(classes)]
+        parse = best(lambda ids=ids: generated.parse(ids))
+        print(
+            f"{size:>12} {len(tokens):>8} {ast0 * 1000:>10.1f} {fast * 1000:>10.1f}"
+            f" {scan * 1000:>10.1f} {keys * 1000:>10.1f} {parse * 1000:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Packrat interpreter time and memory as a function of the input size
+
+Run with `python -m benchmarks.ebnf_interpreter`. The input is a stream of
+statements that share a prefix, so every statement is backtracked over. In
+streaming mode, the peak memory should not depend on the input size.
+"""
+
+import time
+import tracemalloc
+from collections.abc import Iterator
+
+from ebnf_compiler.interpreter import Interpreter
+from ebnf_compiler.parser import Parser
+from ebnf_compiler.scanner import Scanner
+
+SIZES = [1000, 10000, 30000]  # Statements
+
+GRAMMAR = """
+program = { statement }.
+statement = designator ":=" expression ";" | designator "(" [ expression ] ")" ";".
+designator = ident { "." ident }.
+expression = term { ( "+" | "-" ) term }.
+term = number | designator | "(" expression ")".
+"""
+
+STATEMENTS = [
+    "ident . ident := ident + number ;".split(),
+    "ident ( ( number - ident . ident ) ) ;".split(),
+]
+
+
+def statements(size: int) -> Iterator[str]:
+    for i in range(size):
+        yield from STATEMENTS[i % 2]
+
+
+def run(interpreter: Interpreter, size: int, streaming: bool) -> tuple[float, int]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    tokens = statements(size) if streaming else list(statements(size))
+    interpreter.parse(tokens, streaming=streaming)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    from loguru import logger
+
+    logger.remove()
+    scanner = Scanner()
+    scanner.open_text(GRAMMAR)
+    interpreter = Interpreter(Parser(scanner=scanner, fast_ast=True).parse())
+    print(
+        f"{'statements':>10} {'tokens':>8} {'mode':>10} {'time [ms]':>10}"
+        f" {'peak [kB]':>10} {'memo':>8} {'window':>8}"
+    )
+    for size in SIZES:
+        tokens = sum(len(s) for s in STATEMENTS) * size // 2
+        for streaming in (False, True):
+            elapsed, peak = run(interpreter, size, streaming)
+            mode = "streaming" if streaming else "full"
+            print(
+                f"{size:>10} {tokens:>8} {mode:>10} {elapsed * 1000:>10.1f}"
+                f" {peak / 1024:>10.1f} {interpreter.memo_peak:>8}"
+                f" {interpreter.window_peak:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+EBNF scanner throughput as a function of the line length
+
+Run with `python -m benchmarks.ebnf_scanner`. The total amount of source text
+is the same for every line length, so a scanner that is linear in the size of
+its input shows a flat throughput.
+"""
+
+import time
+
+from ebnf_compiler.scanner import Scanner
+from ebnf_compiler.tokens import Token
+
+TOTAL_SIZE = 1 << 18
+LINE_LENGTHS = [64, 512, 4096, 32768, 262144]
+
+
+def make_source(line_length: int) -> str:
+    lines = []
+    size = 0
+    n = 0
+    while size < TOTAL_SIZE:
+        parts = [f"p{n} ="]
+        length = len(parts[0])
+        i = 0
+        while length < line_length:
+            part = f' a{i} "t{i}" | ( b{i} ) [ c ] {{ d }}'
+            parts.append(part)
+            length += len(part)
+            i += 1
+        line = "".join(parts) + " ."
+        lines.append(line)
+        size += len(line) + 1
+        n += 1
+    return "\n".join(lines)
+
+
+def scan(src: str) -> int:
+    scanner = Scanner()
+    scanner.open_text(src)
+    count = 0
+    scanner.get_next_symbol()
+    while scanner.sym != Token.EOF:
+        count += 1
+        scanner.get_next_symbol()
+    return count
+
+
+def main():
+    from loguru import logger
+
+    logger.remove()
+    print(f"{'line length':>12} {'tokens':>10} {'time [s]':>10} {'MB/s':>8}")
+    for line_length in LINE_LENGTHS:
+        src = make_source(line_length)
+        start = time.perf_counter()
+        count = scan(src)
+        elapsed = time.perf_counter() - start
+        rate = len(src) / elapsed / 1e6
+        print(f"{line_length:>12} {count:>10} {elapsed:>10.3f} {rate:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Oberon-0 code generation: compile latency, size of the code with and without
+the optimizer, and integers written per second with the output buffered in
+WebAssembly memory versus one host call per `WriteInt` and `WriteChar`
+
+Run with `python -m benchmarks.oberon0_code_gen`.
+"""
+
+import io
+import time
+
+from wasmtime import Engine, Module
+
+from oberon0_compiler.code_gen import CodeGenerator
+from oberon0_compiler.parser import Parser
+from oberon0_compiler.scanner import Scanner
+from oberon0_runtime.context import run
+from oberon0_runtime.input import ListSource
+from oberon0_runtime.output import OutputWriter
+
+SIZES = [1000, 10000, 100000]
+REPEAT = 20
+
+PROGRAM = """
+MODULE Bench;
+  CONST Debug = FALSE; Width = 6; PerLine = 10; Comma = 44;
+  VAR n: INTEGER;
+
+  PROCEDURE Trace(i: INTEGER);
+  BEGIN WriteInt(i, 0); WriteChar(Comma); WriteInt(n - i, 0); WriteLn
+  END Trace;
+
+  PROCEDURE Count*;
+    VAR i: INTEGER;
+  BEGIN
+    ReadInt(n); i := 0;
+    WHILE i < n DO
+      IF Debug & (i MOD 1000 = 0) THEN Trace(i) END;
+      WriteInt(i, Width + 0); WriteChar(Comma);
+      IF i MOD PerLine = PerLine - 1 THEN WriteLn END;
+      i := i + 1
+    END
+  END Count;
+END Bench.
+"""
+
+
+def compile(buffered_output: bool, optimize: bool = True) -> bytes:
+    scanner = Scanner()
+    scanner.open(io.StringIO(PROGRAM))
+    tree = Parser(scanner=scanner).parse()
+    return CodeGenerator(buffered_output, optimize).generate(tree)
+
+
+def measure(engine: Engine, module: Module, size: int) -> float:
+    output = OutputWriter(io.BytesIO(), line_buffered=False)
+    start = time.perf_counter()
+    run(engine, module, "Count", ListSource([size]), output)
+    return size / (time.perf_counter() - start)
+
+
+def main():
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        code = compile(True)
+    latency = (time.perf_counter() - start) / REPEAT
+    print(f"scan, parse and generate: {latency * 1e3:.2f} ms, {len(code)} bytes")
+    unoptimized = compile(True, optimize=False)
+    print(f"without the optimizer: {len(unoptimized)} bytes")
+
+    engine = Engine()
+    modules = {
+        "direct": Module(engine, compile(False)),
+        "buffered": Module(engine, code),
+        "unoptimized": Module(engine, unoptimized),
+    }
+    print(f"{'integers':>9}", *(f"{f'{n} [int/s]':>22}" for n in modules))
+    for size in SIZES:
+        rates = (measure(engine, m, size) for m in modules.values())
+        print(f"{size:>9}", *(f"{r:>22.0f}" for r in rates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Oberon-0 bodies lowered through the SSA intermediate representation (the
+default) versus straight from the tree, both with the scalar variables in
+locals
+
+For the programs of `oberon0_locals` and one with common subexpressions: the
+compile time, the size of the code, and for each command the best wall time
+and the fuel. Run with `python -m benchmarks.oberon0_ir`.
+"""
+
+import io
+import time
+
+from benchmarks.oberon0_locals import COMMANDS, measure
+from benchmarks.oberon0_locals import PROGRAM as LOOPS
+from oberon0_compiler import ast
+from oberon0_compiler.code_gen import CodeGenerator
+from oberon0_compiler.parser import Parser
+from oberon0_compiler.scanner import Scanner
+from oberon0_runtime.cache import EngineOptions
+
+REPEAT = 20
+
+PROGRAM = LOOPS.replace(
+    "END Loops.",
+    """
+  PROCEDURE Grid*;
+    VAR i, j, s: INTEGER; g: ARRAY 100 OF INTEGER;
+  BEGIN
+    ReadInt(n); s := 0; i := 0;
+    WHILE i < n DO
+      j := 0;
+      WHILE j < 100 DO
+        g[j] := g[j] + (i * 7 + j) MOD 13;
+        s := s + g[j] + (i * 7 + j) MOD 13;
+        j := j + 1
+      END;
+      i := i + 1
+    END;
+    WriteInt(s, 0)
+  END Grid;
+END Loops.""",
+)
+COMMANDS = {**COMMANDS, "Grid": 1000}
+
+
+class TreeGenerator(CodeGenerator):
+    """Generates the bodies from the tree, without the intermediate
+    representation."""
+
+    def body(self, node: ast.StatementSequence) -> None:
+        self.statement_sequence(node)
+
+
+def compile(generator: type[CodeGenerator]) -> tuple[bytes, float]:
+    """The code and the best compile time [s]."""
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        scanner = Scanner()
+        scanner.open(io.StringIO(PROGRAM))
+        code = generator().generate(Parser(scanner=scanner).parse())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return code, best
+
+
+def main():
+    options = EngineOptions()
+    tree, tree_time = compile(TreeGenerator)
+    ir, ir_time = compile(CodeGenerator)
+    print(f"compile: {tree_time * 1e3:.2f} ms from the tree, {ir_time * 1e3:.2f} ms")
+    print(f"code: {len(tree)} bytes from the tree, {len(ir)} bytes")
+    print(
+        f"{'command':<8} {'tree [ms]':>10} {'IR [ms]':>10} {'speedup':>8}"
+        f" {'tree fuel':>12} {'IR fuel':>12}"
+    )
+    for command, input in COMMANDS.items():
+        time_tree, fuel_tree = measure(options, tree, command, input)
+        time_ir, fuel_ir = measure(options, ir, command, input)
+        print(
+            f"{command:<8} {time_tree * 1e3:>10.2f} {time_ir * 1e3:>10.2f}"
+            f" {time_tree / time_ir:>7.2f}x {fuel_tree:>12} {fuel_ir:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Oberon-0 loops with the scalar variables of procedures in WebAssembly locals
+(the default) versus all of them in the frame in memory (`--no-optimize`)
+
+For each program: the best wall time of `REPEAT` runs, and the fuel, that is
+about the number of WebAssembly instructions executed. Run with
+`python -m benchmarks.oberon0_locals`.
+"""
+
+import io
+import time
+
+from wasmtime import Module
+
+from oberon0_compiler.code_gen import CodeGenerator
+from oberon0_compiler.parser import Parser
+from oberon0_compiler.scanner import Scanner
+from oberon0_runtime.cache import EngineOptions
+from oberon0_runtime.context import run
+from oberon0_runtime.input import ListSource
+from oberon0_runtime.limits import RunLimits
+from oberon0_runtime.output import OutputWriter
+
+REPEAT = 5
+
+PROGRAM = """
+MODULE Loops;
+  VAR n: INTEGER; sieve: ARRAY 10000 OF BOOLEAN;
+
+  PROCEDURE Nested*;
+    VAR i, j, s: INTEGER;
+  BEGIN
+    ReadInt(n); s := 0; i := 0;
+    WHILE i < n DO
+      j := 0;
+      WHILE j < n DO s := s + i * j MOD 7; j := j + 1 END;
+      i := i + 1
+    END;
+    WriteInt(s, 0)
+  END Nested;
+
+  PROCEDURE Steps(x: INTEGER; VAR steps: INTEGER);
+  BEGIN
+    steps := 0;
+    WHILE x # 1 DO
+      IF ODD(x) THEN x := 3 * x + 1 ELSE x := x DIV 2 END;
+      steps := steps + 1
+    END
+  END Steps;
+
+  PROCEDURE Collatz*;
+    VAR i, steps, max: INTEGER;
+  BEGIN
+    ReadInt(n); max := 0; i := 1;
+    WHILE i <= n DO
+      Steps(i, steps);
+      IF steps > max THEN max := steps END;
+      i := i + 1
+    END;
+    WriteInt(max, 0)
+  END Collatz;
+
+  PROCEDURE Sieve*;
+    VAR i, j, count: INTEGER;
+  BEGIN
+    ReadInt(n); count := 0; i := 2;
+    WHILE i < n DO
+      IF ~sieve[i] THEN
+        count := count + 1; j := i + i;
+        WHILE j < n DO sieve[j] := TRUE; j := j + i END
+      END;
+      i := i + 1
+    END;
+    WriteInt(count, 0)
+  END Sieve;
+END Loops.
+"""
+
+# Command: its input
+COMMANDS = {"Nested": 1000, "Collatz": 30000, "Sieve": 10000}
+
+
+def compile(optimize: bool) -> bytes:
+    scanner = Scanner()
+    scanner.open(io.StringIO(PROGRAM))
+    tree = Parser(scanner=scanner).parse()
+    return CodeGenerator(optimize=optimize).generate(tree)
+
+
+def measure(
+    options: EngineOptions, code: bytes, command: str, input: int
+) -> tuple[float, int]:
+    """Best wall time [s] and fuel of `command`, reading `input`."""
+    engine = options.engine()
+    module = Module(engine, code)
+    best = None
+    for _ in range(REPEAT):
+        output = OutputWriter(io.BytesIO(), line_buffered=False)
+        start = time.perf_counter()
+        run(engine, module, command, ListSource([input]), output)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    limits = RunLimits(metrics=True)
+    engine = limits.engine_options(options).engine()
+    output = OutputWriter(io.BytesIO(), line_buffered=False)
+    metrics = run(
+        engine,
+        Module(engine, code),
+        command,
+        ListSource([input]),
+        output,
+        limits=limits,
+    )
+    return best, metrics.fuel
+
+
+def main():
+    options = EngineOptions()
+    memory, locals = compile(optimize=False), compile(optimize=True)
+    print(f"code: {len(memory)} bytes in memory, {len(locals)} bytes in locals")
+    print(
+        f"{'command':<8} {'memory [ms]':>12} {'locals [ms]':>12} {'speedup':>8}"
+        f" {'memory fuel':>12} {'locals fuel':>12}"
+    )
+    for command, input in COMMANDS.items():
+        time_memory, fuel_memory = measure(options, memory, command, input)
+        time_locals, fuel_locals = measure(options, locals, command, input)
+        print(
+            f"{command:<8} {time_memory * 1e3:>12.2f} {time_locals * 1e3:>12.2f}"
+            f" {time_memory / time_locals:>7.2f}x"
+            f" {fuel_memory:>12} {fuel_locals:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
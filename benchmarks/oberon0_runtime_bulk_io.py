@@ -0,0 +1,71 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Input integers per second: `ReadInt` per integer versus `ReadInts` per block
+
+Run with `python -m benchmarks.oberon0_runtime_bulk_io`. Both programs sum
+their input.
+"""
+
+import io
+import time
+
+from wasmtime import Engine, Module
+
+from oberon0_runtime.context import run
+from oberon0_runtime.input import ListSource
+from oberon0_runtime.output import OutputWriter
+
+SIZES = [1000, 10000, 100000]
+BLOCK = 1024
+
+PROGRAM = f"""
+(module
+  (import "env" "ReadInt" (func $read (param i32)))
+  (import "env" "ReadInts" (func $reads (param i32 i32) (result i32)))
+  (import "env" "Eot" (func $eot (result i32)))
+  (import "env" "memory" (memory 1))
+  (func (export "Single") (local $s i32)
+    (block $done
+      (loop $l
+        (br_if $done (call $eot))
+        (call $read (i32.const 0))
+        (local.set $s (i32.add (local.get $s) (i32.load (i32.const 0))))
+        (br $l))))
+  (func (export "Bulk") (local $n i32) (local $s i32) (local $i i32)
+    (loop $block
+      (local.set $n (call $reads (i32.const 0) (i32.const {BLOCK})))
+      (local.set $i (i32.const 0))
+      (block $done
+        (loop $l
+          (br_if $done (i32.ge_s (local.get $i) (local.get $n)))
+          (local.set $s (i32.add (local.get $s)
+            (i32.load (i32.shl (local.get $i) (i32.const 2)))))
+          (local.set $i (i32.add (local.get $i) (i32.const 1)))
+          (br $l)))
+      (br_if $block (i32.eq (local.get $n) (i32.const {BLOCK}))))))
+"""
+
+
+def measure(engine: Engine, module: Module, command: str, size: int) -> float:
+    source = ListSource(range(size))
+    output = OutputWriter(io.BytesIO(), line_buffered=False)
+    start = time.perf_counter()
+    run(engine, module, command, source, output)
+    return size / (time.perf_counter() - start)
+
+
+def main():
+    engine = Engine()
+    module = Module(engine, PROGRAM)
+    print(f"{'integers':>9} {'ReadInt [int/s]':>16} {'ReadInts [int/s]':>17}")
+    for size in SIZES:
+        single = measure(engine, module, "Single", size)
+        bulk = measure(engine, module, "Bulk", size)
+        print(f"{size:>9} {single:>16.0f} {bulk:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Output host calls per second: `rich.print` per call versus `OutputWriter`
+
+Run with `python -m benchmarks.oberon0_runtime_output`. A WASM loop calls
+`WriteChar`, `WriteInt` and `WriteLn` and the output goes to the null device.
+"""
+
+import contextlib
+import os
+import time
+
+import rich
+from wasmtime import Func, FuncType, Instance, Module, Store, ValType, wat2wasm
+
+from oberon0_runtime.output import OutputWriter
+
+LINES = [1000, 10000, 100000]
+CALLS_PER_LINE = 3
+
+PROGRAM = """
+(module
+  (import "env" "WriteChar" (func $wc (param i32)))
+  (import "env" "WriteInt" (func $wi (param i32 i32)))
+  (import "env" "WriteLn" (func $wl))
+  (func (export "run") (param $n i32) (local $i i32)
+    (loop $l
+      (call $wc (i32.const 35))
+      (call $wi (local.get $i) (i32.const 8))
+      (call $wl)
+      (local.set $i (i32.add (local.get $i) (i32.const 1)))
+      (br_if $l (i32.lt_s (local.get $i) (local.get $n))))))
+"""
+
+
+def rich_functions():
+    def write_char(c):
+        rich.print(chr(c), end="")
+
+    def write_int(i, width):
+        rich.print(f"{i:{width}d}", end="")
+
+    def write_ln():
+        rich.print()
+
+    return write_char, write_int, write_ln
+
+
+def run(functions, lines: int) -> float:
+    store = Store()
+    module = Module(store.engine, wat2wasm(PROGRAM))
+    i32 = ValType.i32()
+    types = [FuncType([i32], []), FuncType([i32, i32], []), FuncType([], [])]
+    imports = [Func(store, t, f) for t, f in zip(types, functions, strict=True)]
+    run = Instance(store, module, imports).exports(store)["run"]
+    start = time.perf_counter()
+    run(store, lines)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'lines':>8} {'rich [calls/s]':>15} {'buffered [calls/s]':>19}")
+    with open(os.devnull, "w") as null_text, open(os.devnull, "wb") as null:
+        for lines in LINES:
+            calls = lines * CALLS_PER_LINE
+            with contextlib.redirect_stdout(null_text):
+                slow = run(rich_functions(), lines) if lines <= LINES[1] else None
+            writer = OutputWriter(null, line_buffered=False)
+            fast = run((writer.write_char, writer.write_int, writer.write_ln), lines)
+            writer.flush()
+            rate = f"{calls / slow:>15.0f}" if slow else f"{'-':>15}"
+            print(f"{lines:>8} {rate} {calls / fast:>19.0f}")
+
+
+if __name__ == "__main__":
+    main()
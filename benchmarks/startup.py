@@ -0,0 +1,86 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Import time of the entry points, with `python -X importtime`
+
+Run with `python -m benchmarks.startup`. For each entry point, the import time
+of the modules that neither the interpreter start-up nor typer load (typer is
+needed to parse the arguments at all) must fit in its budget, and the modules
+that are only needed by some commands must not be loaded. The exit code is 1
+otherwise.
+"""
+
+import subprocess
+import sys
+
+RUNS = 5
+FRAMEWORK = "typer"
+
+# Entry point: budget [ms]
+BUDGETS = {
+    "oberon0_runtime": 120,  # Most of it is wasmtime
+    "oberon0_compiler": 120,  # Imports the options of oberon0_runtime
+    "ebnf_compiler": 40,
+}
+LAZY = ["pydantic", "loguru", "concurrent.futures"]
+
+
+def import_times(code: str) -> tuple[int, int]:
+    """Import time [us] of `code`, with the imports of the interpreter start-up,
+    and of `FRAMEWORK`, for the best of `RUNS` runs."""
+    best = None
+    for _ in range(RUNS):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        total = framework = 0
+        for line in result.stderr.splitlines():
+            # "import time: self | cumulative | name", indented by depth
+            parts = line.split("|")
+            if len(parts) != 3 or not parts[1].strip().isdigit():  # noqa: PLR2004
+                continue  # Header
+            name = parts[2][1:]
+            if not name.startswith(" "):
+                total += int(parts[1])
+            elif name.strip() == FRAMEWORK:
+                framework = int(parts[1])
+        if best is None or total < best[0]:
+            best = (total, framework)
+    return best
+
+
+def loaded(module: str, statement: str = "", lazy: list[str] = LAZY) -> list[str]:
+    """The modules of `lazy` that are loaded by `import module` and then
+    `statement`, in a new interpreter."""
+    code = (
+        f"import sys, {module}\n{statement}\n"
+        f"print(*(m for m in {lazy} if m in sys.modules), file=sys.stderr)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stderr.split()
+
+
+def main():
+    ok = True
+    print(f"{'entry point':<16} {'total [ms]':>10} {'own [ms]':>9} {'budget':>7}  lazy")
+    start_up, _ = import_times("pass")
+    for module, budget in BUDGETS.items():
+        total, framework = import_times(f"import {module}")
+        own = (total - framework - start_up) / 1000
+        total /= 1000
+        eager = loaded(module)
+        ok = ok and own <= budget and not eager
+        status = "ok" if not eager else "loaded: " + ", ".join(eager)
+        print(f"{module:<16} {total:>10.1f} {own:>9.1f} {budget:>7}  {status}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
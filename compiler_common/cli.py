@@ -0,0 +1,22 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Command line helpers shared by the CLIs
+"""
+
+import click
+from typer.core import TyperGroup
+
+
+class DefaultCommandGroup(TyperGroup):
+    """Runs `main` when the first argument is not a command, so that
+    `ebnf-compiler FILE`, `oberon0-rt FILE COMMAND` and `oberon0-compiler SOURCE`
+    work next to the other commands."""
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        options = {o for p in self.get_params(ctx) for o in p.opts}
+        if args and args[0] not in self.commands and args[0] not in options:
+            args = ["main", *args]
+        return super().parse_args(ctx, args)
@@ -0,0 +1,155 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Instrumentation: tracing hooks and phase profiler
+
+Tracing is installed on an object when it is built with tracing on: its traced
+methods are replaced, on that instance only, by wrappers that log to loguru.
+An object built without tracing runs its plain methods, with no test, call or
+formatting in the hot path.
+
+A `Profiler` measures the wall time and the memory allocated (with
+`tracemalloc`) by each phase of a compilation, and keeps counters such as the
+number of tokens or of tree nodes.
+"""
+
+import functools
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from loguru import logger
+from pydantic import BaseModel
+
+
+def _install(obj: Any, name: str, wrapper: Callable) -> None:
+    # Bypass pydantic's __setattr__, which only accepts fields.
+    object.__setattr__(obj, name, wrapper)
+
+
+def _logger(obj: Any, method: Callable):
+    """A logger whose records look like they come from `method`, so that the
+    levels per module of the command line apply to them."""
+    code = method.__code__
+
+    def patch(record) -> None:
+        record["name"] = type(obj).__module__
+        record["function"] = code.co_name
+        record["line"] = code.co_firstlineno
+
+    return logger.patch(patch)
+
+
+def trace_calls(obj: Any, names: Iterable[str]) -> None:
+    """Log the name of the method (e.g. "Factor") on each call to the methods
+    `names` of `obj`."""
+    for name in names:
+        method = getattr(obj, name)
+        log = _logger(obj, method)
+        message = name.capitalize()
+
+        def wrapper(*args, method=method, log=log, message=message, **kwargs):
+            log.debug(message)
+            return method(*args, **kwargs)
+
+        _install(obj, name, functools.wraps(method)(wrapper))
+
+
+def trace_results(obj: Any, name: str, message: Callable[[], str]) -> None:
+    """Log `message()` after each call to the method `name` of `obj`."""
+    method = getattr(obj, name)
+    log = _logger(obj, method).opt(lazy=True)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        result = method(*args, **kwargs)
+        log.debug("{}", message)  # noqa: PLE1205
+        return result
+
+    _install(obj, name, wrapper)
+
+
+def count_models(root: BaseModel) -> int:
+    """Number of pydantic models in a tree of models, such as the nodes of a
+    syntax tree."""
+    count = 0
+    stack: list = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, BaseModel):
+            count += 1
+            stack.extend(item.__dict__.values())
+        elif isinstance(item, list | tuple):
+            stack.extend(item)
+    return count
+
+
+class Phase(BaseModel):
+    name: str
+    time: float = 0.0  # Seconds
+    allocated: int = 0  # Bytes allocated by the phase and still in use after it
+    peak: int = 0  # Largest number of bytes allocated during the phase
+
+
+class Profiler:
+    """Use as a context manager: memory is traced from `__enter__` to
+    `__exit__`. A disabled profiler measures nothing."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.phases: list[Phase] = []
+        self.counters: dict[str, int] = {}
+        self._started = False
+
+    def __enter__(self) -> "Profiler":
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            phase = Phase(name=name, time=time.perf_counter() - start)
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                phase.allocated = current - before
+                phase.peak = peak - before
+            self.phases.append(phase)
+
+    def count(self, name: str, n: int) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def __str__(self) -> str:
+        lines = [
+            f"{'phase':<10} {'time [ms]':>10} {'alloc [kB]':>11} {'peak [kB]':>10}"
+        ]
+        for p in self.phases:
+            lines.append(
+                f"{p.name:<10} {p.time * 1000:>10.2f} {p.allocated / 1024:>11.1f}"
+                f" {p.peak / 1024:>10.1f}"
+            )
+        if self.counters:
+            lines.append("")
+            lines.extend(f"{name:<10} {n:>10}" for name, n in self.counters.items())
+        return "\n".join(lines)
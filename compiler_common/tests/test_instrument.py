@@ -0,0 +1,51 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+from loguru import logger
+
+from compiler_common.instrument import Profiler
+from ebnf_compiler.parser import Parser
+from ebnf_compiler.scanner import Scanner
+
+SOURCE = 'a = "x" { b }.\nb = "y".'
+
+
+def parse(trace: bool, replay: bool = False):
+    scanner = Scanner(trace=trace)
+    scanner.open_text(SOURCE)
+    if replay:
+        scanner.replay(scanner.tokenize())
+    return Parser(scanner=scanner, trace=trace).parse()
+
+
+def test_tracing():
+    messages = []
+    sink = logger.add(messages.append, level="DEBUG", format="{name} {message}")
+    try:
+        parse(trace=False)
+        assert messages == []
+        parse(trace=True)
+    finally:
+        logger.remove(sink)
+    assert "ebnf_compiler.parser Factor\n" in messages
+    assert "ebnf_compiler.scanner Token: Token.LITERAL, Value: x\n" in messages
+
+
+def test_replay():
+    assert str(parse(trace=False, replay=True)) == str(parse(trace=False))
+
+
+def test_profiler():
+    with Profiler() as profiler:
+        with profiler.phase("build"):
+            data = [0] * 100_000
+        profiler.count("items", len(data))
+    assert [p.name for p in profiler.phases] == ["build"]
+    assert profiler.phases[0].allocated >= len(data) * 8
+    assert profiler.counters == {"items": len(data)}
+
+    disabled = Profiler(enabled=False)
+    with disabled, disabled.phase("build"):
+        pass
+    assert disabled.phases == []
@@ -0,0 +1,30 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import pytest
+
+from benchmarks.startup import BUDGETS, loaded
+
+PROGRAM = """
+MODULE Answer;
+  PROCEDURE Main*;
+  BEGIN WriteInt(42, 0)
+  END Main;
+END Answer.
+"""
+
+
+@pytest.mark.parametrize("module", list(BUDGETS))
+def test_lazy_imports(module):
+    assert loaded(module) == []
+
+
+def test_cached_run(tmp_path):
+    source = tmp_path / "answer.mod"
+    source.write_text(PROGRAM)
+    args = [str(source), "Main", "--cache-dir", str(tmp_path / "cache")]
+    run = f"oberon0_compiler.app(['run', *{args}], standalone_mode=False)"
+    lazy = ["oberon0_compiler.parser", "pydantic"]
+    assert loaded("oberon0_compiler", run, lazy) == lazy  # Compiles the source
+    assert loaded("oberon0_compiler", run, lazy) == []
@@ -0,0 +1,160 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Columnar token buffer
+
+A `TokenBuffer` holds a whole token stream in a few flat arrays instead of one
+object per token: the kind of each token (the value of its `Token` member) in
+an `array('B')`, its start and end offsets in the source in `array('I')`, and
+the index of its value in a side table where every distinct identifier,
+literal or number is stored only once. Consumers work on integer indices, and
+the buffer is cheap to slice, cache or pickle to another process.
+"""
+
+import bisect
+import re
+from array import array
+from collections.abc import Iterator
+from enum import Enum
+
+
+class TokenBuffer:
+    __slots__ = (
+        "_index",
+        "_line_starts",
+        "_members",
+        "ends",
+        "kinds",
+        "source",
+        "starts",
+        "token_type",
+        "value_ids",
+        "values",
+    )
+
+    def __init__(self, token_type: type[Enum], source: str = ""):
+        self.token_type = token_type
+        self.source = source
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.value_ids = array("I")
+        self.values: list[str | int] = [""]
+        self._index: dict[str | int, int] | None = None
+        self._line_starts: list[int] | None = None
+        self._members: list[Enum | None] | None = None
+
+    def intern(self, value: str | int) -> int:
+        """Return the index of `value` in the side table, adding it if needed."""
+        if self._index is None:
+            self._index = {v: i for i, v in enumerate(self.values)}
+        index = self._index.get(value)
+        if index is None:
+            index = self._index[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def append(self, kind: Enum, start: int, end: int, value: str | int = "") -> None:
+        self.kinds.append(kind.value)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.value_ids.append(self.intern(value))
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, index: slice) -> "TokenBuffer":
+        if not isinstance(index, slice):
+            raise TypeError("use kind(), value() or text() to access a single token")
+        res = TokenBuffer(self.token_type, self.source)
+        res.kinds = self.kinds[index]
+        res.starts = self.starts[index]
+        res.ends = self.ends[index]
+        res.value_ids = self.value_ids[index]
+        res.values = self.values
+        res._index = self._index
+        res._line_starts = self._line_starts
+        return res
+
+    def __iter__(self) -> Iterator[tuple[Enum, str | int, int, int]]:
+        """Yield `(token, value, start, end)` for every token."""
+        members = self.members
+        values = self.values
+        return zip(
+            (members[k] for k in self.kinds),
+            (values[v] for v in self.value_ids),
+            self.starts,
+            self.ends,
+            strict=True,
+        )
+
+    def __getstate__(self):
+        # The intern index and the line table are rebuilt on demand.
+        return (
+            self.token_type,
+            self.source,
+            self.kinds,
+            self.starts,
+            self.ends,
+            self.value_ids,
+            self.values,
+        )
+
+    def __setstate__(self, state) -> None:
+        (
+            self.token_type,
+            self.source,
+            self.kinds,
+            self.starts,
+            self.ends,
+            self.value_ids,
+            self.values,
+        ) = state
+        self._index = None
+        self._line_starts = None
+        self._members = None
+
+    @property
+    def members(self) -> list[Enum | None]:
+        """The `Token` members indexed by their value."""
+        if self._members is None:
+            size = max(m.value for m in self.token_type) + 1
+            self._members = [None] * size
+            for m in self.token_type:
+                self._members[m.value] = m
+        return self._members
+
+    def kind(self, i: int) -> Enum:
+        return self.members[self.kinds[i]]
+
+    def value(self, i: int) -> str | int:
+        return self.values[self.value_ids[i]]
+
+    def text(self, i: int) -> str:
+        return self.source[self.starts[i] : self.ends[i]]
+
+    def keys(self, classes: dict[Enum, str]) -> list[str]:
+        """The key of every token, for a parser generated by
+        `ebnf_compiler.generator`: the name given in `classes` for the kinds of
+        token that carry a value (identifiers, numbers, ...), the source text
+        for the others. A token with an empty text (EOF) gets no key."""
+        source = self.source
+        names = [classes.get(m) for m in self.members]
+        res = []
+        for k, start, end in zip(self.kinds, self.starts, self.ends, strict=True):
+            name = names[k]
+            if name is not None:
+                res.append(name)
+            elif end > start:
+                res.append(source[start:end])
+        return res
+
+    def location(self, i: int) -> tuple[int, int]:
+        """Return the line and the column (both starting at 1) of token `i`."""
+        if self._line_starts is None:
+            self._line_starts = [0, *(m.end() for m in re.finditer("\n", self.source))]
+        offset = self.starts[i]
+        line = bisect.bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1] + 1
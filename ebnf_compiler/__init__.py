@@ -4,69 +4,225 @@
 
 """
 EBNF Compiler
+
+Each command imports the modules it needs, and rich is only imported to print
+the results, so that a command does not pay for the imports of the others.
 """
 
+import functools
 import sys
+import time
 from pathlib import Path
-from typing import Annotated
+from typing import TYPE_CHECKING, Annotated
 
 import typer
-from loguru import logger
-from rich.columns import Columns
-from rich.console import Console
-from rich.panel import Panel
-from rich.pretty import Pretty
 
-import ebnf_compiler.stat
-from ebnf_compiler.parser import Parser
-from ebnf_compiler.scanner import Scanner
+from compiler_common.cli import DefaultCommandGroup
+
+if TYPE_CHECKING:
+    from rich.console import Console
+
+
+app = typer.Typer(cls=DefaultCommandGroup)
+
 
-console = Console()
-app = typer.Typer()
+@functools.cache
+def console() -> "Console":
+    from rich.console import Console
+
+    return Console()
 
 
 @app.command(context_settings={"ignore_unknown_options": True})
-def main(
+def main(  # noqa: PLR0913
     source: Annotated[Path, typer.Argument()],
     debug: bool = False,
     show_tree: bool = False,
     stats: bool = False,
+    fast_ast: bool = False,
+    analysis: Annotated[
+        bool, typer.Option(help="Report LL(1) conflicts and left recursion")
+    ] = False,
+    quiet: Annotated[
+        bool, typer.Option("--quiet", "-q", help="Only report errors")
+    ] = False,
+    profile: Annotated[
+        bool, typer.Option(help="Report the time and memory of each phase")
+    ] = False,
 ):
+    from loguru import logger
+
+    import ebnf_compiler.stat
+    from compiler_common.instrument import Profiler
+    from ebnf_compiler.parser import Parser
+    from ebnf_compiler.scanner import Scanner
+
     logger.remove()
     if debug:
         logger.add(sys.stdout, level="DEBUG")
     else:
         logger.add(sys.stdout, level="INFO")
 
-    scanner = Scanner()
+    scanner = Scanner(trace=debug)
     scanner.open(source)
-    parser = Parser(scanner=scanner)
-
-    try:
-        ast = parser.parse()
-    except SyntaxError as e:
-        print(f"{e.msg} (File {e.filename}, Line {e.lineno}, Column {e.offset})")
-
-    if parser.has_error:
-        print("Syntax errors. aborting")
-        raise typer.Exit(code=1)
+    parser = Parser(scanner=scanner, fast_ast=fast_ast, trace=debug)
+
+    with Profiler(profile) as profiler:
+        try:
+            if profile:
+                # Scan first, so that the parse phase does not include it
+                with profiler.phase("scan"):
+                    tokens = scanner.tokenize()
+                profiler.count("tokens", len(tokens))
+                scanner.replay(tokens)
+            with profiler.phase("parse"):
+                ast = parser.parse()
+        except SyntaxError as e:
+            print(f"{e.msg} (File {e.filename}, Line {e.lineno}, Column {e.offset})")
+            parser.has_error = True
+
+        if parser.has_error:
+            print("Syntax errors. aborting")
+            raise typer.Exit(code=1)
+        if profile:
+            profiler.count("nodes", ebnf_compiler.stat.nodes(ast))
+
+        result = None
+        if analysis:
+            from ebnf_compiler.analysis import analyze
+
+            with profiler.phase("analysis"):
+                result = analyze(ast)
+                conflicts = [str(c) for c in result.conflicts()]
+                recursion = [", ".join(c) for c in result.left_recursion()]
+
+        if not quiet:
+            from rich.panel import Panel
+
+            with profiler.phase("print"):
+                _print_syntax(ast, show_tree, stats, fast_ast)
+                if result is not None:
+                    console().print(
+                        Panel("\n".join(conflicts) or "None", title="LL(1) Conflicts")
+                    )
+                    console().print(
+                        Panel("\n".join(recursion) or "None", title="Left Recursion")
+                    )
+
+    if profile:
+        from rich.panel import Panel
+        from rich.text import Text
+
+        console().print(Panel(Text(str(profiler)), title="Profile"))
+
+
+def _print_syntax(ast, show_tree: bool, stats: bool, fast_ast: bool) -> None:
+    from rich.columns import Columns
+    from rich.panel import Panel
+    from rich.pretty import Pretty
+
+    import ebnf_compiler.stat
 
     if show_tree:
-        console.print(Panel(Pretty(ast, indent_size=2), title="Syntax Tree"))
+        tree = ast.to_model() if fast_ast else ast
+        console().print(Panel(Pretty(tree, indent_size=2), title="Syntax Tree"))
     else:
-        console.print(Panel(str(ast), title="Code"))
+        console().print(Panel(str(ast), title="Code"))
 
     if stats:
         non_terminals, terminals = ebnf_compiler.stat.symbols(ast)
 
         nts = [i for i in sorted(list(non_terminals))]
-        console.print(Panel("\n".join(nts), title="Non-terminal Symbols"))
+        console().print(Panel("\n".join(nts), title="Non-terminal Symbols"))
 
         ts = [f"`{i}`" for i in sorted(list(terminals))]
-        console.print(
+        console().print(
             Panel(Columns(ts, equal=True, expand=True), title="Terminal Symbols")
         )
 
 
+@app.command()
+def batch(
+    sources: Annotated[
+        list[str], typer.Argument(help="Grammar files, directories or glob patterns")
+    ],
+    jobs: Annotated[
+        int, typer.Option("--jobs", "-j", help="Worker processes (0: one per core)")
+    ] = 0,
+    quiet: Annotated[
+        bool, typer.Option("--quiet", "-q", help="Only report errors")
+    ] = False,
+):
+    """
+    Validate many grammars in parallel, one result line per file
+    """
+    from loguru import logger
+
+    from ebnf_compiler.batch import collect_sources, run_batch
+
+    logger.remove()
+
+    paths = collect_sources(sources)
+    start = time.perf_counter()
+    errors = 0
+    for result in run_batch(paths, jobs):
+        if not result.ok:
+            errors += 1
+        if not (quiet and result.ok):
+            print(result)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{len(paths)} files, {len(paths) - errors} ok, {errors} errors"
+        f" [{elapsed * 1000:.1f} ms]"
+    )
+    if errors:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def generate(
+    source: Annotated[Path, typer.Argument()],
+    output: Annotated[
+        Path | None,
+        typer.Option("--output", "-o", help="Parser module (default: stdout)"),
+    ] = None,
+):
+    """
+    Generate a predictive LL(1) parser module for a grammar
+    """
+    from loguru import logger
+
+    import ebnf_compiler.generator
+    from ebnf_compiler.analysis import analyze
+    from ebnf_compiler.parser import Parser
+    from ebnf_compiler.scanner import Scanner
+
+    logger.remove()
+
+    scanner = Scanner()
+    scanner.open(source)
+    try:
+        syntax = Parser(scanner=scanner, fast_ast=True).parse()
+    except SyntaxError as e:
+        print(f"{e.msg} (File {e.filename}, Line {e.lineno}, Column {e.offset})")
+        raise typer.Exit(code=1) from None
+
+    result = analyze(syntax)
+    recursion = result.left_recursion()
+    if recursion:
+        for group in recursion:
+            print(f"Left recursion: {', '.join(group)}", file=sys.stderr)
+        raise typer.Exit(code=1)
+    for conflict in result.conflicts():
+        print(f"Warning: {conflict}", file=sys.stderr)
+
+    code = ebnf_compiler.generator.generate(syntax, result)
+    if output is None:
+        sys.stdout.write(code)
+    else:
+        output.write_text(code)
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,370 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Grammar analysis: nullable symbols, FIRST and FOLLOW sets, LL(1) conflicts and
+left recursion
+
+The EBNF tree is first flattened into plain rules. Every production is a
+non-terminal, and so is every option, repetition and parenthesized group with
+more than one alternative:
+
+    A = x [ y ] { z }.   ->   A = x A[1] A{2}.   A[1] = y | .   A{2} = z A{2} | .
+
+Terminals and non-terminals are numbered, sets of terminals are bitsets (plain
+integers) indexed by terminal number, and the sets are computed with worklist
+algorithms that only revisit a symbol when one of the sets it depends on has
+grown.
+"""
+
+from collections import deque
+from collections.abc import Iterator
+
+from pydantic import BaseModel
+
+import ebnf_compiler.ast0 as ast
+from ebnf_compiler import fast_ast
+
+END = "$"  # End of input; terminal number 0
+
+
+class Grammar:
+    """A flattened grammar. In the right-hand side of a rule, a terminal `t` is
+    stored as `t` (>= 0) and a non-terminal `n` as `~n` (< 0)."""
+
+    __slots__ = (
+        "literal",
+        "node_symbol",
+        "nonterminal_ids",
+        "nonterminals",
+        "origin",
+        "rules",
+        "rules_of",
+        "terminal_ids",
+        "terminals",
+    )
+
+    def __init__(self):
+        self.terminals: list[str] = [END]
+        self.literal: list[bool] = [False]  # Terminal comes from a literal
+        self.terminal_ids: dict[str, int] = {END: 0}
+        self.nonterminals: list[str] = []
+        self.nonterminal_ids: dict[str, int] = {}
+        self.origin: list = []  # EBNF node of each non-terminal
+        self.rules: list[tuple[int, tuple[int, ...]]] = []
+        self.rules_of: list[list[int]] = []
+        # id() of an Expression, Option or Repetition node -> its non-terminal
+        self.node_symbol: dict[int, int] = {}
+
+    def terminal(self, name: str, literal: bool = False) -> int:
+        t = self.terminal_ids.get(name)
+        if t is None:
+            t = self.terminal_ids[name] = len(self.terminals)
+            self.terminals.append(name)
+            self.literal.append(literal)
+        return t
+
+    def nonterminal(self, name: str, origin) -> int:
+        n = self.nonterminal_ids[name] = len(self.nonterminals)
+        self.nonterminals.append(name)
+        self.origin.append(origin)
+        self.rules_of.append([])
+        return n
+
+    def add_rule(self, lhs: int, rhs: tuple[int, ...]) -> None:
+        self.rules_of[lhs].append(len(self.rules))
+        self.rules.append((lhs, rhs))
+
+    def symbol_name(self, s: int) -> str:
+        if s < 0:
+            return self.nonterminals[~s]
+        if self.literal[s]:
+            return f'"{self.terminals[s]}"'
+        return self.terminals[s]
+
+    def names(self, bits: int) -> list[str]:
+        """The names of the terminals in the bitset `bits`."""
+        res = []
+        t = 0
+        while bits:
+            if bits & 1:
+                res.append(self.symbol_name(t))
+            bits >>= 1
+            t += 1
+        return res
+
+    def rule_text(self, r: int) -> str:
+        lhs, rhs = self.rules[r]
+        body = " ".join(self.symbol_name(s) for s in rhs)
+        return f"{self.nonterminals[lhs]} = {body}."
+
+
+def flatten(syntax: ast.Syntax | fast_ast.Syntax) -> Grammar:  # noqa: C901
+    g = Grammar()
+    for p in syntax.production:
+        g.nonterminal(p.identifier.value, p.expression)
+
+    def sequence(term, owner: str, counter: list[int]) -> tuple[int, ...]:
+        res: list[int] = []
+        for f in term.factors:
+            if isinstance(f, ast.Identifier | fast_ast.Identifier):
+                n = g.nonterminal_ids.get(f.value)
+                res.append(g.terminal(f.value) if n is None else ~n)
+            elif isinstance(f, ast.Literal | fast_ast.Literal):
+                res.append(g.terminal(f.value, literal=True))
+            elif isinstance(f, ast.Expression | fast_ast.Expression):
+                if len(f.terms) == 1:
+                    res.extend(sequence(f.terms[0], owner, counter))
+                else:
+                    res.append(~group(f, f, "()", owner, counter))
+            elif isinstance(f, ast.Option | fast_ast.Option):
+                res.append(~group(f, f.expr, "[]", owner, counter))
+            elif isinstance(f, ast.Repetition | fast_ast.Repetition):
+                res.append(~group(f, f.expr, "{}", owner, counter))
+        return tuple(res)
+
+    def group(node, expr, brackets: str, owner: str, counter: list[int]) -> int:
+        counter[0] += 1
+        name = f"{owner}{brackets[0]}{counter[0]}{brackets[1]}"
+        n = g.nonterminal(name, node)
+        g.node_symbol[id(node)] = g.node_symbol[id(expr)] = n
+        repeat = (~n,) if brackets == "{}" else ()
+        for t in expr.terms:
+            g.add_rule(n, sequence(t, owner, counter) + repeat)
+        if brackets != "()":
+            g.add_rule(n, ())
+        return n
+
+    for p in syntax.production:
+        n = g.nonterminal_ids[p.identifier.value]
+        g.node_symbol[id(p.expression)] = n
+        counter = [0]
+        for t in p.expression.terms:
+            g.add_rule(n, sequence(t, p.identifier.value, counter))
+    return g
+
+
+class Conflict(BaseModel):
+    symbol: str  # The non-terminal with the conflicting alternatives
+    origin: str  # Its EBNF text
+    alternatives: tuple[int, int]  # Indices of the alternatives
+    terminals: list[str]  # Terminals that predict both alternatives
+
+    def __str__(self) -> str:
+        a, b = self.alternatives
+        return (
+            f"{self.symbol}: alternatives {a + 1} and {b + 1} of `{self.origin}`"
+            f" both start with {', '.join(self.terminals)}"
+        )
+
+
+class Analysis:
+    """Nullable symbols, FIRST, FOLLOW and predict sets of a flattened grammar.
+    The start symbol is the first production."""
+
+    def __init__(self, grammar: Grammar):
+        self.grammar = grammar
+        self.nullable = self._nullable()
+        self.first = self._first()
+        self.follow = self._follow()
+        self.predict = [self._predict(r) for r in range(len(grammar.rules))]
+
+    def _nullable(self) -> list[bool]:
+        g = self.grammar
+        nullable = [False] * len(g.nonterminals)
+        # Number of symbols of each rule not known to be nullable yet
+        pending = [len(rhs) for _, rhs in g.rules]
+        uses: list[list[int]] = [[] for _ in g.nonterminals]
+        work: deque[int] = deque()
+        for r, (lhs, rhs) in enumerate(g.rules):
+            if any(s >= 0 for s in rhs):
+                continue  # A rule with a terminal is never nullable
+            for s in rhs:
+                uses[~s].append(r)
+            if not rhs and not nullable[lhs]:
+                nullable[lhs] = True
+                work.append(lhs)
+        while work:
+            n = work.popleft()
+            for r in uses[n]:
+                pending[r] -= 1
+                lhs = g.rules[r][0]
+                if pending[r] == 0 and not nullable[lhs]:
+                    nullable[lhs] = True
+                    work.append(lhs)
+        return nullable
+
+    @staticmethod
+    def _propagate(sets: list[int], edges: list[set[int]]) -> None:
+        """Add `sets[a]` to `sets[b]` for every edge a -> b, up to a fixed
+        point."""
+        work = deque(n for n, bits in enumerate(sets) if bits)
+        queued = [bool(bits) for bits in sets]
+        while work:
+            a = work.popleft()
+            queued[a] = False
+            bits = sets[a]
+            for b in edges[a]:
+                new = sets[b] | bits
+                if new != sets[b]:
+                    sets[b] = new
+                    if not queued[b]:
+                        queued[b] = True
+                        work.append(b)
+
+    def _first(self) -> list[int]:
+        g = self.grammar
+        nullable = self.nullable
+        first = [0] * len(g.nonterminals)
+        edges: list[set[int]] = [set() for _ in g.nonterminals]
+        for lhs, rhs in g.rules:
+            for s in rhs:
+                if s >= 0:
+                    first[lhs] |= 1 << s
+                    break
+                edges[~s].add(lhs)
+                if not nullable[~s]:
+                    break
+        self._propagate(first, edges)
+        return first
+
+    def _follow(self) -> list[int]:
+        g = self.grammar
+        nullable = self.nullable
+        first = self.first
+        follow = [0] * len(g.nonterminals)
+        if follow:
+            follow[0] = 1  # END follows the start symbol
+        edges: list[set[int]] = [set() for _ in g.nonterminals]
+        for lhs, rhs in g.rules:
+            rest = 0  # FIRST of the symbols after the current one
+            rest_nullable = True
+            for s in reversed(rhs):
+                if s >= 0:
+                    rest = 1 << s
+                    rest_nullable = False
+                    continue
+                follow[~s] |= rest
+                if rest_nullable:
+                    edges[lhs].add(~s)
+                if nullable[~s]:
+                    rest |= first[~s]
+                else:
+                    rest = first[~s]
+                    rest_nullable = False
+        self._propagate(follow, edges)
+        return follow
+
+    def first_of(self, rhs: tuple[int, ...]) -> tuple[int, bool]:
+        """FIRST of a sequence of symbols and whether it is nullable."""
+        bits = 0
+        for s in rhs:
+            if s >= 0:
+                return bits | 1 << s, False
+            bits |= self.first[~s]
+            if not self.nullable[~s]:
+                return bits, False
+        return bits, True
+
+    def _predict(self, r: int) -> int:
+        lhs, rhs = self.grammar.rules[r]
+        bits, nullable = self.first_of(rhs)
+        return bits | self.follow[lhs] if nullable else bits
+
+    def conflicts(self) -> Iterator[Conflict]:
+        """Pairs of alternatives of a non-terminal that a single token of
+        lookahead cannot tell apart."""
+        g = self.grammar
+        for n, rules in enumerate(g.rules_of):
+            seen = 0
+            for i, r in enumerate(rules):
+                bits = self.predict[r]
+                if bits & seen:
+                    for j in range(i):
+                        common = bits & self.predict[rules[j]]
+                        if common:
+                            yield Conflict(
+                                symbol=g.nonterminals[n],
+                                origin=str(g.origin[n]),
+                                alternatives=(j, i),
+                                terminals=g.names(common),
+                            )
+                seen |= bits
+
+    def left_recursion(self) -> list[list[str]]:  # noqa: C901, PLR0912
+        """Groups of non-terminals that can derive themselves without consuming
+        a token (the strongly connected components of the "can start with"
+        graph that contain a cycle)."""
+        g = self.grammar
+        edges: list[list[int]] = [[] for _ in g.nonterminals]
+        for lhs, rhs in g.rules:
+            for s in rhs:
+                if s >= 0:
+                    break
+                edges[lhs].append(~s)
+                if not self.nullable[~s]:
+                    break
+
+        # Tarjan's algorithm, without recursion
+        index = [-1] * len(edges)
+        low = [0] * len(edges)
+        on_stack = [False] * len(edges)
+        stack: list[int] = []
+        counter = 0
+        res = []
+        for root in range(len(edges)):
+            if index[root] >= 0:
+                continue
+            work = [(root, 0)]
+            while work:
+                v, i = work.pop()
+                if i == 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                elif i <= len(edges[v]):
+                    low[v] = min(low[v], low[edges[v][i - 1]])
+                while i < len(edges[v]):
+                    w = edges[v][i]
+                    i += 1
+                    if index[w] < 0:
+                        work.append((v, i))
+                        work.append((w, 0))
+                        break
+                    if on_stack[w]:
+                        low[v] = min(low[v], index[w])
+                else:
+                    if low[v] == index[v]:
+                        component = []
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = False
+                            component.append(w)
+                            if w == v:
+                                break
+                        if len(component) > 1 or v in edges[v]:
+                            res.append(sorted(g.nonterminals[w] for w in component))
+        return res
+
+    def is_ll1(self) -> bool:
+        return next(self.conflicts(), None) is None and not self.left_recursion()
+
+    # Access by name
+
+    def _id(self, name: str) -> int:
+        return self.grammar.nonterminal_ids[name]
+
+    def is_nullable(self, name: str) -> bool:
+        return self.nullable[self._id(name)]
+
+    def first_set(self, name: str) -> set[str]:
+        return set(self.grammar.names(self.first[self._id(name)]))
+
+    def follow_set(self, name: str) -> set[str]:
+        return set(self.grammar.names(self.follow[self._id(name)]))
+
+
+def analyze(syntax: ast.Syntax | fast_ast.Syntax) -> Analysis:
+    return Analysis(flatten(syntax))
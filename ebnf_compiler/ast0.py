@@ -6,13 +6,11 @@
 EBNF Abstract Syntax Tree
 """
 
-from typing import ClassVar
-
 from pydantic import BaseModel
 
 
 class Node(BaseModel):
-    symbols: ClassVar[dict[str, "Expression"]] = {}
+    pass
 
 
 class Factor(Node):
@@ -69,11 +67,6 @@ class Production(Node):
     identifier: Identifier
     expression: Expression
 
-    def model_post_init(self, context):
-        if self.identifier.value in self.symbols:
-            raise ValueError(f"Symbol {self.identifier.value} already defined")
-        Node.symbols[self.identifier.value] = self.expression
-
     def __str__(self) -> str:
         return f"{self.identifier} = {self.expression}."
 
@@ -81,5 +74,21 @@ class Production(Node):
 class Syntax(Node):
     production: list[Production]
 
+    _symbols: dict[str, Expression] = {}
+
+    def model_post_init(self, context):
+        # Each grammar owns its symbol table, so that several grammars can be
+        # parsed in the same process, one after the other or concurrently.
+        self._symbols = {}
+        for p in self.production:
+            if p.identifier.value in self._symbols:
+                raise ValueError(f"Symbol {p.identifier.value} already defined")
+            self._symbols[p.identifier.value] = p.expression
+
+    @property
+    def symbols(self) -> dict[str, Expression]:
+        """The expression of each production, by name."""
+        return self._symbols
+
     def __str__(self) -> str:
         return "\n".join(f"{p}" for p in self.production)
@@ -0,0 +1,99 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Batch validation of EBNF grammars
+"""
+
+import glob
+import os
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from loguru import logger
+from pydantic import BaseModel
+
+import ebnf_compiler.stat
+from ebnf_compiler.parser import Parser
+from ebnf_compiler.scanner import Scanner
+
+SUFFIX = ".ebnf"
+
+
+class Result(BaseModel):
+    path: Path
+    error: str | None = None
+    productions: int = 0
+    non_terminals: int = 0
+    terminals: int = 0
+    time: float = 0.0  # Seconds
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __str__(self) -> str:
+        ms = f"{self.time * 1000:.1f} ms"
+        if not self.ok:
+            return f"error {self.path}: {self.error} [{ms}]"
+        return (
+            f"ok    {self.path}: productions={self.productions}"
+            f" non-terminals={self.non_terminals} terminals={self.terminals} [{ms}]"
+        )
+
+
+def collect_sources(patterns: Iterable[str]) -> list[Path]:
+    """Expand files, directories (searched recursively for `*.ebnf`) and glob
+    patterns into a list of files, without duplicates."""
+    sources: dict[Path, None] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            names = sorted(path.rglob(f"*{SUFFIX}"))
+        elif glob.has_magic(pattern):
+            names = sorted(Path(p) for p in glob.glob(pattern, recursive=True))
+        else:
+            names = [path]
+        sources.update(dict.fromkeys(names))
+    return list(sources)
+
+
+def check_file(path: Path) -> Result:
+    """Parse the grammar in `path` and collect its statistics."""
+    start = time.perf_counter()
+    result = Result(path=path)
+    try:
+        scanner = Scanner()
+        scanner.open_text(path.read_text(), path)
+        syntax = Parser(scanner=scanner, fast_ast=True).parse()
+        non_terminals, terminals = ebnf_compiler.stat.symbols(syntax)
+    except SyntaxError as e:
+        result.error = f"{e.msg} (Line {e.lineno}, Column {e.offset})"
+    except (OSError, UnicodeDecodeError) as e:
+        result.error = str(e)
+    else:
+        result.productions = len(syntax.production)
+        result.non_terminals = len(non_terminals)
+        result.terminals = len(terminals)
+    result.time = time.perf_counter() - start
+    return result
+
+
+def _init_worker() -> None:
+    # Errors are part of the results; do not log them a second time.
+    logger.remove()
+
+
+def run_batch(paths: list[Path], jobs: int = 0) -> Iterator[Result]:
+    """Check `paths` with `jobs` processes (one per core if 0) and yield the
+    results in the order of `paths`."""
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) <= 1:
+        yield from map(check_file, paths)
+        return
+    chunk_size = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        yield from pool.map(check_file, paths, chunksize=chunk_size)
@@ -0,0 +1,136 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Lightweight EBNF Abstract Syntax Tree
+
+The same tree as `ebnf_compiler.ast0`, built from plain classes with
+`__slots__`: nodes are created without validation and without a per-instance
+`__dict__`. `to_model()` converts a tree to the pydantic models when validation
+or JSON export is needed.
+"""
+
+from ebnf_compiler import ast0
+
+
+class Node:
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}"
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def to_model(self) -> ast0.Node:
+        """The `ast0` model of the same name, with the same fields."""
+        model = getattr(ast0, type(self).__name__)
+        return model(
+            **{name: _to_model(getattr(self, name)) for name in model.model_fields}
+        )
+
+
+def _to_model(value):
+    if isinstance(value, Node):
+        return value.to_model()
+    if isinstance(value, list):
+        return [_to_model(v) for v in value]
+    return value
+
+
+class Factor(Node):
+    __slots__ = ()
+
+
+class Term(Node):
+    __slots__ = ("factors",)
+
+    def __init__(self, *, factors: list[Factor]):
+        self.factors = factors
+
+    def __str__(self) -> str:
+        return " ".join(f"{f}" for f in self.factors)
+
+
+class Identifier(Factor):
+    __slots__ = ("value",)
+
+    def __init__(self, *, value: str):
+        self.value = value
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class Literal(Factor):
+    __slots__ = ("value",)
+
+    def __init__(self, *, value: str):
+        self.value = value
+
+    def __str__(self) -> str:
+        return f'"{self.value}"'
+
+
+class Expression(Factor):
+    __slots__ = ("paren", "terms")
+
+    def __init__(self, *, terms: list[Term], paren: bool = False):
+        self.terms = terms
+        self.paren = paren
+
+    def __str__(self) -> str:
+        body = " | ".join(f"{t}" for t in self.terms)
+        if self.paren:
+            return f"( {body} )"
+        return body
+
+
+class Option(Factor):
+    __slots__ = ("expr",)
+
+    def __init__(self, *, expr: Expression):
+        self.expr = expr
+
+    def __str__(self) -> str:
+        return f"[ {self.expr} ]"
+
+
+class Repetition(Factor):
+    __slots__ = ("expr",)
+
+    def __init__(self, *, expr: Expression):
+        self.expr = expr
+
+    def __str__(self) -> str:
+        return f"{{ {self.expr} }}"
+
+
+class Production(Node):
+    __slots__ = ("expression", "identifier")
+
+    def __init__(self, *, identifier: Identifier, expression: Expression):
+        self.identifier = identifier
+        self.expression = expression
+
+    def __str__(self) -> str:
+        return f"{self.identifier} = {self.expression}."
+
+
+class Syntax(Node):
+    __slots__ = ("production", "symbols")
+
+    def __init__(self, *, production: list[Production]):
+        self.production = production
+        # The expression of each production, by name
+        self.symbols: dict[str, Expression] = {}
+        for p in production:
+            if p.identifier.value in self.symbols:
+                raise ValueError(f"Symbol {p.identifier.value} already defined")
+            self.symbols[p.identifier.value] = p.expression
+
+    def __str__(self) -> str:
+        return "\n".join(f"{p}" for p in self.production)
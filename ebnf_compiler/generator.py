@@ -0,0 +1,232 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+LL(1) parser generator
+
+`generate` writes the source of a standalone Python module with a predictive
+parser for a grammar. Every production becomes a function; alternatives are
+chosen with dispatch tables computed from the predict sets of the grammar
+analysis, options are `if` statements and repetitions are `while` loops, so the
+parser never backtracks. The generated module has no dependencies.
+
+The parser works on terminal numbers. A token is identified by its key: the
+text of a literal ("=", "WHILE", ...) or the name of an identifier that has no
+production in the grammar (a token class such as `ident` or `number`).
+"""
+
+from ebnf_compiler import ast0 as ast
+from ebnf_compiler import fast_ast
+from ebnf_compiler.analysis import Analysis, analyze
+
+_HEADER = '''\
+"""
+LL(1) parser generated by ebnf-compiler. Do not edit.
+
+Start symbol: {start}
+"""
+
+from collections.abc import Iterable, Sequence
+
+TERMINALS = {terminals!r}
+TERMINAL_IDS = {{name: i for i, name in enumerate(TERMINALS)}}
+END = 0
+
+
+class ParseError(SyntaxError):
+    def __init__(self, position: int, expected: Sequence[int]):
+        self.position = position  # Index of the offending token
+        self.expected = [TERMINALS[t] for t in expected]
+        super().__init__(
+            f"Unexpected token at position {{position}},"
+            f" expected {{' or '.join(repr(e) for e in self.expected)}}"
+        )
+
+
+def parse_keys(keys: Iterable[str]) -> None:
+    """Recognize a sequence of token keys (see `TERMINALS`)."""
+    ids = []
+    for i, key in enumerate(keys):
+        t = TERMINAL_IDS.get(key)
+        if t is None:
+            raise ParseError(i, range(1, len(TERMINALS)))
+        ids.append(t)
+    parse(ids)
+
+'''
+
+
+class _Generator:
+    def __init__(self, syntax: ast.Syntax | fast_ast.Syntax, analysis: Analysis):
+        self.syntax = syntax
+        self.grammar = analysis.grammar
+        self.analysis = analysis
+        self.tables: list[str] = []
+        self.lines: list[str] = []
+        self.indent = 0
+
+    # Tables
+
+    def _set(self, bits: int) -> list[int]:
+        res = []
+        t = 0
+        while bits:
+            if bits & 1:
+                res.append(t)
+            bits >>= 1
+            t += 1
+        return res
+
+    def _table(self, prefix: str, value: str) -> str:
+        name = f"_{prefix}{len(self.tables)}"
+        self.tables.append(f"{name} = {value}")
+        return name
+
+    def test(self, keyword: str, bits: int) -> None:
+        """An `if`, `elif` or `while` on the current token being in a set of
+        terminals."""
+        terminals = self._set(bits)
+        if len(terminals) == 1:
+            t = terminals[0]
+            self.emit(f"{keyword} tok == {t}:  # {self.grammar.symbol_name(t)}")
+        else:
+            name = self._table("S", f"frozenset({terminals!r})")
+            self.emit(f"{keyword} tok in {name}:")
+
+    def error(self, bits: int) -> None:
+        self.emit(f"raise ParseError(pos, {self._set(bits)!r})")
+
+    # Code
+
+    def emit(self, line: str) -> None:
+        self.lines.append("    " * self.indent + line if line else "")
+
+    def block(self, body) -> None:
+        self.indent += 1
+        start = len(self.lines)
+        body()
+        if len(self.lines) == start:
+            self.emit("pass")
+        self.indent -= 1
+
+    def term(self, term, checked: int | None = None) -> None:
+        """Code for a sequence of factors. `checked` is the terminal that the
+        caller already compared with the current token, if any."""
+        for f in term.factors:
+            if isinstance(f, ast.Identifier | fast_ast.Identifier):
+                n = self.grammar.nonterminal_ids.get(f.value)
+                if n is not None:
+                    self.emit(f"p_{f.value}()")
+                else:
+                    self.terminal(self.grammar.terminal_ids[f.value], checked)
+            elif isinstance(f, ast.Literal | fast_ast.Literal):
+                self.terminal(self.grammar.terminal_ids[f.value], checked)
+            elif isinstance(f, ast.Expression | fast_ast.Expression):
+                if len(f.terms) == 1:
+                    self.term(f.terms[0], checked)
+                else:
+                    self.expression(f)
+            elif isinstance(f, ast.Option | fast_ast.Option):
+                self.loop("if", f)
+            elif isinstance(f, ast.Repetition | fast_ast.Repetition):
+                self.loop("while", f)
+            checked = None
+
+    def loop(self, keyword: str, f) -> None:
+        """An option (`if`) or a repetition (`while`)."""
+        n = self.grammar.node_symbol[id(f)]
+        bits = self.entry(n)
+        self.test(keyword, bits)
+        # A single entry terminal is already checked for the body
+        terminals = self._set(bits)
+        checked = terminals[0] if len(terminals) == 1 else None
+        self.block(lambda: self.expression(f.expr, checked))
+
+    def terminal(self, t: int, checked: int | None) -> None:
+        if t != checked:
+            self.emit(f"if tok != {t}:  # {self.grammar.symbol_name(t)}")
+            self.block(lambda: self.error(1 << t))
+        self.emit("pos += 1")
+        self.emit("tok = ids[pos]")
+
+    def entry(self, n: int) -> int:
+        """Terminals that start one of the alternatives of an option or a
+        repetition, rather than skipping it."""
+        bits = 0
+        for r in self.grammar.rules_of[n]:
+            if self.grammar.rules[r][1]:
+                bits |= self.analysis.predict[r]
+        return bits
+
+    def expression(self, expr, checked: int | None = None) -> None:
+        if len(expr.terms) == 1:
+            self.term(expr.terms[0], checked)
+            return
+        rules = self.grammar.rules_of[self.grammar.node_symbol[id(expr)]]
+        predict = [self.analysis.predict[r] for r in rules[: len(expr.terms)]]
+        singles = [self._set(bits) for bits in predict]
+        if all(len(s) == 1 for s in singles) and len({s[0] for s in singles}) == len(
+            singles
+        ):
+            # Each alternative starts with its own terminal
+            for i, (t, s) in enumerate(zip(expr.terms, singles, strict=True)):
+                self.test("if" if i == 0 else "elif", 1 << s[0])
+                self.block(lambda t=t, s=s: self.term(t, s[0]))
+        else:
+            # On a conflict, the first alternative wins
+            table: dict[int, int] = {}
+            for i, bits in enumerate(predict):
+                for t in self._set(bits):
+                    table.setdefault(t, i)
+            name = self._table("D", repr(table))
+            self.emit(f"alt = {name}.get(tok, -1)")
+            for i, t in enumerate(expr.terms):
+                self.emit(f"{'if' if i == 0 else 'elif'} alt == {i}:")
+                self.block(lambda t=t: self.term(t))
+        self.emit("else:")
+        union = 0
+        for bits in predict:
+            union |= bits
+        self.block(lambda: self.error(union))
+
+    def production(self, p) -> None:
+        self.emit(f"def p_{p.identifier.value}():")
+        self.indent += 1
+        self.emit("nonlocal pos, tok")
+        self.expression(p.expression)
+        self.indent -= 1
+        self.emit("")
+
+    def module(self) -> str:
+        start = self.syntax.production[0].identifier.value
+        self.emit("def parse(tokens: Sequence[int]) -> None:")
+        self.indent += 1
+        self.emit('"""Recognize a sequence of terminal numbers."""')
+        self.emit("ids = list(tokens)")
+        self.emit("if not ids or ids[-1] != END:")
+        self.emit("    ids.append(END)")
+        self.emit("pos = 0")
+        self.emit("tok = ids[0]")
+        self.emit("")
+        for p in self.syntax.production:
+            self.production(p)
+        self.emit(f"p_{start}()")
+        self.emit("if tok != END:")
+        self.emit("    raise ParseError(pos, [END])")
+        self.indent -= 1
+
+        header = _HEADER.format(start=start, terminals=tuple(self.grammar.terminals))
+        parts = [header.rstrip(), "\n".join(self.tables), "\n".join(self.lines)]
+        return "\n\n\n".join(p for p in parts if p) + "\n"
+
+
+def generate(
+    syntax: ast.Syntax | fast_ast.Syntax, analysis: Analysis | None = None
+) -> str:
+    """Return the source of a parser module for `syntax`, using `analysis` if
+    it was already computed by `analyze(syntax)`. The grammar should be LL(1):
+    on a conflict, the first alternative wins, and a left-recursive grammar
+    gives a parser that does not terminate.
+    """
+    return _Generator(syntax, analysis or analyze(syntax)).module()
@@ -0,0 +1,225 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Packrat grammar interpreter
+
+An `Interpreter` checks a token stream against a grammar loaded at runtime,
+without generating code. The grammar is read as a parsing expression grammar:
+alternatives are tried in order and the first one that matches wins, options
+and repetitions are greedy. Every production call is memoized in a packrat
+table indexed by position, so backtracking over alternatives never parses the
+same production twice at the same position.
+
+Tokens are identified by their keys, as for the generated parsers (see
+`ebnf_compiler.generator` and `TokenBuffer.keys`): the text of a literal, or
+the name of a token class for an identifier without production.
+
+The memo table can be bounded (`max_memo` positions; the oldest are evicted and
+recomputed if needed). In streaming mode, the interpreter pulls tokens from an
+iterator and cuts the input each time a repetition completes an iteration with
+no other alternative pending: nothing before the cut can be backtracked to, so
+the tokens and memo entries behind it are dropped and memory stays flat.
+"""
+
+from collections.abc import Callable, Iterable
+
+from ebnf_compiler import ast0 as ast
+from ebnf_compiler import fast_ast
+from ebnf_compiler.analysis import analyze
+
+Match = Callable[[int], int]  # Position -> end position, or -1 on failure
+
+
+class ParseError(SyntaxError):
+    def __init__(self, position: int, found: str | None, expected: list[str]):
+        self.position = position  # Index of the offending token
+        self.found = found  # Its key, None at the end of the input
+        self.expected = expected
+        found = "end of input" if found is None else repr(found)
+        super().__init__(
+            f"Unexpected {found} at position {position},"
+            f" expected {' or '.join(expected)}"
+        )
+
+
+class Interpreter:
+    def __init__(
+        self, syntax: ast.Syntax | fast_ast.Syntax, max_memo: int | None = None
+    ):
+        recursion = analyze(syntax).left_recursion()
+        if recursion:
+            groups = "; ".join(", ".join(g) for g in recursion)
+            raise ValueError(f"Left-recursive grammar: {groups}")
+        self.max_memo = max_memo
+        self._index = {p.identifier.value: i for i, p in enumerate(syntax.production)}
+        self._bodies: list[Match] = []
+        self._bodies.extend(self._compile(p.expression) for p in syntax.production)
+        self._reset(iter(()), False)
+
+    def _reset(self, tokens, streaming: bool) -> None:
+        self._tokens = tokens
+        self._streaming = streaming
+        self._window: list[str | None] = []  # Tokens from position `_base`
+        self._base = 0
+        self._memo: dict[int, dict[int, int]] = {}  # Position -> production -> end
+        self._marks: list[int] = []  # Positions of the pending choice points
+        self._farthest = -1
+        self._found: str | None = None
+        self._expected: dict[str, None] = {}
+        # Statistics of the last parse
+        self.memo_hits = 0
+        self.memo_peak = 0  # Largest number of memoized positions
+        self.window_peak = 0  # Largest number of tokens held
+
+    # Input
+
+    def _token(self, pos: int) -> str | None:
+        """The key of the token at `pos`, None at the end of the input."""
+        i = pos - self._base
+        window = self._window
+        while i >= len(window):
+            window.append(next(self._tokens, None))
+        return window[i]
+
+    def _fail(self, pos: int, expected: str) -> None:
+        if pos > self._farthest:
+            self._farthest = pos
+            self._found = self._token(pos)
+            self._expected = {expected: None}
+        elif pos == self._farthest:
+            self._expected[expected] = None
+
+    def _cut(self, pos: int) -> None:
+        self.window_peak = max(self.window_peak, len(self._window))
+        del self._window[: pos - self._base]
+        self._base = pos
+        memo = self._memo
+        for p in [p for p in memo if p < pos]:
+            del memo[p]
+
+    def _store(self, pos: int, production: int, end: int) -> None:
+        memo = self._memo
+        entry = memo.get(pos)
+        if entry is None:
+            if self.max_memo is not None and len(memo) >= self.max_memo:
+                del memo[next(iter(memo))]
+            entry = memo[pos] = {}
+            self.memo_peak = max(self.memo_peak, len(memo))
+        entry[production] = end
+
+    # Grammar
+
+    def _compile(self, node) -> Match:  # noqa: PLR0911
+        """Turn an EBNF node into a matching function."""
+        if isinstance(node, ast.Term | fast_ast.Term):
+            return self._sequence([self._compile(f) for f in node.factors])
+        if isinstance(node, ast.Expression | fast_ast.Expression):
+            return self._choice([self._compile(t) for t in node.terms])
+        if isinstance(node, ast.Option | fast_ast.Option):
+            return self._option(self._compile(node.expr))
+        if isinstance(node, ast.Repetition | fast_ast.Repetition):
+            return self._repetition(self._compile(node.expr))
+        if isinstance(node, ast.Identifier | fast_ast.Identifier):
+            k = self._index.get(node.value)
+            if k is not None:
+                return self._call(k)
+            return self._terminal(node.value, node.value)
+        if isinstance(node, ast.Literal | fast_ast.Literal):
+            return self._terminal(node.value, f'"{node.value}"')
+        raise TypeError(f"Unexpected node {node!r}")
+
+    def _sequence(self, parts: list[Match]) -> Match:
+        if len(parts) == 1:
+            return parts[0]
+
+        def sequence(pos: int) -> int:
+            for part in parts:
+                pos = part(pos)
+                if pos < 0:
+                    break
+            return pos
+
+        return sequence
+
+    def _choice(self, alternatives: list[Match]) -> Match:
+        if len(alternatives) == 1:
+            return alternatives[0]
+
+        def choice(pos: int) -> int:
+            marks = self._marks
+            marks.append(pos)
+            for alternative in alternatives:
+                end = alternative(pos)
+                if end >= 0:
+                    break
+            marks.pop()
+            return end
+
+        return choice
+
+    def _option(self, body: Match) -> Match:
+        def option(pos: int) -> int:
+            marks = self._marks
+            marks.append(pos)
+            end = body(pos)
+            marks.pop()
+            return pos if end < 0 else end
+
+        return option
+
+    def _repetition(self, body: Match) -> Match:
+        def repetition(pos: int) -> int:
+            marks = self._marks
+            marks.append(pos)
+            while True:
+                end = body(pos)
+                if end <= pos:  # No match, or an empty one
+                    break
+                pos = marks[-1] = end
+                # No choice point before `pos` is left
+                if self._streaming and marks[0] == pos:
+                    self._cut(pos)
+            marks.pop()
+            return pos
+
+        return repetition
+
+    def _call(self, k: int) -> Match:
+        bodies = self._bodies
+
+        def call(pos: int) -> int:
+            entry = self._memo.get(pos)
+            if entry is not None:
+                end = entry.get(k)
+                if end is not None:
+                    self.memo_hits += 1
+                    return end
+            end = bodies[k](pos)
+            self._store(pos, k, end)
+            return end
+
+        return call
+
+    def _terminal(self, key: str, name: str) -> Match:
+        def terminal(pos: int) -> int:
+            if self._token(pos) == key:
+                return pos + 1
+            self._fail(pos, name)
+            return -1
+
+        return terminal
+
+    def parse(self, tokens: Iterable[str], streaming: bool = False) -> int:
+        """Match the token keys against the first production and return the
+        number of tokens. In streaming mode, `tokens` is consumed lazily and only
+        the part of it that can still be backtracked to is kept."""
+        self._reset(iter(tokens), streaming)
+        end = self._bodies[0](0)
+        self.window_peak = max(self.window_peak, len(self._window))
+        if end >= 0:
+            if self._token(end) is None:
+                return end
+            self._fail(end, "end of input")
+        raise ParseError(self._farthest, self._found, list(self._expected))
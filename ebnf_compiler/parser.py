@@ -6,18 +6,14 @@
 EBNF Parser
 """
 
-from loguru import logger
+import types
+
 from pydantic import BaseModel
 
-from ebnf_compiler.ast0 import (
-    Expression,
-    Factor,
-    Identifier,
-    Literal,
-    Production,
-    Syntax,
-    Term,
-)
+import ebnf_compiler.ast0
+import ebnf_compiler.fast_ast
+from compiler_common.instrument import trace_calls
+from ebnf_compiler.ast0 import Expression, Factor, Production, Syntax, Term
 from ebnf_compiler.scanner import Scanner
 from ebnf_compiler.tokens import Token
 
@@ -25,6 +21,17 @@ from ebnf_compiler.tokens import Token
 class Parser(BaseModel):
     scanner: Scanner
     has_error: bool = False
+    fast_ast: bool = False  # Build the tree from ebnf_compiler.fast_ast
+    trace: bool = False  # Log every rule (see compiler_common.instrument)
+
+    _ast: types.ModuleType | None = None
+
+    def model_post_init(self, context):
+        self._ast = ebnf_compiler.fast_ast if self.fast_ast else ebnf_compiler.ast0
+        if self.trace:
+            trace_calls(
+                self, ("factor", "term", "expression", "production", "syntax", "parse")
+            )
 
     def raise_error(self, msg: str) -> None:
         self.has_error = True
@@ -34,15 +41,14 @@ class Parser(BaseModel):
         self.raise_error(f"Expected '{expected}', but got '{self.scanner.sym}'")
 
     def factor(self) -> Factor:
-        logger.debug("Factor")
         sym = self.scanner.sym
         ident = self.scanner.value
         if sym == Token.IDENT:
             self.scanner.get_next_symbol()
-            return Identifier(value=ident)
+            return self._ast.Identifier(value=ident)
         elif sym == Token.LITERAL:
             self.scanner.get_next_symbol()
-            return Literal(value=ident)
+            return self._ast.Literal(value=ident)
         elif sym == Token.LPAREN:
             self.scanner.get_next_symbol()
             expr: Expression = self.expression()
@@ -57,23 +63,21 @@ class Parser(BaseModel):
             if self.scanner.sym != Token.RBRAK:
                 self.raise_expected_error(Token.RBRAK)
             self.scanner.get_next_symbol()
-            return expr
+            return self._ast.Option(expr=expr)
         elif sym == Token.LBRACE:
             self.scanner.get_next_symbol()
             expr = self.expression()
             if self.scanner.sym != Token.RBRACE:
                 self.raise_expected_error(Token.RBRACE)
             self.scanner.get_next_symbol()
-            return expr
+            return self._ast.Repetition(expr=expr)
         else:
             self.raise_error(
                 f"Expected identifier, literal, (', '['. or '{{' got {sym}"
             )
 
     def term(self) -> Term:
-        logger.debug("Term")
-
-        ter: Term = Term(factors=[])
+        ter: Term = self._ast.Term(factors=[])
         ter.factors.append(self.factor())
         while self.scanner.sym in (
             Token.IDENT,
@@ -86,9 +90,7 @@ class Parser(BaseModel):
         return ter
 
     def expression(self) -> Expression:
-        logger.debug("Expression")
-
-        expr: Expression = Expression(terms=[])
+        expr: Expression = self._ast.Expression(terms=[])
         expr.terms.append(self.term())
 
         while self.scanner.sym == Token.BAR:
@@ -97,8 +99,6 @@ class Parser(BaseModel):
         return expr
 
     def production(self) -> Production:
-        logger.debug("Production")
-
         ident = self.scanner.value
 
         self.scanner.get_next_symbol()
@@ -112,20 +112,22 @@ class Parser(BaseModel):
             self.raise_expected_error(Token.PERIOD)
         self.scanner.get_next_symbol()
 
-        return Production(identifier=Identifier(value=ident), expression=expr)
+        return self._ast.Production(
+            identifier=self._ast.Identifier(value=ident), expression=expr
+        )
 
     def syntax(self) -> Syntax:
-        logger.debug("Syntax")
-        syn: Syntax = Syntax(production=[])
+        productions: list[Production] = []
+        defined: set[str] = set()
         while self.scanner.sym != Token.EOF:
             if self.scanner.sym != Token.IDENT:
                 self.raise_expected_error(Token.IDENT)
-            syn.production.append(self.production())
-        return syn
+            if self.scanner.value in defined:
+                self.raise_error(f"Symbol {self.scanner.value} already defined")
+            defined.add(self.scanner.value)
+            productions.append(self.production())
+        return self._ast.Syntax(production=productions)
 
     def parse(self) -> Syntax:
-        logger.debug("Parsing")
         self.scanner.get_next_symbol()
-        syn = self.syntax()
-        print(syn)
-        return syn
+        return self.syntax()
@@ -6,28 +6,56 @@
 EBNF Scanner
 """
 
+import bisect
+import re
 import typing
 from pathlib import Path
 
-import typer
 from loguru import logger
 from pydantic import BaseModel
-from rich import print
 
+from compiler_common.instrument import trace_results
+from compiler_common.token_buffer import TokenBuffer
 from ebnf_compiler.tokens import Token
 
+# A single match skips the leading white space and recognizes one token. The
+# index of the group that matched tells the kind of the token; no group at all
+# means that the end of the source has been reached.
+_TOKEN_RE = re.compile(r'\s*(?:([^\W\d_]+)|"([^"]*)"|(\(\*)|(")|(.))?', re.DOTALL)
+_IDENT, _LITERAL, _COMMENT, _QUOTE, _CHAR = range(1, 6)
+
+
+def skip_comment(src: str, pos: int) -> int:
+    """Return the offset just after the (possibly nested) comment whose opening
+    `(*` ends at `pos`, or -1 if the comment is not terminated."""
+    depth = 1
+    while depth > 0:
+        close = src.find("*)", pos)
+        if close < 0:
+            return -1
+        nested = src.find("(*", pos, close)
+        if nested >= 0:
+            depth += 1
+            pos = nested + 2
+        else:
+            depth -= 1
+            pos = close + 2
+    return pos
+
 
 class Scanner(BaseModel):
     eof: bool = False
     sym: Token | None = None  # Next Symbol
     value: str = ""
+    trace: bool = False  # Log every token (see compiler_common.instrument)
 
-    _ch: str = ""
     _file_name: Path | None = None
-    _text: typing.TextIO | None = None
-    _text_line: str = ""
-    _line_no: int = 0
-    _col_no: int = 0
+    _src: str = ""
+    _pos: int = 0  # Offset of the first character after the current symbol
+    _start: int = 0  # Offset of the current symbol
+    _line_starts: list[int] | None = None
+    _buffer: TokenBuffer | None = None  # Replayed instead of the source
+    _index: int = -1  # Of the current symbol in `_buffer`
 
     token_map: typing.ClassVar[dict[str, Token]] = {
         "=": Token.EQL,
@@ -41,104 +69,152 @@ class Scanner(BaseModel):
         ".": Token.PERIOD,
     }
 
+    def model_post_init(self, context):
+        if self.trace:
+            trace_results(
+                self,
+                "get_next_symbol",
+                lambda: f"Token: {self.sym}, Value: {self.value}",
+            )
+
     def open(self, file_name: Path) -> None:
-        logger.debug(f"Opening {file_name}")
-        self._file_name = file_name
+        logger.debug("Opening {}", file_name)
         try:
-            self._text = self._file_name.open("r")
+            text = file_name.read_text()
         except Exception:
+            import typer
+            from rich import print
+
             print(f"[bold red]Error: Source file '{file_name}' not found[/bold red]")
             raise typer.Exit(code=1) from None
-        self.get_next_char()
-
-    def raise_error(self, msg: str) -> None:
+        self.open_text(text, file_name)
+
+    def open_text(self, text: str, file_name: Path | None = None) -> None:
+        """Scan `text`. The whole source is kept in memory and the scanner only
+        moves an offset over it."""
+        self.eof = False
+        self.sym = None
+        self.value = ""
+        self._file_name = file_name
+        self._src = text
+        self._pos = 0
+        self._start = 0
+        self._line_starts = None
+        self._buffer = None
+
+    def location(self, offset: int | None = None) -> tuple[int, int]:
+        """Return the line and the column (both starting at 1) of `offset`, by
+        default of the current symbol."""
+        if offset is None:
+            offset = self._start
+        if self._line_starts is None:
+            self._line_starts = [0, *(m.end() for m in re.finditer("\n", self._src))]
+        line = bisect.bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1] + 1
+
+    def raise_error(self, msg: str, offset: int | None = None) -> None:
         logger.error(msg)
-        raise SyntaxError(
-            msg, (self._file_name, self._line_no, self._col_no, self._text_line)
-        )
-
-    def skip_space(self) -> None:
-        while self._ch.isspace():
-            self.get_next_char()
-
-    def get_next_char(self) -> None:
-        while not self.eof and self._text_line == "":
-            self._text_line = self._text.readline()
-            self._line_no += 1
-            self._col_no = 0
-            if self._text_line == "":
-                self.eof = True
-                break
-            self._text_line = self._text_line.rstrip()
-        if self.eof:
-            self._ch = ""
-        else:
-            assert self._text_line != ""
-            self._ch = self._text_line[0]
-            self._text_line = self._text_line[1:]
-            self._col_no += 1
-
-    def skip_comment(self) -> None:
-        # check for comments and skip them (* ... *)
-        com_col: int = self._col_no
-        com_line: int = self._line_no
-        logger.debug(f"Skipping comment at line {com_line} and column {com_col}")
-        self.get_next_char()
-        while not self.eof:
-            if self._ch == "(":
-                self.get_next_char()
-                if self._ch == "*":
-                    self.skip_comment()
-            if self._ch == "*":
-                self.get_next_char()
-                if self._ch == ")":
-                    break
-            self.get_next_char()
-        if self.eof:
-            self.raise_error(
-                f"Unterminated comment at line {com_line} and column {com_col}"
-            )
-        self.get_next_char()
+        line_no, col_no = self.location(offset)
+        start = self._line_starts[line_no - 1]
+        end = self._src.find("\n", start)
+        text_line = self._src[start : end if end >= 0 else len(self._src)]
+        raise SyntaxError(msg, (self._file_name, line_no, col_no, text_line.rstrip()))
+
+    def _match(self, pos: int) -> re.Match:
+        """Match the next token at `pos`, skipping comments."""
+        src = self._src
+        m = _TOKEN_RE.match(src, pos)
+        while m.lastindex == _COMMENT:
+            logger.debug("Skipping comment at offset {}", m.start(_COMMENT))
+            pos = skip_comment(src, m.end())
+            if pos < 0:
+                line_no, col_no = self.location(m.start(_COMMENT))
+                self.raise_error(
+                    f"Unterminated comment at line {line_no} and column {col_no}",
+                    m.start(_COMMENT),
+                )
+            m = _TOKEN_RE.match(src, pos)
+        return m
 
     def get_next_symbol(self):
-        self.skip_space()
-
-        if self._ch.isalpha():
+        if self._buffer is not None:
+            self._next_replayed()
+            return
+        m = self._match(self._pos)
+        kind = m.lastindex
+        self._start = m.start(kind) if kind else m.end()
+        self._pos = m.end()
+        if kind == _IDENT:
             self.sym = Token.IDENT
-            self.value = self._ch
-            self.get_next_char()
-            while self._ch.isalpha():
-                self.value += self._ch
-                self.get_next_char()
-
-        elif self._ch == '"':
+            self.value = m.group(_IDENT)
+        elif kind == _LITERAL:
             self.sym = Token.LITERAL
-            self.value = ""
-            self.get_next_char()
-            while not self.eof and self._ch != '"':
-                self.value += self._ch
-                self.get_next_char()
-            if self.eof:
-                self.error("Unterminated literal")
-            self.get_next_char()
-        elif self._ch == "":
+            self.value = m.group(_LITERAL)
+        elif kind == _QUOTE:
+            self.raise_error("Unterminated literal")
+        elif kind == _CHAR:
+            self.value = m.group(_CHAR)
+            self.sym = self.token_map.get(self.value, Token.OTHER)
+        else:
+            self.eof = True
             self.sym = Token.EOF
             self.value = ""
-        elif self._ch == "(":
-            self.get_next_char()
-            if self._ch == "*":
-                self.skip_comment()
-                self.get_next_symbol()
+
+    def tokenize(self) -> TokenBuffer:
+        """Scan the rest of the source into a `TokenBuffer`, up to and including
+        `Token.EOF`. The scanner is left at the end of the source."""
+        src = self._src
+        token_map = self.token_map
+        buf = TokenBuffer(Token, src)
+        kinds = buf.kinds.append
+        starts = buf.starts.append
+        ends = buf.ends.append
+        value_ids = buf.value_ids.append
+        intern = buf.intern
+        pos = self._pos
+        while True:
+            m = self._match(pos)
+            kind = m.lastindex
+            start = m.start(kind) if kind else m.end()
+            pos = m.end()
+            if kind == _IDENT:
+                sym = Token.IDENT
+                value = m.group(_IDENT)
+            elif kind == _LITERAL:
+                sym = Token.LITERAL
+                value = m.group(_LITERAL)
+            elif kind == _QUOTE:
+                self.raise_error("Unterminated literal", start)
+            elif kind == _CHAR:
+                value = m.group(_CHAR)
+                sym = token_map.get(value, Token.OTHER)
             else:
-                self.sym = Token.LPAREN
-                self.value = self._ch
-                return
-        elif self._ch in self.token_map:
-            self.sym = self.token_map[self._ch]
-            self.value = self._ch
-            self.get_next_char()
-        else:
-            self.sym = Token.OTHER
-            self.value = self._ch
-            self.get_next_char()
-        logger.debug(f"Token: {self.sym}, Value: {self.value}")
+                break
+            kinds(sym.value)
+            starts(start)
+            ends(pos)
+            value_ids(intern(value))
+        buf.append(Token.EOF, start, start)
+        self._start = self._pos = start
+        self.eof = True
+        self.sym = Token.EOF
+        self.value = ""
+        return buf
+
+    def replay(self, buffer: TokenBuffer) -> None:
+        """Read the tokens of `buffer` (from `tokenize`) instead of scanning
+        the source again, so that scanning and parsing can be timed apart."""
+        self.open_text(buffer.source, self._file_name)
+        self._buffer = buffer
+        self._index = -1
+
+    def _next_replayed(self) -> None:
+        buffer = self._buffer
+        if self._index < len(buffer) - 1:
+            self._index += 1
+        i = self._index
+        self.sym = buffer.kind(i)
+        self.value = buffer.value(i)
+        self._start = buffer.starts[i]
+        self._pos = buffer.ends[i]
+        self.eof = self.sym == Token.EOF
@@ -7,27 +7,30 @@ AST Statistics
 """
 
 import ebnf_compiler.ast0 as ast
+from ebnf_compiler import fast_ast
 
 
-def symbols(root: ast.Syntax) -> tuple[set[str], set[str]]:  # noqa: C901
+def symbols(  # noqa: C901
+    root: ast.Syntax | fast_ast.Syntax,
+) -> tuple[set[str], set[str]]:
     non_terminals: set[str] = set()
     terminals: set[str] = set()
 
-    def term(node: ast.Term):
+    def term(node: ast.Term | fast_ast.Term):
         for f in node.factors:
-            if isinstance(f, ast.Identifier):
+            if isinstance(f, ast.Identifier | fast_ast.Identifier):
                 if f.value not in root.symbols:
                     terminals.add(f.value)
-            elif isinstance(f, ast.Literal):
+            elif isinstance(f, ast.Literal | fast_ast.Literal):
                 terminals.add(f.value)
-            elif isinstance(f, ast.Expression):
+            elif isinstance(f, ast.Expression | fast_ast.Expression):
                 expression(f)
-            elif isinstance(f, ast.Option):
+            elif isinstance(f, ast.Option | fast_ast.Option):
                 expression(f.expr)
-            elif isinstance(f, ast.Repetition):
+            elif isinstance(f, ast.Repetition | fast_ast.Repetition):
                 expression(f.expr)
 
-    def expression(node: ast.Expression):
+    def expression(node: ast.Expression | fast_ast.Expression):
         for t in node.terms:
             term(t)
 
@@ -36,3 +39,24 @@ def symbols(root: ast.Syntax) -> tuple[set[str], set[str]]:  # noqa: C901
         non_terminals.add(p.identifier.value)
 
     return non_terminals, terminals
+
+
+def nodes(root: ast.Syntax | fast_ast.Syntax) -> int:
+    """Number of nodes of the tree."""
+    count = 1
+    stack: list = [root.production]
+    while stack:
+        for node in stack.pop():
+            count += 1
+            if isinstance(node, ast.Production | fast_ast.Production):
+                stack.append((node.identifier, node.expression))
+            elif isinstance(node, ast.Expression | fast_ast.Expression):
+                stack.append(node.terms)
+            elif isinstance(node, ast.Term | fast_ast.Term):
+                stack.append(node.factors)
+            elif isinstance(
+                node,
+                ast.Option | ast.Repetition | fast_ast.Option | fast_ast.Repetition,
+            ):
+                stack.append((node.expr,))
+    return count
@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+from ebnf_compiler.analysis import analyze
+from ebnf_compiler.parser import Parser
+from ebnf_compiler.scanner import Scanner
+
+
+def parse(src: str):
+    scanner = Scanner()
+    scanner.open_text(src)
+    return Parser(scanner=scanner, fast_ast=True).parse()
+
+
+def test_first_follow():
+    result = analyze(
+        parse(
+            """
+            expression = term { ( "+" | "-" ) term }.
+            term = factor { "*" factor }.
+            factor = [ "-" ] ( number | "(" expression ")" ).
+            """
+        )
+    )
+    assert not result.is_nullable("expression")
+    assert result.is_nullable("factor[1]")
+    assert result.first_set("expression") == {'"-"', "number", '"("'}
+    assert result.follow_set("expression") == {"$", '")"'}
+    assert result.follow_set("term") == {"$", '")"', '"+"', '"-"'}
+    assert result.follow_set("factor") == {"$", '")"', '"+"', '"-"', '"*"'}
+    assert result.is_ll1()
+
+
+def test_conflicts():
+    result = analyze(
+        parse(
+            """
+            statement = ident ":=" ident | ident "(" ")" | block.
+            block = "begin" [ statement ] { ";" [ statement ] } "end".
+            list = [ "a" ] "a".
+            """
+        )
+    )
+    conflicts = {(c.symbol, c.alternatives): c.terminals for c in result.conflicts()}
+    assert conflicts == {
+        ("statement", (0, 1)): ["ident"],
+        ("list[1]", (0, 1)): ['"a"'],
+    }
+    assert not result.left_recursion()
+
+
+def test_left_recursion():
+    result = analyze(
+        parse(
+            """
+            e = t | e "+" t.
+            t = [ "-" ] u.
+            u = t "*" | "x".
+            r = { [ "x" ] }.
+            """
+        )
+    )
+    assert sorted(result.left_recursion()) == [["e"], ["r{1}"], ["t", "u"]]
+    assert not result.is_ll1()
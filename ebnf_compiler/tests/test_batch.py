@@ -0,0 +1,25 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+from ebnf_compiler.batch import collect_sources, run_batch
+
+
+def test_batch(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.ebnf").write_text('a = b { "x" }.\nb = "y" | "z".\n')
+    (tmp_path / "sub" / "b.ebnf").write_text('b = "y" | "z".\n')
+    (tmp_path / "sub" / "c.ebnf").write_text('c = "y" | .\n')
+
+    paths = collect_sources([str(tmp_path / "*.ebnf"), str(tmp_path)])
+    assert [p.relative_to(tmp_path).as_posix() for p in paths] == [
+        "a.ebnf",
+        "sub/b.ebnf",
+        "sub/c.ebnf",
+    ]
+
+    a, b, c = run_batch(paths, jobs=2)
+    assert (a.ok, a.productions, a.non_terminals, a.terminals) == (True, 2, 2, 3)
+    assert b.ok
+    assert not c.ok
+    assert str(c).startswith(f"error {paths[2]}: Expected identifier")
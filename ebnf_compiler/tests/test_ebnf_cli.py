@@ -0,0 +1,18 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+from typer.testing import CliRunner
+
+from ebnf_compiler import app
+
+
+def test_default_command(tmp_path):
+    source = tmp_path / "a.ebnf"
+    source.write_text('a = "x" { "y" }.\n')
+    runner = CliRunner()
+    assert runner.invoke(app, [str(source), "--quiet"]).exit_code == 0
+    assert runner.invoke(app, ["main", str(source), "--quiet"]).exit_code == 0
+    result = runner.invoke(app, ["batch", str(source)])
+    assert result.exit_code == 0
+    assert "1 ok" in result.output
@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import types
+
+import pytest
+
+from ebnf_compiler.generator import generate
+from ebnf_compiler.parser import Parser
+from ebnf_compiler.scanner import Scanner
+from ebnf_compiler.tokens import Token
+
+EBNF = """
+syntax = { production }.
+production = identifier "=" expression ".".
+expression = term { "|" term }.
+term = factor { factor }.
+factor = identifier | literal | "(" expression ")" | "[" expression "]"
+    | "{" expression "}".
+"""
+
+CLASSES = {Token.IDENT: "identifier", Token.LITERAL: "literal"}
+
+
+def load(src: str) -> types.ModuleType:
+    scanner = Scanner()
+    scanner.open_text(src)
+    module = types.ModuleType("generated")
+    code = generate(Parser(scanner=scanner, fast_ast=True).parse())
+    exec(compile(code, "generated", "exec"), module.__dict__)
+    return module
+
+
+def keys(src: str) -> list[str]:
+    scanner = Scanner()
+    scanner.open_text(src)
+    return scanner.tokenize().keys(CLASSES)
+
+
+def test_self_hosting():
+    parser = load(EBNF)
+    parser.parse_keys(keys(EBNF))
+    parser.parse_keys([])
+
+
+def test_errors():
+    parser = load(EBNF)
+    with pytest.raises(parser.ParseError) as e:
+        parser.parse_keys(keys('a = "x" | .'))
+    assert (e.value.position, e.value.expected) == (
+        4,
+        ["identifier", "literal", "(", "[", "{"],
+    )
+
+    with pytest.raises(parser.ParseError) as e:
+        parser.parse_keys(keys('a = "x"'))
+    assert e.value.expected == ["."]
+
+
+def test_options():
+    parser = load('s = [ "a" ] { "b" | "c" } ( "d" | e ).')
+    for src in ["d", "e", "a d", "b c b e", "a c d"]:
+        parser.parse_keys(src.split())
+    with pytest.raises(parser.ParseError):
+        parser.parse_keys(["a", "a", "d"])
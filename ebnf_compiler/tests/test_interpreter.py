@@ -0,0 +1,61 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import pytest
+
+from ebnf_compiler.interpreter import Interpreter, ParseError
+from ebnf_compiler.parser import Parser
+from ebnf_compiler.scanner import Scanner
+
+GRAMMAR = """
+program = { statement }.
+statement = designator ":=" designator ";" | designator "(" ")" ";".
+designator = ident { "." ident }.
+"""
+
+ASSIGN = "ident . ident := ident ;".split()
+CALL = "ident . ident ( ) ;".split()
+
+
+def parse(src: str, fast_ast: bool = True):
+    scanner = Scanner()
+    scanner.open_text(src)
+    return Parser(scanner=scanner, fast_ast=fast_ast).parse()
+
+
+@pytest.mark.parametrize("fast_ast", [False, True])
+def test_backtracking(fast_ast):
+    interpreter = Interpreter(parse(GRAMMAR, fast_ast))
+    tokens = (CALL + ASSIGN) * 3
+    assert interpreter.parse(tokens) == len(tokens)
+    # The designator of each call, and the missing one at the end of the input,
+    # are matched once for both alternatives
+    assert interpreter.memo_hits == len(tokens) // len(CALL + ASSIGN) + 1
+
+
+def test_errors():
+    interpreter = Interpreter(parse(GRAMMAR))
+    with pytest.raises(ParseError) as e:
+        interpreter.parse([*ASSIGN, "ident", "(", ";"])
+    assert (e.value.position, e.value.found) == (len(ASSIGN) + 2, ";")
+    assert e.value.expected == ['")"']
+
+    with pytest.raises(ValueError, match="Left-recursive"):
+        Interpreter(parse('a = a "x" | "y".'))
+
+
+def test_streaming():
+    interpreter = Interpreter(parse(GRAMMAR))
+    size = 1000
+    tokens = (t for _ in range(size) for t in CALL + ASSIGN)
+    assert interpreter.parse(tokens, streaming=True) == size * len(CALL + ASSIGN)
+    assert interpreter.window_peak <= len(CALL) + 1
+    assert interpreter.memo_peak <= len(CALL) + 1
+
+
+def test_bounded_memo():
+    interpreter = Interpreter(parse(GRAMMAR), max_memo=2)
+    tokens = (CALL + ASSIGN) * 100
+    assert interpreter.parse(tokens) == len(tokens)
+    assert interpreter.memo_peak == 2  # noqa: PLR2004
@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ebnf_compiler import ast0, stat
+from ebnf_compiler.parser import Parser
+from ebnf_compiler.scanner import Scanner
+
+GRAMMAR = """
+(* EBNF in EBNF *)
+syntax = { production }.
+production = identifier "=" expression ".".
+expression = term { "|" term }.
+term = factor { factor }.
+factor = identifier | literal | "(" expression ")"
+       | "[" expression "]" | "{" expression "}".
+"""
+
+
+def parse(src: str, fast_ast: bool = False):
+    scanner = Scanner()
+    scanner.open_text(src)
+    return Parser(scanner=scanner, fast_ast=fast_ast).parse()
+
+
+def test_option_and_repetition():
+    syntax = parse('a = [ "x" ] { b | "y" } ( c ).', fast_ast=True)
+    assert str(syntax) == 'a = [ "x" ] { b | "y" } ( c ).'
+
+
+def test_fast_ast_same_output():
+    fast = parse(GRAMMAR, fast_ast=True)
+    model = fast.to_model()
+    assert type(model) is ast0.Syntax
+    assert str(model) == str(fast)
+    assert set(fast.symbols) == {
+        "syntax",
+        "production",
+        "expression",
+        "term",
+        "factor",
+    }
+
+
+def test_many_grammars_in_one_process():
+    first = parse(GRAMMAR)
+    second = parse('syntax = "a" { "b" }.')
+    assert set(first.symbols) == {
+        "syntax",
+        "production",
+        "expression",
+        "term",
+        "factor",
+    }
+    assert set(second.symbols) == {"syntax"}
+    assert stat.symbols(second) == ({"syntax"}, {"a", "b"})
+
+
+def test_concurrent_parsing():
+    names = [f"{chr(97 + i // 26)}{chr(97 + i % 26)}" for i in range(64)]
+    sources = [f'p{n} = q{n} | "{n}".\nq{n} = {{ "x" }}.' for n in names]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(parse, sources))
+    for n, syntax in zip(names, results, strict=True):
+        assert set(syntax.symbols) == {f"p{n}", f"q{n}"}
+
+
+def test_duplicate_production():
+    with pytest.raises(SyntaxError) as e:
+        parse('a = "x".\nb = a.\na = "y".')
+    assert e.value.msg == "Symbol a already defined"
+    assert (e.value.lineno, e.value.offset) == (3, 1)
@@ -4,75 +4,231 @@
 
 """
 Oberon-0 compiler
+
+`main` compiles a source to a WASM file, and `run` compiles it in memory and
+runs one of its commands with `oberon0_runtime`, in the same process. Each
+command imports what it needs: when the module of `run` is in the cache,
+neither the parser nor pydantic is imported. The classes of `__all__` are
+imported on first use.
 """
 
+import importlib
 import sys
 from pathlib import Path
 from typing import Annotated
 
 import typer
-from loguru import logger
-from rich.console import Console
-from rich.panel import Panel
-from rich.pretty import Pretty
 
-from oberon0_compiler import ast
-from oberon0_compiler.parser import Parser
-from oberon0_compiler.scanner import Scanner
-from oberon0_compiler.token import Token
+from compiler_common.cli import DefaultCommandGroup
+from oberon0_runtime.cache import OptLevel
+from oberon0_runtime.options import (
+    Cache,
+    CacheDir,
+    Fuel,
+    InputFormat,
+    Metrics,
+    Opt,
+    ParallelCompile,
+    Timeout,
+)
+
+__all__ = ["CodeGenerator", "Parser", "Scanner", "SemanticError", "Token", "ast"]
+
+# Name: module
+_EXPORTS = {
+    "CodeGenerator": "code_gen",
+    "Parser": "parser",
+    "Scanner": "scanner",
+    "SemanticError": "code_gen",
+    "Token": "tokens",
+    "ast": "ast",
+}
+
+app = typer.Typer(cls=DefaultCommandGroup)
+
+Source = Annotated[Path, typer.Argument(help="Oberon-0 source file (.mod)")]
+BufferedOutput = Annotated[
+    bool, typer.Option(help="Batch WriteInt and WriteChar through WriteBuffer")
+]
+Optimize = Annotated[
+    bool,
+    typer.Option(
+        help="Fold the constants, remove the dead code and keep the variables"
+        " of the procedures in WASM locals"
+    ),
+]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"oberon0_compiler.{_EXPORTS[name]}")
+    return module if name == "ast" else getattr(module, name)
+
+
+def _configure_logging(debug: bool, debug_scanner: bool, debug_parser: bool) -> None:
+    from loguru import logger
+
+    logger.remove()
+
+    level_per_module = {"": "INFO", "oberon0_compiler.code_gen": "INFO"}
 
-__all__ = ["Parser", "Scanner", "Token", "ast"]
+    if debug:
+        level_per_module[""] = "DEBUG"
+    if debug_scanner:
+        level_per_module["oberon0_compiler.scanner"] = "DEBUG"
+    if debug_parser:
+        level_per_module["oberon0_compiler.parser"] = "DEBUG"
 
-console = Console()
-app = typer.Typer()
+    logger.add(sys.stdout, filter=level_per_module, level=0)
 
 
 @app.command(context_settings={"ignore_unknown_options": False})
-def main(
-    source: Annotated[Path, typer.Argument(help="Oberon-0 source file (.mod)")],
+def main(  # noqa: C901, PLR0913, PLR0915
+    source: Source,
+    output: Annotated[
+        Path | None,
+        typer.Option("--output", "-o", help="WASM file (default: SOURCE.wasm)"),
+    ] = None,
+    buffered_output: BufferedOutput = True,
+    optimize: Optimize = True,
     debug: bool = False,
     debug_scanner: bool = False,
     debug_parser: bool = False,
     show_tree: bool = False,
+    profile: Annotated[
+        bool, typer.Option(help="Report the time and memory of each phase")
+    ] = False,
 ):
     """
-    Oberon-0 compiler
+    Compile an Oberon-0 module to a WASM file
     """
+    from rich.console import Console
+    from rich.panel import Panel
+    from rich.pretty import Pretty
+    from rich.text import Text
 
-    logger.remove()
-
-    level_per_module = {"": "INFO", "oberon0_compiler.code_gen": "INFO"}
-
-    if debug:
-        level_per_module[""] = "DEBUG"
-    if debug_scanner:
-        level_per_module["oberon0_compiler.scanner"] = "DEBUG"
-    if debug_parser:
-        level_per_module["oberon0_compiler.parser"] = "DEBUG"
+    from compiler_common.instrument import Profiler, count_models
+    from oberon0_compiler.build import error_message
+    from oberon0_compiler.code_gen import CodeGenerator, SemanticError
+    from oberon0_compiler.parser import Parser
+    from oberon0_compiler.scanner import Scanner
 
-    logger.add(sys.stdout, filter=level_per_module, level=0)
+    console = Console()
+    _configure_logging(debug, debug_scanner, debug_parser)
 
+    scanner = Scanner(trace=debug or debug_scanner)
     try:
-        f = open(source)
+        with open(source) as f:
+            scanner.open(f)
     except FileNotFoundError:
         print(f"File {source} not found")
-        typer.Exit(code=1)
-
-    scanner = Scanner()
-    scanner.open(f)
-    parser = Parser(scanner=scanner)
+        raise typer.Exit(code=1) from None
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Cannot read {source}: {e}")
+        raise typer.Exit(code=1) from None
+    parser = Parser(scanner=scanner, trace=debug or debug_parser)
+
+    with Profiler(profile) as profiler:
+        try:
+            if profile:
+                # Scan first, so that the parse phase does not include it
+                with profiler.phase("scan"):
+                    tokens = scanner.tokenize()
+                profiler.count("tokens", len(tokens))
+                scanner.replay(tokens)
+            with profiler.phase("parse"):
+                ast = parser.parse()
+        except SyntaxError as e:  # From the scanner, before the parse
+            parser.errors.append(e)
+
+        if parser.has_error:
+            for e in parser.errors:
+                print(error_message(e))
+            print(f"{len(parser.errors)} syntax errors. aborting")
+            raise typer.Exit(code=1)
+        if profile:
+            profiler.count("nodes", count_models(ast))
+
+        if show_tree:
+            with profiler.phase("print"):
+                console.print(Panel(Pretty(ast, indent_size=2), title="Syntax Tree"))
+
+        try:
+            with profiler.phase("generate"):
+                code = CodeGenerator(buffered_output, optimize).generate(ast)
+        except SemanticError as e:
+            print(f"{e} (File {source})")
+            raise typer.Exit(code=1) from None
+        profiler.count("bytes", len(code))
+        (output or source.with_suffix(".wasm")).write_bytes(code)
+
+    if profile:
+        console.print(Panel(Text(str(profiler)), title="Profile"))
+
+
+@app.command()
+def run(  # noqa: PLR0913
+    source: Source,
+    command: Annotated[str, typer.Argument()],
+    numbers: Annotated[list[int] | None, typer.Argument()] = None,
+    input: Annotated[
+        Path | None,
+        typer.Option(help="Read the input from a file ('-' for the standard input)"),
+    ] = None,
+    input_format: Annotated[
+        InputFormat, typer.Option(help="Format of the --input file")
+    ] = InputFormat.TEXT,
+    buffered_output: BufferedOutput = True,
+    optimize: Optimize = True,
+    cache_dir: CacheDir = None,
+    cache: Cache = True,
+    opt_level: Opt = OptLevel.SPEED,
+    parallel_compile: ParallelCompile = True,
+    fuel: Fuel = None,
+    timeout: Timeout = None,
+    metrics: Metrics = False,
+    debug: bool = False,
+):
+    """
+    Compile an Oberon-0 module in memory and run one of its commands, like
+    `oberon0-rt main` does with a WASM file. Compiled modules are cached by
+    the SHA-256 of their source.
+    """
+    from oberon0_compiler.build import CompileError, load_module
+    from oberon0_runtime import (
+        enable_debug_logging,
+        engine_options,
+        execute,
+        fail,
+        open_input,
+    )
+    from oberon0_runtime.cache import ModuleCache
+    from oberon0_runtime.context import ReturnCode
+    from oberon0_runtime.limits import RunLimits
 
+    if debug:
+        enable_debug_logging()
+    input_source = open_input(numbers, input, input_format)
+    limits = RunLimits(fuel=fuel, timeout=timeout, metrics=metrics)
+    options = engine_options(opt_level, parallel_compile, limits)
+    engine = options.engine()
     try:
-        ast = parser.parse()
-    except SyntaxError as e:
-        print(f"{e.msg} (File {e.filename}, Line {e.lineno}, Column {e.offset})")
-
-    if parser.has_error:
-        print("Syntax errors. aborting")
-        raise typer.Exit(code=1)
-
-    if show_tree:
-        console.print(Panel(Pretty(ast, indent_size=2), title="Syntax Tree"))
+        module = load_module(
+            engine,
+            source,
+            options,
+            ModuleCache(cache_dir) if cache else None,
+            buffered_output,
+            optimize,
+        )
+    except FileNotFoundError:
+        fail(f"Source file '{source}' not found", ReturnCode.FILE_NOT_FOUND)
+    except (OSError, UnicodeDecodeError) as e:
+        fail(f"cannot read source '{source}': {e}", ReturnCode.FILE_NOT_FOUND)
+    except CompileError as e:
+        fail(str(e), ReturnCode.COMPILE_ERROR)
+    execute(engine, module, command, input_source, limits, debug)
 
 
 if __name__ == "__main__":
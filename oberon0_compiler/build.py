@@ -0,0 +1,94 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Compilation of Oberon-0 sources in memory
+
+`compile_source` turns the text of a module into the bytes of a WASM module,
+that wasmtime compiles without a file in between. `load_module` caches the
+native code in a `ModuleCache`, under a key made of the SHA-256 of the source,
+of the compiler and of the engine options: a source that did not change is
+neither parsed nor compiled again, and the parser (with pydantic) is not even
+imported.
+"""
+
+import functools
+import hashlib
+import io
+from pathlib import Path
+from typing import TextIO
+
+from wasmtime import Engine, Module
+
+from oberon0_runtime.cache import EngineOptions, ModuleCache
+
+
+class CompileError(Exception):
+    """The errors of a source, one per line."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+def error_message(e: SyntaxError) -> str:
+    return f"{e.msg} (File {e.filename}, Line {e.lineno}, Column {e.offset})"
+
+
+@functools.cache
+def fingerprint() -> str:
+    """SHA-256 of the source files of the compiler, so that cached modules are
+    compiled again when the compiler changes."""
+    h = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("*.py")):
+        h.update(path.name.encode() + b"\0")
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def compile_source(
+    source: TextIO, buffered_output: bool = True, optimize: bool = True
+) -> bytes:
+    """The WASM module of `source`. Raise `CompileError` with all the syntax
+    errors, or the first semantic error."""
+    from oberon0_compiler.code_gen import CodeGenerator, SemanticError
+    from oberon0_compiler.parser import Parser
+    from oberon0_compiler.scanner import Scanner
+
+    scanner = Scanner()
+    scanner.open(source)
+    parser = Parser(scanner=scanner)
+    try:
+        tree = parser.parse()
+    except SyntaxError as e:  # From the scanner, before the parse
+        parser.errors.append(e)
+    if parser.has_error:
+        raise CompileError([error_message(e) for e in parser.errors])
+    try:
+        return CodeGenerator(buffered_output, optimize).generate(tree)
+    except SemanticError as e:
+        raise CompileError([f"{e} (File {getattr(source, 'name', None)})"]) from None
+
+
+def load_module(  # noqa: PLR0913
+    engine: Engine,
+    path: Path,
+    options: EngineOptions,
+    cache: ModuleCache | None = None,
+    buffered_output: bool = True,
+    optimize: bool = True,
+) -> Module:
+    """Compile the source file `path` for `engine`, or load it from `cache`."""
+    data = path.read_bytes()
+
+    def build() -> Module:
+        source = io.StringIO(data.decode())
+        source.name = str(path)  # For the messages
+        return Module(engine, compile_source(source, buffered_output, optimize))
+
+    if cache is None:
+        return build()
+    # A WASM module starts with "\0asm": its keys cannot be the same
+    header = f"oberon0 {fingerprint()} {buffered_output} {optimize}\0".encode()
+    return cache.get_or_build(engine, cache.key(header + data, options), build)
@@ -0,0 +1,1176 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Oberon-0 code generator: lowers an `ast.Module` to a binary WebAssembly module
+
+The module imports from the runtime (`oberon0_runtime`), by name, its host
+functions, one page of memory and the stack pointer `sp`, which starts at the
+end of the page and goes down. The memory is laid out as follows:
+
+    0                   position in the output buffer
+    4 .. 1024           output buffer
+    1024 ..             global variables
+    .. sp               frames of the procedures
+
+Global variables are in memory at fixed addresses, as the runtime keeps the
+memory between two commands. The INTEGER and BOOLEAN variables and value
+parameters of a procedure are WebAssembly locals, unless they are passed as a
+VAR parameter or to `ReadInt` in its body, which need their address. The
+other local variables and parameters are in the frame of their procedure. A
+VAR parameter is passed as the address of its variable, and an array passed by
+value is passed by address and copied into the frame of the callee. The frames
+are cleared on entry, like the global variables and the locals.
+
+Exported procedures without parameters are exported as commands and the body
+of the module is the start function. `WriteInt` and `WriteChar` format into the
+output buffer, which is written with one call to the host function
+`WriteBuffer` at each `WriteLn`, before reading the input and when a command or
+the body ends, and before a trap of the generated code (an index out of range,
+a division by zero). What is in the buffer when a program runs out of fuel or
+of time is lost.
+"""
+
+import operator
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from oberon0_compiler import ast, ir
+from oberon0_compiler.wasm import I32, VOID, Function, Module, Op
+
+PAGE_SIZE = 1 << 16  # The memory of the runtime, the stack starts at its end
+OUTPUT_POSITION = 0
+OUTPUT_BUFFER = 4
+OUTPUT_BUFFER_SIZE = 1020
+GLOBALS = OUTPUT_BUFFER + OUTPUT_BUFFER_SIZE
+MAX_WIDTH = OUTPUT_BUFFER_SIZE - 11  # Wider integers are written by the host
+WORD = 4  # Size of INTEGER and BOOLEAN
+
+MIN_INT = -(1 << 31)
+MAX_INT = (1 << 31) - 1
+
+# Host functions imported from the runtime: parameters and results
+IMPORTS = {
+    "OpenInput": (0, 0),
+    "ReadInt": (1, 0),
+    "Eot": (0, 1),
+    "WriteChar": (1, 0),
+    "WriteInt": (2, 0),
+    "WriteLn": (0, 0),
+    "WriteBuffer": (2, 0),
+}
+PROCEDURES = {"OpenInput", "ReadInt", "WriteChar", "WriteInt", "WriteLn"}
+FUNCTIONS = {"Eot", "ODD"}
+
+COMPARISONS = {
+    "=": Op.I32_EQ,
+    "#": Op.I32_NE,
+    "<": Op.I32_LT_S,
+    "<=": Op.I32_LE_S,
+    ">": Op.I32_GT_S,
+    ">=": Op.I32_GE_S,
+}
+
+
+# Evaluation of constant expressions, before `wrap`
+RELATIONS = {
+    "=": operator.eq,
+    "#": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+OPERATIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "DIV": operator.floordiv,  # Rounds down, like Oberon
+    "MOD": operator.mod,
+    "OR": operator.or_,
+    "&": operator.and_,
+}
+
+
+class SemanticError(Exception):
+    """An error in a module that is syntactically correct."""
+
+
+def wrap(value: int) -> int:
+    """`value` as a 32-bit two's complement integer."""
+    return (value - MIN_INT) % (1 << 32) + MIN_INT
+
+
+# Types and symbols
+
+
+@dataclass(frozen=True)
+class Type:
+    name: str
+    size: int = WORD
+
+    def __str__(self):
+        return self.name
+
+
+@dataclass(frozen=True)
+class ArrayType(Type):
+    length: int = 0
+    element: Type | None = None
+
+
+INTEGER = Type("INTEGER")
+BOOLEAN = Type("BOOLEAN")
+
+
+@dataclass
+class Constant:
+    type: Type
+    value: int
+
+
+@dataclass
+class TypeName:
+    type: Type
+
+
+@dataclass
+class Variable:
+    type: Type
+    level: int  # 0 for global variables
+    address: int  # In memory if global, else in the frame
+    ref: int | None = None  # Local that holds the address, for VAR parameters
+    local: int | None = None  # Local that holds the value, instead of memory
+
+
+@dataclass
+class Procedure:
+    index: int
+    params: list[tuple[bool, Type]]  # By reference, type
+
+
+@dataclass
+class Builtin:
+    name: str
+
+
+Symbol = Constant | TypeName | Variable | Procedure | Builtin
+
+UNIVERSE: dict[str, Symbol] = {
+    "TRUE": Constant(BOOLEAN, 1),
+    "FALSE": Constant(BOOLEAN, 0),
+    **{n: Builtin(n) for n in PROCEDURES | FUNCTIONS},
+}
+
+
+@dataclass
+class Scope:
+    name: str
+    level: int
+    function: Function
+    symbols: dict[str, Symbol] = field(default_factory=dict)
+    frame_size: int = 0
+    fp: int | None = None  # Local that holds the address of the frame
+    temp: int | None = None  # Scratch local for the indices
+    escaping: set[str] = field(default_factory=set)  # Variables kept in memory
+
+
+def designator_of(expression: ast.Expression) -> ast.SimpleFactor | None:
+    """The variable that is all of `expression`, if any."""
+    if not isinstance(expression, ast.ComplexExpression) or expression.relation:
+        return None
+    simple = expression.simple_expression
+    if simple.sign or simple.addop_terms or simple.term.mulop_factors:
+        return None
+    factor = simple.term.factor
+    return factor if isinstance(factor, ast.SimpleFactor) else None
+
+
+def calls(node: ast.StatementSequence) -> Iterator[ast.ProcedureCall]:
+    """The procedure calls of a statement sequence, in nested statements too."""
+    for statement in node.statements:
+        if isinstance(statement, ast.ProcedureCall):
+            yield statement
+        elif isinstance(statement, ast.If):
+            yield from calls(statement.then)
+            for _, statements in statement.elsif or []:
+                yield from calls(statements)
+            if statement.else_:
+                yield from calls(statement.else_)
+        elif isinstance(statement, ast.While | ast.Repeat):
+            yield from calls(statement.body)
+
+
+def power_of_two(value: int | None) -> int | None:
+    """log2 of `value` if it is a positive power of two."""
+    if value is None or value <= 0 or value & (value - 1):
+        return None
+    return value.bit_length() - 1
+
+
+class CodeGenerator:
+    """Generates a module from a tree. With `buffered_output` off, every
+    `WriteInt`, `WriteChar` and `WriteLn` calls the host. With `optimize`, the
+    tree is checked, then optimized by `optimizer.optimize` and generated
+    with the scalar variables of the procedures in locals when possible, the
+    bodies through the intermediate representation of `ir`."""
+
+    def __init__(self, buffered_output: bool = True, optimize: bool = True):
+        self.buffered_output = buffered_output
+        self.optimize = optimize
+        self.checking = False
+
+    def generate(self, module: ast.Module) -> bytes:
+        """The binary module. Raise `SemanticError` on the first error."""
+        if self.optimize:
+            from oberon0_compiler.optimizer import optimize  # Imports this module
+
+            # The optimizer removes code, whose errors must be reported too
+            self.checking = True
+            self.lower(module)
+            self.checking = False
+            module = optimize(module)
+        return self.lower(module).encode()
+
+    def lower(self, module: ast.Module) -> Module:
+        self.wasm = Module()
+        self.imports = {
+            n: self.wasm.import_function(n, *signature)
+            for n, signature in IMPORTS.items()
+        }
+        self.wasm.import_memory("memory")
+        self.sp = self.wasm.import_global("sp")
+        self.helpers: dict[str, int] = {}
+        self.ir: dict[str, ir.Function] = {}  # Of the bodies, when optimizing
+        self.globals_end = GLOBALS
+        self.scopes: list[Scope] = []
+
+        body = Function(module.ident)
+        self.scopes.append(Scope(module.ident, 0, body))
+        self.declarations(module.Declarations)
+        if self.globals_end > PAGE_SIZE:
+            raise self.error("the global variables do not fit in memory")
+        self.body(module.body)
+        if body.code:
+            self.flush()
+            self.wasm.start = self.wasm.add(body)
+        return self.wasm
+
+    # Symbols
+
+    @property
+    def scope(self) -> Scope:
+        return self.scopes[-1]
+
+    @property
+    def f(self) -> Function:
+        return self.scope.function
+
+    def error(self, msg: str) -> SemanticError:
+        return SemanticError(f"{msg} (in {self.scope.name})")
+
+    def declare(self, name: str, symbol: Symbol) -> None:
+        if name in self.scope.symbols:
+            raise self.error(f"'{name}' is already declared")
+        self.scope.symbols[name] = symbol
+
+    def lookup(self, name: str) -> Symbol:
+        for scope in reversed(self.scopes):
+            if name in scope.symbols:
+                symbol = scope.symbols[name]
+                if isinstance(symbol, Variable) and symbol.level not in (
+                    0,
+                    self.scope.level,
+                ):
+                    raise self.error(
+                        f"'{name}' is a variable of an enclosing procedure,"
+                        " which is not accessible"
+                    )
+                return symbol
+        if name in UNIVERSE:
+            return UNIVERSE[name]
+        raise self.error(f"'{name}' is not declared")
+
+    def variable(self, name: str) -> Variable:
+        symbol = self.lookup(name)
+        if not isinstance(symbol, Variable):
+            raise self.error(f"'{name}' is not a variable")
+        return symbol
+
+    def allocate(self, size: int) -> int:
+        """Address of a new variable of `size` bytes in the current scope."""
+        if self.scope.level == 0:
+            address = self.globals_end
+            self.globals_end += size
+        else:
+            address = self.scope.frame_size
+            self.scope.frame_size += size
+        return address
+
+    def helper(self, name: str) -> int:
+        """Index of a function of the generated runtime, added on first use."""
+        if name not in self.helpers:
+            generate = getattr(self, f"helper_{name.lower()}")
+            f = Function(f"runtime.{name}")
+            self.helpers[name] = self.wasm.add(f)
+            generate(f)
+        return self.helpers[name]
+
+    def temp(self) -> int:
+        if self.scope.temp is None:
+            self.scope.temp = self.f.local()
+        return self.scope.temp
+
+    # Constants
+
+    def constant(  # noqa: C901, PLR0911, PLR0912
+        self, node: ast.Node
+    ) -> Constant | None:
+        """The value of a constant expression, or None."""
+        if isinstance(node, ast.ComplexExpression):
+            left = self.constant(node.simple_expression)
+            if left is None or node.relation is None:
+                return left
+            op, right = node.relation[0], self.constant(node.relation[1])
+            if right is None or left.type != right.type:
+                return None
+            if left.type != INTEGER and op not in ("=", "#"):
+                return None
+            return Constant(BOOLEAN, int(RELATIONS[op](left.value, right.value)))
+        if isinstance(node, ast.SimpleExpression):
+            left = self.constant(node.term)
+            if left is None:
+                return None
+            if node.sign and left.type != INTEGER:
+                return None
+            if node.sign == "-":
+                left = Constant(INTEGER, wrap(-left.value))
+            return self.fold(left, node.addop_terms)
+        if isinstance(node, ast.Term):
+            left = self.constant(node.factor)
+            return None if left is None else self.fold(left, node.mulop_factors)
+        if isinstance(node, ast.Number):
+            return Constant(INTEGER, node.value) if node.value <= MAX_INT else None
+        if isinstance(node, ast.SimpleFactor):
+            if node.selector:
+                return None
+            symbol = self.lookup(node.ident)
+            return symbol if isinstance(symbol, Constant) else None
+        if isinstance(node, ast.ExpressionFactor):
+            return self.constant(node.expression)
+        if isinstance(node, ast.Negation):
+            value = self.constant(node.factor)
+            if value is None or value.type != BOOLEAN:
+                return None
+            return Constant(BOOLEAN, 1 - value.value)
+        return None
+
+    def fold(
+        self, left: Constant, operations: list[tuple[str, ast.Node]]
+    ) -> Constant | None:
+        """`left` combined with the constant operands of `operations`."""
+        value = left.value
+        for op, node in operations:
+            right = self.constant(node)
+            if right is None:
+                return None
+            operand_type = BOOLEAN if op in ("OR", "&") else INTEGER
+            if left.type != operand_type or right.type != operand_type:
+                return None
+            if op in ("DIV", "MOD") and right.value == 0:
+                raise self.error("division by zero")
+            if op == "DIV" and value == MIN_INT and right.value == -1:
+                raise self.error("integer overflow")  # Traps at run time
+            # Wrapped at each step, as DIV and MOD are not modular
+            value = wrap(OPERATIONS[op](value, right.value))
+        return Constant(left.type, value)
+
+    def constant_value(self, node: ast.Expression, type: Type) -> int:
+        value = self.constant(node)
+        if value is None:
+            raise self.error(f"'{node}' is not a constant")
+        if value.type != type:
+            raise self.error(f"'{node}' is not of type {type}")
+        return value.value
+
+    # Declarations
+
+    def type(self, node: ast.Type) -> Type:
+        if isinstance(node, ast.IntegerType):
+            return INTEGER
+        if isinstance(node, ast.BooleanType):
+            return BOOLEAN
+        if isinstance(node, ast.ArrayType):
+            length = self.constant_value(node.size, INTEGER)
+            if length <= 0:
+                raise self.error(f"array length {length} is not positive")
+            element = self.type(node.type)
+            if length * element.size > PAGE_SIZE:
+                raise self.error(f"'{node}' is too large")
+            return ArrayType(
+                f"ARRAY {length} OF {element}", length * element.size, length, element
+            )
+        symbol = self.lookup(node.ident)
+        if not isinstance(symbol, TypeName):
+            raise self.error(f"'{node.ident}' is not a type")
+        return symbol.type
+
+    def declarations(self, node: ast.Declarations) -> None:
+        for d in node.const_declarations:
+            value = self.constant(d.expression)
+            if value is None:
+                raise self.error(f"the value of '{d.ident}' is not a constant")
+            self.declare(d.ident, value)
+        for d in node.type_declarations:
+            self.declare(d.ident, TypeName(self.type(d.type)))
+        for d in node.var_declarations:
+            type = self.type(d.type)
+            for ident in d.ident_list:
+                if self.in_memory(ident, type):
+                    address = self.allocate(type.size)
+                    self.declare(ident, Variable(type, self.scope.level, address))
+                else:
+                    local = self.f.local()
+                    self.declare(
+                        ident, Variable(type, self.scope.level, 0, local=local)
+                    )
+        for d in node.procedure_declarations:
+            self.procedure(d)
+
+    def in_memory(self, name: str, type: Type) -> bool:
+        """Whether a variable of the current scope must be in memory."""
+        return (
+            not self.optimize
+            or self.scope.level == 0
+            or isinstance(type, ArrayType)
+            or name in self.scope.escaping
+        )
+
+    def escaping(self, node: ast.ProcedureDeclaration) -> set[str]:
+        """The variables whose address is taken in the body of a procedure:
+        those passed as VAR parameters, and to `ReadInt`. Nested procedures
+        cannot access them."""
+        nested = {
+            p.ident: [q.by_ref for q in p.params for _ in q.ident_list]
+            for p in node.declarations.procedure_declarations
+        }
+        names = set()
+        for call in calls(node.body):
+            by_ref = nested.get(call.ident)
+            if by_ref is None:
+                try:
+                    symbol = self.lookup(call.ident)
+                except SemanticError:
+                    continue  # Reported when the call is generated
+                if isinstance(symbol, Procedure):
+                    by_ref = [r for r, _ in symbol.params]
+                elif symbol == Builtin("ReadInt"):
+                    by_ref = [True]
+                else:
+                    continue
+            for param, ref in zip(call.params, by_ref, strict=False):
+                designator = designator_of(param)
+                if ref and designator is not None and not designator.selector:
+                    names.add(designator.ident)
+        return names
+
+    def procedure(self, node: ast.ProcedureDeclaration) -> None:
+        params = [
+            (p.by_ref, self.type(p.type)) for p in node.params for _ in p.ident_list
+        ]
+        f = Function(f"{self.scope.name}.{node.ident}", len(params))
+        procedure = Procedure(self.wasm.add(f), params)
+        self.declare(node.ident, procedure)
+        if node.exported:
+            if self.scope.level > 0:
+                raise self.error(f"local procedure '{node.ident}' cannot be exported")
+            if params:
+                if not self.checking:  # Warned once, when generating
+                    logger.warning("{} is not a command: it has parameters", node.ident)
+            else:
+                self.export(node.ident, procedure.index)
+
+        escaping = self.escaping(node)
+        self.scopes.append(Scope(f.name, self.scope.level + 1, f, escaping=escaping))
+        copies = []  # Parameters passed by value: index, address, type
+        names = [ident for p in node.params for ident in p.ident_list]
+        for i, (name, (by_ref, type)) in enumerate(zip(names, params, strict=True)):
+            if by_ref:
+                self.declare(name, Variable(type, self.scope.level, 0, ref=i))
+            elif not self.in_memory(name, type):
+                self.declare(name, Variable(type, self.scope.level, 0, local=i))
+            else:
+                address = self.allocate(type.size)
+                self.declare(name, Variable(type, self.scope.level, address))
+                copies.append((i, address, type))
+        self.declarations(node.declarations)
+        if self.scope.frame_size > PAGE_SIZE:
+            raise self.error("the local variables do not fit in memory")
+        self.enter(copies)
+        self.body(node.body)
+        self.leave()
+        self.scopes.pop()
+
+    def export(self, name: str, index: int) -> None:
+        """Export a procedure as a command. The output is flushed when it
+        returns."""
+        if self.buffered_output:
+            f = Function(name)
+            f.emit(Op.CALL, index)
+            f.emit(Op.CALL, self.helper("Flush"))
+            index = self.wasm.add(f)
+        self.wasm.export(name, index)
+
+    def enter(self, copies: list[tuple[int, int, Type]]) -> None:
+        """The prologue: allocate and clear the frame, and copy the parameters
+        passed by value."""
+        size = self.scope.frame_size
+        if not size:
+            return
+        f = self.f
+        self.scope.fp = fp = f.local()
+        f.emit(Op.GLOBAL_GET, self.sp)
+        f.i32_const(size)
+        f.emit(Op.I32_SUB)
+        f.emit(Op.LOCAL_TEE, fp)
+        f.emit(Op.GLOBAL_SET, self.sp)
+        # Signed, as the frame may be below 0
+        f.emit(Op.LOCAL_GET, fp)
+        f.i32_const(self.globals_end)
+        f.emit(Op.I32_LT_S)
+        f.emit(Op.IF, VOID)
+        f.emit(Op.CALL, self.helper("Trap"))
+        f.emit(Op.END)
+        f.emit(Op.LOCAL_GET, fp)
+        f.i32_const(0)
+        f.i32_const(size)
+        f.memory_fill()
+        for i, address, type in copies:
+            f.emit(Op.LOCAL_GET, fp)
+            if isinstance(type, ArrayType):
+                self.add_offset(address)
+                f.emit(Op.LOCAL_GET, i)
+                f.i32_const(type.size)
+                f.memory_copy()
+            else:
+                f.emit(Op.LOCAL_GET, i)
+                f.store(address)
+
+    def leave(self) -> None:
+        size = self.scope.frame_size
+        if size:
+            self.f.emit(Op.LOCAL_GET, self.scope.fp)
+            self.f.i32_const(size)
+            self.f.emit(Op.I32_ADD)
+            self.f.emit(Op.GLOBAL_SET, self.sp)
+
+    # Expressions
+
+    def address(self, node: ast.SimpleFactor | ast.Assignment) -> tuple[Type, int]:
+        """Push the address of a variable, with its selectors, and return its
+        type and an offset to add to the address."""
+        f = self.f
+        var = self.variable(node.ident)
+        assert var.local is None, "the address of a local is taken"
+        pushed = True
+        offset = 0
+        if var.ref is not None:
+            f.emit(Op.LOCAL_GET, var.ref)
+        elif var.level > 0:
+            f.emit(Op.LOCAL_GET, self.scope.fp)
+            offset = var.address
+        else:
+            pushed = False
+            offset = var.address
+        type = var.type
+        for selector in node.selector:
+            if not isinstance(type, ArrayType):
+                raise self.error(f"'{node.ident}' is not an array")
+            index = self.constant(selector.expression)
+            if index is not None:
+                if index.type != INTEGER or not 0 <= index.value < type.length:
+                    raise self.error(f"index '{selector.expression}' is out of range")
+                offset += index.value * type.element.size
+            else:
+                self.index(selector.expression, type.length)
+                if type.element.size != 1:
+                    f.i32_const(type.element.size)
+                    f.emit(Op.I32_MUL)
+                if pushed:
+                    f.emit(Op.I32_ADD)
+                pushed = True
+            type = type.element
+        if not pushed:
+            f.i32_const(0)
+        return type, offset
+
+    def index(self, node: ast.Expression, length: int) -> None:
+        """Push an index, checked against `length`."""
+        f = self.f
+        self.expect(node, INTEGER)
+        temp = self.temp()
+        f.emit(Op.LOCAL_TEE, temp)
+        f.i32_const(length)
+        f.emit(Op.I32_GE_U)
+        f.emit(Op.IF, VOID)
+        f.emit(Op.CALL, self.helper("Trap"))
+        f.emit(Op.END)
+        f.emit(Op.LOCAL_GET, temp)
+
+    def expect(self, node: ast.Node, type: Type) -> None:
+        actual = self.expression(node)
+        if actual != type:
+            raise self.error(f"'{node}' is of type {actual}, not {type}")
+
+    def expression(self, node: ast.Node) -> Type:  # noqa: C901, PLR0911, PLR0912
+        """Push the value of an expression and return its type."""
+        f = self.f
+        if isinstance(node, ast.ComplexExpression | ast.SimpleExpression):
+            value = self.constant(node)
+            if value is not None:
+                f.i32_const(value.value)
+                return value.type
+        if isinstance(node, ast.ComplexExpression):
+            left = self.expression(node.simple_expression)
+            if node.relation is None:
+                return left
+            op, right = node.relation
+            if left != self.expression(right) or (
+                left != INTEGER and op not in ("=", "#")
+            ):
+                raise self.error(f"invalid operands for '{op}' in '{node}'")
+            f.emit(COMPARISONS[op])
+            return BOOLEAN
+        if isinstance(node, ast.SimpleExpression):
+            if node.sign == "-":
+                f.i32_const(0)
+            type = self.expression(node.term)
+            if node.sign and type != INTEGER:
+                raise self.error(f"invalid operand for '{node.sign}' in '{node}'")
+            if node.sign == "-":
+                f.emit(Op.I32_SUB)
+            for op, term in node.addop_terms:
+                self.operation(type, op, term, node)
+            return type
+        if isinstance(node, ast.Term):
+            type = self.expression(node.factor)
+            for op, factor in node.mulop_factors:
+                self.operation(type, op, factor, node)
+            return type
+        if isinstance(node, ast.Number):
+            if node.value > MAX_INT:
+                raise self.error(f"{node.value} is too large")
+            f.i32_const(node.value)
+            return INTEGER
+        if isinstance(node, ast.SimpleFactor):
+            symbol = self.lookup(node.ident)
+            if isinstance(symbol, Constant) and not node.selector:
+                f.i32_const(symbol.value)
+                return symbol.type
+            if self.is_local(symbol, node):
+                f.emit(Op.LOCAL_GET, symbol.local)
+                return symbol.type
+            type, offset = self.address(node)
+            if isinstance(type, ArrayType):
+                raise self.error(f"array '{node}' cannot be used as a value")
+            f.load(offset)
+            return type
+        if isinstance(node, ast.ExpressionFactor):
+            return self.expression(node.expression)
+        if isinstance(node, ast.Negation):
+            self.expect(node.factor, BOOLEAN)
+            f.emit(Op.I32_EQZ)
+            return BOOLEAN
+        if isinstance(node, ast.FunctionCall):
+            return self.function_call(node)
+        raise self.error(f"unexpected '{node}'")
+
+    def operation(self, type: Type, op: str, node: ast.Node, parent: ast.Node) -> None:
+        """Apply `op` to the value on the stack, of type `type`, and `node`."""
+        f = self.f
+        if op in ("OR", "&"):
+            if type != BOOLEAN:
+                raise self.error(f"invalid operands for '{op}' in '{parent}'")
+            # Short-circuit evaluation
+            f.emit(Op.IF, I32)
+            if op == "OR":
+                f.i32_const(1)
+                f.emit(Op.ELSE)
+                self.expect(node, BOOLEAN)
+            else:
+                self.expect(node, BOOLEAN)
+                f.emit(Op.ELSE)
+                f.i32_const(0)
+            f.emit(Op.END)
+            return
+        if type != INTEGER:
+            raise self.error(f"invalid operands for '{op}' in '{parent}'")
+        if op in ("DIV", "MOD") and self.divide_by_constant(op, node):
+            return
+        self.expect(node, INTEGER)
+        if op == "+":
+            f.emit(Op.I32_ADD)
+        elif op == "-":
+            f.emit(Op.I32_SUB)
+        elif op == "*":
+            f.emit(Op.I32_MUL)
+        else:
+            f.emit(Op.CALL, self.helper("Div" if op == "DIV" else "Mod"))
+
+    def divide_by_constant(self, op: str, node: ast.Node) -> bool:
+        """Divide by a power of two with a shift or a mask, as they round
+        down like DIV and MOD. Return False if `node` is not one."""
+        divisor = self.constant(node)
+        if divisor is None:
+            return False
+        if divisor.value == 0:
+            raise self.error("division by zero")
+        shift = power_of_two(divisor.value)
+        if divisor.type != INTEGER or shift is None:
+            return False
+        if op == "DIV":
+            self.f.i32_const(shift)
+            self.f.emit(Op.I32_SHR_S)
+        else:
+            self.f.i32_const(divisor.value - 1)
+            self.f.emit(Op.I32_AND)
+        return True
+
+    def function_call(self, node: ast.FunctionCall) -> Type:
+        symbol = self.lookup(node.ident)
+        if not isinstance(symbol, Builtin) or symbol.name not in FUNCTIONS:
+            raise self.error(f"'{node.ident}' is not a function")
+        self.arguments(node, 1 if symbol.name == "ODD" else 0)
+        if symbol.name == "ODD":
+            self.expect(node.params[0], INTEGER)
+            self.f.i32_const(1)
+            self.f.emit(Op.I32_AND)
+        else:
+            self.flush()
+            self.f.emit(Op.CALL, self.imports["Eot"])
+        return BOOLEAN
+
+    def arguments(self, node: ast.FunctionCall | ast.ProcedureCall, *counts: int):
+        if len(node.params) not in counts:
+            raise self.error(f"wrong number of arguments in '{node}'")
+
+    # Statements
+
+    def body(self, node: ast.StatementSequence) -> None:
+        """The statements of a procedure or of the module. When optimizing,
+        through the intermediate representation (see `ir`)."""
+        if not self.optimize or self.checking or not node.statements:
+            self.statement_sequence(node)
+            return
+        from oberon0_compiler import ir_gen, lowering, ssa  # Import this module
+
+        fn = self.ir[self.scope.name] = ir_gen.generate(self, node)
+        ssa.optimize(fn)
+        lowering.lower(self, fn)
+
+    def statement_sequence(self, node: ast.StatementSequence) -> None:
+        for statement in node.statements:
+            self.statement(statement)
+
+    def statement(self, node: ast.Statement) -> None:
+        f = self.f
+        if isinstance(node, ast.Assignment):
+            self.assignment(node)
+        elif isinstance(node, ast.ProcedureCall):
+            self.procedure_call(node)
+        elif isinstance(node, ast.If):
+            self.expect(node.condition, BOOLEAN)
+            f.emit(Op.IF, VOID)
+            self.statement_sequence(node.then)
+            branches = 1
+            for condition, statements in node.elsif or []:
+                f.emit(Op.ELSE)
+                self.expect(condition, BOOLEAN)
+                f.emit(Op.IF, VOID)
+                self.statement_sequence(statements)
+                branches += 1
+            if node.else_:
+                f.emit(Op.ELSE)
+                self.statement_sequence(node.else_)
+            for _ in range(branches):
+                f.emit(Op.END)
+        elif isinstance(node, ast.While):
+            f.emit(Op.BLOCK, VOID)
+            f.emit(Op.LOOP, VOID)
+            self.expect(node.condition, BOOLEAN)
+            f.emit(Op.I32_EQZ)
+            f.emit(Op.BR_IF, 1)
+            self.statement_sequence(node.body)
+            f.emit(Op.BR, 0)
+            f.emit(Op.END)
+            f.emit(Op.END)
+        elif isinstance(node, ast.Repeat):
+            f.emit(Op.LOOP, VOID)
+            self.statement_sequence(node.body)
+            self.expect(node.condition, BOOLEAN)
+            f.emit(Op.I32_EQZ)
+            f.emit(Op.BR_IF, 0)
+            f.emit(Op.END)
+
+    def assignment(self, node: ast.Assignment) -> None:
+        symbol = self.lookup(node.ident)
+        if not isinstance(symbol, Variable):
+            raise self.error(f"cannot assign to '{node.ident}'")
+        if self.is_local(symbol, node):
+            actual = self.expression(node.expression)
+            if actual != symbol.type:
+                raise self.error(f"cannot assign {actual} to {symbol.type} in '{node}'")
+            self.f.emit(Op.LOCAL_SET, symbol.local)
+            return
+        type, offset = self.address(node)
+        if isinstance(type, ArrayType):
+            self.add_offset(offset)
+            source = designator_of(node.expression)
+            if source is None or self.reference(source) != type:
+                raise self.error(f"cannot assign '{node.expression}' to {type}")
+            self.f.i32_const(type.size)
+            self.f.memory_copy()
+            return
+        actual = self.expression(node.expression)
+        if actual != type:
+            raise self.error(f"cannot assign {actual} to {type} in '{node}'")
+        self.f.store(offset)
+
+    def is_local(self, symbol: Symbol, node: ast.SimpleFactor | ast.Assignment) -> bool:
+        if not isinstance(symbol, Variable) or symbol.local is None:
+            return False
+        if node.selector:
+            raise self.error(f"'{node.ident}' is not an array")
+        return True
+
+    def add_offset(self, offset: int) -> None:
+        if offset:
+            self.f.i32_const(offset)
+            self.f.emit(Op.I32_ADD)
+
+    def reference(self, node: ast.SimpleFactor) -> Type:
+        """Push the address of a variable and return its type."""
+        type, offset = self.address(node)
+        self.add_offset(offset)
+        return type
+
+    def procedure_call(self, node: ast.ProcedureCall) -> None:
+        symbol = self.lookup(node.ident)
+        if isinstance(symbol, Builtin) and symbol.name in PROCEDURES:
+            self.builtin_call(symbol.name, node)
+            return
+        if not isinstance(symbol, Procedure):
+            raise self.error(f"'{node.ident}' is not a procedure")
+        self.arguments(node, len(symbol.params))
+        for param, (by_ref, type) in zip(node.params, symbol.params, strict=True):
+            if by_ref or isinstance(type, ArrayType):
+                designator = designator_of(param)
+                if designator is None or isinstance(
+                    self.lookup(designator.ident), Constant
+                ):
+                    raise self.error(f"'{param}' is not a variable, in '{node}'")
+                actual = self.reference(designator)
+            else:
+                actual = self.expression(param)
+            if actual != type:
+                raise self.error(f"'{param}' is of type {actual}, not {type}")
+        self.f.emit(Op.CALL, symbol.index)
+
+    def builtin_call(self, name: str, node: ast.ProcedureCall) -> None:
+        f = self.f
+        if name == "ReadInt":
+            self.arguments(node, 1)
+            designator = designator_of(node.params[0])
+            if designator is None or isinstance(
+                self.lookup(designator.ident), Constant
+            ):
+                raise self.error(f"'{node.params[0]}' is not a variable")
+            if self.reference(designator) != INTEGER:
+                raise self.error(f"'{node.params[0]}' is not an INTEGER")
+            self.flush()
+            f.emit(Op.CALL, self.imports["ReadInt"])
+        elif name == "WriteInt":
+            self.arguments(node, 1, 2)
+            for param in node.params:
+                self.expect(param, INTEGER)
+            if len(node.params) == 1:
+                f.i32_const(0)
+            self.write("WriteInt")
+        elif name == "WriteChar":
+            self.arguments(node, 1)
+            self.expect(node.params[0], INTEGER)
+            self.write("WriteChar")
+        elif name == "WriteLn":
+            self.arguments(node, 0)
+            self.write("WriteLn")
+        else:
+            self.arguments(node, 0)
+            f.emit(Op.CALL, self.imports[name])
+
+    def write(self, name: str) -> None:
+        if self.buffered_output:
+            self.f.emit(Op.CALL, self.helper(name))
+        else:
+            self.f.emit(Op.CALL, self.imports[name])
+
+    def flush(self) -> None:
+        if self.buffered_output:
+            self.f.emit(Op.CALL, self.helper("Flush"))
+
+    # Runtime, generated on demand. The position in the output buffer is in
+    # memory, so that it is restored with the memory between two commands.
+
+    def helper_trap(self, f: Function) -> None:
+        """Trap, after writing the output. For the checks of the indices and
+        of the stack."""
+        if self.buffered_output:
+            f.emit(Op.CALL, self.helper("Flush"))
+        f.emit(Op.UNREACHABLE)
+
+    def helper_flush(self, f: Function) -> None:
+        n = f.local()
+        f.i32_const(0)
+        f.load(OUTPUT_POSITION)
+        f.emit(Op.LOCAL_TEE, n)
+        f.emit(Op.IF, VOID)
+        f.i32_const(OUTPUT_BUFFER)
+        f.emit(Op.LOCAL_GET, n)
+        f.emit(Op.CALL, self.imports["WriteBuffer"])
+        f.i32_const(0)
+        f.i32_const(0)
+        f.store(OUTPUT_POSITION)
+        f.emit(Op.END)
+
+    def helper_writechar(self, f: Function) -> None:
+        f.params = 1
+        c, position = 0, f.local()
+        # Characters that are not ASCII are encoded by the host
+        f.emit(Op.LOCAL_GET, c)
+        f.i32_const(0x80)
+        f.emit(Op.I32_GE_U)
+        f.emit(Op.IF, VOID)
+        f.emit(Op.CALL, self.helper("Flush"))
+        f.emit(Op.LOCAL_GET, c)
+        f.emit(Op.CALL, self.imports["WriteChar"])
+        f.emit(Op.RETURN)
+        f.emit(Op.END)
+        self.reserve(f, position, 1)
+        f.emit(Op.LOCAL_GET, position)
+        f.emit(Op.LOCAL_GET, c)
+        f.store8(OUTPUT_BUFFER)
+        f.i32_const(0)
+        f.emit(Op.LOCAL_GET, position)
+        f.i32_const(1)
+        f.emit(Op.I32_ADD)
+        f.store(OUTPUT_POSITION)
+
+    def reserve(self, f: Function, position: int, size: int | None) -> None:
+        """Set `position` to the position in the buffer, after flushing it if
+        there is not room for `size` bytes (or the local `-size`)."""
+        f.i32_const(0)
+        f.load(OUTPUT_POSITION)
+        f.emit(Op.LOCAL_TEE, position)
+        if size > 0:
+            f.i32_const(size)
+        else:
+            f.emit(Op.LOCAL_GET, -size)
+        f.emit(Op.I32_ADD)
+        f.i32_const(OUTPUT_BUFFER_SIZE)
+        f.emit(Op.I32_GT_U)
+        f.emit(Op.IF, VOID)
+        f.emit(Op.CALL, self.helper("Flush"))
+        f.i32_const(0)
+        f.emit(Op.LOCAL_SET, position)
+        f.emit(Op.END)
+
+    def helper_writeint(self, f: Function) -> None:  # noqa: PLR0915
+        """Format like the host: right-aligned in `width` characters."""
+        f.params = 2
+        x, width = 0, 1
+        u, digits, length, total, position, p = (f.local() for _ in range(6))
+        # Widths that may not fit in the buffer, and negative widths (which
+        # align to the left), are left to the host
+        f.emit(Op.LOCAL_GET, width)
+        f.i32_const(MAX_WIDTH)
+        f.emit(Op.I32_GT_U)
+        f.emit(Op.IF, VOID)
+        f.emit(Op.CALL, self.helper("Flush"))
+        f.emit(Op.LOCAL_GET, x)
+        f.emit(Op.LOCAL_GET, width)
+        f.emit(Op.CALL, self.imports["WriteInt"])
+        f.emit(Op.RETURN)
+        f.emit(Op.END)
+        # u = |x|, unsigned
+        f.i32_const(0)
+        f.emit(Op.LOCAL_GET, x)
+        f.emit(Op.I32_SUB)
+        f.emit(Op.LOCAL_GET, x)
+        f.emit(Op.LOCAL_GET, x)
+        f.i32_const(0)
+        f.emit(Op.I32_LT_S)
+        f.emit(Op.SELECT)
+        f.emit(Op.LOCAL_TEE, u)
+        # digits = number of digits of u, p is a scratch copy of u
+        f.emit(Op.LOCAL_SET, p)
+        f.i32_const(1)
+        f.emit(Op.LOCAL_SET, digits)
+        f.emit(Op.BLOCK, VOID)
+        f.emit(Op.LOOP, VOID)
+        f.emit(Op.LOCAL_GET, p)
+        f.i32_const(10)
+        f.emit(Op.I32_LT_U)
+        f.emit(Op.BR_IF, 1)
+        f.emit(Op.LOCAL_GET, p)
+        f.i32_const(10)
+        f.emit(Op.I32_DIV_U)
+        f.emit(Op.LOCAL_SET, p)
+        f.emit(Op.LOCAL_GET, digits)
+        f.i32_const(1)
+        f.emit(Op.I32_ADD)
+        f.emit(Op.LOCAL_SET, digits)
+        f.emit(Op.BR, 0)
+        f.emit(Op.END)
+        f.emit(Op.END)
+        # length = digits and sign, total = max(width, length)
+        f.emit(Op.LOCAL_GET, digits)
+        f.emit(Op.LOCAL_GET, x)
+        f.i32_const(31)
+        f.emit(Op.I32_SHR_U)
+        f.emit(Op.I32_ADD)
+        f.emit(Op.LOCAL_TEE, length)
+        f.emit(Op.LOCAL_GET, width)
+        f.emit(Op.LOCAL_GET, width)
+        f.emit(Op.LOCAL_GET, length)
+        f.emit(Op.I32_LT_S)
+        f.emit(Op.SELECT)
+        f.emit(Op.LOCAL_SET, total)
+        self.reserve(f, position, -total)
+        # Padding with spaces
+        f.emit(Op.LOCAL_GET, position)
+        f.i32_const(OUTPUT_BUFFER)
+        f.emit(Op.I32_ADD)
+        f.emit(Op.LOCAL_TEE, p)
+        f.i32_const(ord(" "))
+        f.emit(Op.LOCAL_GET, total)
+        f.emit(Op.LOCAL_GET, length)
+        f.emit(Op.I32_SUB)
+        f.memory_fill()
+        # p = end of the number
+        f.emit(Op.LOCAL_GET, p)
+        f.emit(Op.LOCAL_GET, total)
+        f.emit(Op.I32_ADD)
+        f.emit(Op.LOCAL_SET, p)
+        # Sign
+        f.emit(Op.LOCAL_GET, x)
+        f.i32_const(0)
+        f.emit(Op.I32_LT_S)
+        f.emit(Op.IF, VOID)
+        f.emit(Op.LOCAL_GET, p)
+        f.emit(Op.LOCAL_GET, length)
+        f.emit(Op.I32_SUB)
+        f.i32_const(ord("-"))
+        f.store8()
+        f.emit(Op.END)
+        # Digits, from the last one
+        f.emit(Op.LOOP, VOID)
+        f.emit(Op.LOCAL_GET, p)
+        f.i32_const(1)
+        f.emit(Op.I32_SUB)
+        f.emit(Op.LOCAL_TEE, p)
+        f.emit(Op.LOCAL_GET, u)
+        f.i32_const(10)
+        f.emit(Op.I32_REM_U)
+        f.i32_const(ord("0"))
+        f.emit(Op.I32_ADD)
+        f.store8()
+        f.emit(Op.LOCAL_GET, u)
+        f.i32_const(10)
+        f.emit(Op.I32_DIV_U)
+        f.emit(Op.LOCAL_TEE, u)
+        f.emit(Op.BR_IF, 0)
+        f.emit(Op.END)
+        f.i32_const(0)
+        f.emit(Op.LOCAL_GET, position)
+        f.emit(Op.LOCAL_GET, total)
+        f.emit(Op.I32_ADD)
+        f.store(OUTPUT_POSITION)
+
+    def helper_writeln(self, f: Function) -> None:
+        f.i32_const(ord("\n"))
+        f.emit(Op.CALL, self.helper("WriteChar"))
+        f.emit(Op.CALL, self.helper("Flush"))
+
+    def helper_div(self, f: Function) -> None:
+        """x DIV y, rounded down: the truncated quotient, minus one if the
+        remainder is not zero and x and y have different signs."""
+        f.params, f.results = 2, 1
+        x, y = 0, 1
+        self.flush_before_trap(f, x, y, overflow=True)
+        f.emit(Op.LOCAL_GET, x)
+        f.emit(Op.LOCAL_GET, y)
+        f.emit(Op.I32_DIV_S)
+        f.emit(Op.LOCAL_GET, x)
+        f.emit(Op.LOCAL_GET, y)
+        f.emit(Op.I32_REM_S)
+        f.i32_const(0)
+        f.emit(Op.I32_NE)
+        f.emit(Op.LOCAL_GET, x)
+        f.emit(Op.LOCAL_GET, y)
+        f.emit(Op.I32_XOR)
+        f.i32_const(0)
+        f.emit(Op.I32_LT_S)
+        f.emit(Op.I32_AND)
+        f.emit(Op.I32_SUB)
+
+    def flush_before_trap(self, f: Function, x: int, y: int, overflow: bool) -> None:
+        """Write the output if `x / y` is about to trap: if y is zero, or with
+        `overflow`, if the quotient does not fit in an INTEGER. The division
+        then traps with its own trap code."""
+        if not self.buffered_output:
+            return
+        f.emit(Op.LOCAL_GET, y)
+        f.emit(Op.I32_EQZ)
+        if overflow:
+            f.emit(Op.LOCAL_GET, x)
+            f.i32_const(MIN_INT)
+            f.emit(Op.I32_EQ)
+            f.emit(Op.LOCAL_GET, y)
+            f.i32_const(-1)
+            f.emit(Op.I32_EQ)
+            f.emit(Op.I32_AND)
+            f.emit(Op.I32_OR)
+        f.emit(Op.IF, VOID)
+        f.emit(Op.CALL, self.helper("Flush"))
+        f.emit(Op.END)
+
+    def helper_mod(self, f: Function) -> None:
+        """x MOD y, of the sign of y: the remainder, plus y if it is not zero
+        and of the other sign."""
+        f.params, f.results = 2, 1
+        x, y = 0, 1
+        r = f.local()
+        self.flush_before_trap(f, x, y, overflow=False)
+        f.emit(Op.LOCAL_GET, x)
+        f.emit(Op.LOCAL_GET, y)
+        f.emit(Op.I32_REM_S)
+        f.emit(Op.LOCAL_TEE, r)
+        f.emit(Op.LOCAL_GET, y)
+        f.i32_const(0)
+        f.emit(Op.LOCAL_GET, r)
+        f.i32_const(0)
+        f.emit(Op.I32_NE)
+        f.emit(Op.LOCAL_GET, r)
+        f.emit(Op.LOCAL_GET, y)
+        f.emit(Op.I32_XOR)
+        f.i32_const(0)
+        f.emit(Op.I32_LT_S)
+        f.emit(Op.I32_AND)
+        f.emit(Op.SELECT)
+        f.emit(Op.I32_ADD)
+
+
+def generate(module: ast.Module, buffered_output: bool = True) -> bytes:
+    return CodeGenerator(buffered_output).generate(module)
@@ -0,0 +1,269 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Intermediate representation between the Oberon-0 tree and WebAssembly
+
+A `Function` is a control-flow graph of basic blocks. A block holds its
+three-address instructions in one `array`, `WIDTH` integers per instruction:
+the operation, the value it defines (or `NONE`) and three operands, whose kind
+depends on the operation (see `SIGNATURES`). Values are numbered per function
+and typed; the variables that are not in memory are read and written with GET
+and SET until `ssa.construct` replaces them by values and phis. A block ends
+with no successor (the function returns), one, or two, the first one being
+taken when `condition` is true.
+
+`ir_gen` builds the functions, `ssa` optimizes them and `lowering` turns them
+back into structured WebAssembly.
+"""
+
+from array import array
+from collections.abc import Iterator
+from enum import IntEnum
+
+WIDTH = 5  # Integers per instruction: operation, value, operands a, b and c
+NONE = -1  # No value
+
+
+class Type(IntEnum):
+    INT = 0
+    BOOL = 1
+    ADDR = 2  # Address in memory
+
+
+class Op(IntEnum):
+    NOP = 0  # Removed
+    CONST = 1  # value
+    PARAM = 2  # index of the WebAssembly parameter
+    FRAME = 3  # The address of the frame of the procedure
+    GET = 4  # variable
+    SET = 5  # variable, value
+    COPY = 6  # value
+    ADD = 7
+    SUB = 8
+    MUL = 9
+    DIV = 10  # Rounded down, like Oberon
+    MOD = 11
+    AND = 12
+    SHR = 13  # Arithmetic
+    EQ = 14
+    NE = 15
+    LT = 16
+    LE = 17
+    GT = 18
+    GE = 19
+    EQZ = 20
+    LOAD = 21  # address, offset
+    STORE = 22  # address, value, offset
+    CHECK = 23  # index, length: trap unless 0 <= index < length
+    CALL = 24  # function, arguments
+    MEMCPY = 25  # destination, source, size
+
+
+# Kinds of the operands a, b and c: a value (v), an immediate (i), a variable
+# (x), or a list of values (l), by its index in `Function.lists`
+BINARY = "vv"
+SIGNATURES = {
+    Op.NOP: "",
+    Op.CONST: "i",
+    Op.PARAM: "i",
+    Op.FRAME: "",
+    Op.GET: "x",
+    Op.SET: "xv",
+    Op.COPY: "v",
+    **dict.fromkeys([Op.ADD, Op.SUB, Op.MUL, Op.DIV, Op.MOD, Op.AND, Op.SHR], BINARY),
+    **dict.fromkeys([Op.EQ, Op.NE, Op.LT, Op.LE, Op.GT, Op.GE], BINARY),
+    Op.EQZ: "v",
+    Op.LOAD: "vi",
+    Op.STORE: "vvi",
+    Op.CHECK: "vi",
+    Op.CALL: "il",
+    Op.MEMCPY: "vvi",
+}
+
+# Operations without effect, that cannot trap
+PURE = frozenset(
+    [Op.CONST, Op.PARAM, Op.FRAME, Op.COPY, Op.ADD, Op.SUB, Op.MUL, Op.AND, Op.SHR]
+) | frozenset([Op.EQ, Op.NE, Op.LT, Op.LE, Op.GT, Op.GE, Op.EQZ])
+COMMUTATIVE = frozenset([Op.ADD, Op.MUL, Op.AND, Op.EQ, Op.NE])
+# Operations that may write to memory or read from it behind the back of LOAD
+CLOBBERS = frozenset([Op.STORE, Op.CALL, Op.MEMCPY])
+
+Instruction = tuple[int, int, int, int, int]
+
+
+class Block:
+    def __init__(self, index: int):
+        self.index = index
+        self.code = array("l")
+        self.phis: list[tuple[int, list[int]]] = []  # Value, value per predecessor
+        self.next: list[int] = []  # Successors
+        self.condition = NONE  # Value, with two successors
+
+    def __len__(self) -> int:
+        return len(self.code) // WIDTH
+
+    def __iter__(self) -> Iterator[Instruction]:
+        code = self.code
+        for i in range(0, len(code), WIDTH):
+            yield tuple(code[i : i + WIDTH])
+
+    def append(self, op: Op, dest: int, a: int = 0, b: int = 0, c: int = 0) -> None:
+        self.code.extend((op, dest, a, b, c))
+
+    def remove(self, i: int) -> None:
+        self.code[i * WIDTH] = Op.NOP
+
+    def compact(self) -> None:
+        """Drop the instructions that were removed."""
+        code = self.code
+        self.code = array(
+            "l",
+            (
+                n
+                for i in range(0, len(code), WIDTH)
+                if code[i] != Op.NOP
+                for n in code[i : i + WIDTH]
+            ),
+        )
+
+
+class Function:
+    def __init__(self, name: str):
+        self.name = name
+        self.blocks: list[Block] = []
+        self.types = array("b")  # Of the values
+        self.lists: list[list[int]] = []
+
+    def block(self) -> int:
+        self.blocks.append(Block(len(self.blocks)))
+        return len(self.blocks) - 1
+
+    def value(self, type: Type) -> int:
+        self.types.append(type)
+        return len(self.types) - 1
+
+    def emit(  # noqa: PLR0913
+        self,
+        block: int,
+        op: Op,
+        type: Type | None = None,
+        a: int = 0,
+        b: int = 0,
+        c: int = 0,
+    ) -> int:
+        """Append an instruction to `block` and return its value, if `type`."""
+        dest = NONE if type is None else self.value(type)
+        self.blocks[block].append(op, dest, a, b, c)
+        return dest
+
+    def arguments(self, values: list[int]) -> int:
+        self.lists.append(values)
+        return len(self.lists) - 1
+
+    def operands(self, instruction: Instruction) -> Iterator[int]:
+        """The values used by `instruction`."""
+        op, _, *operands = instruction
+        for kind, operand in zip(SIGNATURES[op], operands, strict=False):
+            if kind == "v":
+                yield operand
+            elif kind == "l":
+                yield from self.lists[operand]
+
+    # Analyses
+
+    def predecessors(self) -> list[list[int]]:
+        """The predecessors of each block, in the order of the operands of its
+        phis."""
+        preds: list[list[int]] = [[] for _ in self.blocks]
+        for block in self.blocks:
+            for s in block.next:
+                preds[s].append(block.index)
+        return preds
+
+    def reverse_postorder(self) -> list[int]:
+        """The blocks that can be reached from the first one, each after its
+        predecessors except along back edges."""
+        order = []
+        visited = {0}
+        stack = [(0, iter(self.blocks[0].next))]
+        while stack:
+            block, successors = stack[-1]
+            for s in successors:
+                if s not in visited:
+                    visited.add(s)
+                    stack.append((s, iter(self.blocks[s].next)))
+                    break
+            else:
+                order.append(block)
+                stack.pop()
+        return order[::-1]
+
+    def dominators(self, order: list[int], preds: list[list[int]]) -> list[int]:
+        """The immediate dominator of each block, -1 for the first one and the
+        unreachable ones (Cooper, Harvey and Kennedy, "A Simple, Fast
+        Dominance Algorithm")."""
+        rank = {b: i for i, b in enumerate(order)}
+        idom = [NONE] * len(self.blocks)
+        idom[0] = 0
+
+        def intersect(a: int, b: int) -> int:
+            while a != b:
+                while rank[a] > rank[b]:
+                    a = idom[a]
+                while rank[b] > rank[a]:
+                    b = idom[b]
+            return a
+
+        changed = True
+        while changed:
+            changed = False
+            for b in order[1:]:
+                done = [p for p in preds[b] if idom[p] != NONE]
+                new = done[0]
+                for p in done[1:]:
+                    new = intersect(p, new)
+                if idom[b] != new:
+                    idom[b] = new
+                    changed = True
+        idom[0] = NONE
+        return idom
+
+    def __str__(self):
+        lines = [f"{self.name}:"]
+        for block in self.blocks:
+            lines.append(f"b{block.index}:")
+            for dest, args in block.phis:
+                values = ", ".join(f"v{a}" for a in args)
+                lines.append(f"  v{dest}: {self.type_name(dest)} = phi {values}")
+            lines += (f"  {self.format(i)}" for i in block if i[0] != Op.NOP)
+            if len(block.next) == 2:  # noqa: PLR2004
+                lines.append(
+                    f"  br v{block.condition}, b{block.next[0]}, b{block.next[1]}"
+                )
+            elif block.next:
+                lines.append(f"  br b{block.next[0]}")
+            else:
+                lines.append("  return")
+        return "\n".join(lines)
+
+    def type_name(self, value: int) -> str:
+        return Type(self.types[value]).name
+
+    def format(self, instruction: Instruction) -> str:
+        op, dest, *operands = instruction
+        args = []
+        for kind, operand in zip(SIGNATURES[op], operands, strict=False):
+            if kind == "v":
+                args.append(f"v{operand}")
+            elif kind == "x":
+                args.append(f"x{operand}")
+            elif kind == "l":
+                args.append("(" + ", ".join(f"v{v}" for v in self.lists[operand]) + ")")
+            else:
+                args.append(str(operand))
+        text = f"{Op(op).name.lower()} {', '.join(args)}".rstrip()
+        if dest == NONE:
+            return text
+        return f"v{dest}: {self.type_name(dest)} = {text}"
@@ -0,0 +1,303 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Builds the intermediate representation of a body, from its tree
+
+`IRGenerator` works for a `CodeGenerator`, on a tree that the code generator
+has already checked: it uses the symbols, the layout of the memory and the
+runtime of the code generator, and lays out the statements as blocks. The
+variables that are in WebAssembly locals (see `code_gen`) are IR variables,
+the other ones are loaded from memory and stored to it. `&` and `OR` are
+evaluated with branches, setting a temporary variable.
+"""
+
+from oberon0_compiler import ast, ir
+from oberon0_compiler.code_gen import (
+    BOOLEAN,
+    ArrayType,
+    Builtin,
+    CodeGenerator,
+    Constant,
+    Type,
+    Variable,
+    designator_of,
+    power_of_two,
+)
+from oberon0_compiler.ir import NONE, Op
+
+RELATIONS = {"=": Op.EQ, "#": Op.NE, "<": Op.LT, "<=": Op.LE, ">": Op.GT, ">=": Op.GE}
+ARITHMETIC = {"+": Op.ADD, "-": Op.SUB, "*": Op.MUL, "DIV": Op.DIV, "MOD": Op.MOD}
+
+
+def ir_type(type: Type) -> ir.Type:
+    return ir.Type.BOOL if type == BOOLEAN else ir.Type.INT
+
+
+class IRGenerator:
+    def __init__(self, gen: CodeGenerator):
+        self.gen = gen
+
+    def generate(self, node: ast.StatementSequence) -> ir.Function:
+        """The function of the body `node`, in the current scope of `gen`."""
+        self.fn = ir.Function(self.gen.scope.name)
+        self.block = self.fn.block()
+        self.variables: dict[int, int] = {}  # Local of a Variable: IR variable
+        for symbol in self.gen.scope.symbols.values():
+            if isinstance(symbol, Variable) and symbol.local is not None:
+                if symbol.local < self.gen.f.params:
+                    value = self.emit(Op.PARAM, ir_type(symbol.type), symbol.local)
+                else:
+                    value = self.const(0, ir_type(symbol.type))
+                self.emit(Op.SET, None, self.variable(symbol), value)
+        self.statement_sequence(node)
+        return self.fn
+
+    def emit(
+        self, op: Op, type: ir.Type | None = None, a: int = 0, b: int = 0, c: int = 0
+    ) -> int:
+        return self.fn.emit(self.block, op, type, a, b, c)
+
+    def const(self, value: int, type: ir.Type = ir.Type.INT) -> int:
+        return self.emit(Op.CONST, type, value)
+
+    def variable(self, symbol: Variable) -> int:
+        return self.variables.setdefault(symbol.local, len(self.variables))
+
+    def temporary(self) -> int:
+        self.variables[-1 - len(self.variables)] = len(self.variables)
+        return len(self.variables) - 1
+
+    def jump(self, target: int) -> None:
+        self.fn.blocks[self.block].next = [target]
+
+    def branch(self, condition: int, then: int, else_: int) -> None:
+        block = self.fn.blocks[self.block]
+        block.condition = condition
+        block.next = [then, else_]
+
+    # Expressions
+
+    def expression(self, node: ast.Node) -> int:  # noqa: C901, PLR0911, PLR0912
+        """The value of an expression."""
+        if isinstance(node, ast.ComplexExpression | ast.SimpleExpression):
+            value = self.gen.constant(node)
+            if value is not None:
+                return self.const(value.value, ir_type(value.type))
+        if isinstance(node, ast.ComplexExpression):
+            left = self.expression(node.simple_expression)
+            if node.relation is None:
+                return left
+            op, right = node.relation
+            right = self.expression(right)
+            return self.emit(RELATIONS[op], ir.Type.BOOL, left, right)
+        if isinstance(node, ast.SimpleExpression):
+            left = self.expression(node.term)
+            if node.sign == "-":
+                left = self.emit(Op.SUB, ir.Type.INT, self.const(0), left)
+            for op, term in node.addop_terms:
+                left = self.operation(left, op, term)
+            return left
+        if isinstance(node, ast.Term):
+            left = self.expression(node.factor)
+            for op, factor in node.mulop_factors:
+                left = self.operation(left, op, factor)
+            return left
+        if isinstance(node, ast.Number):
+            return self.const(node.value)
+        if isinstance(node, ast.SimpleFactor):
+            symbol = self.gen.lookup(node.ident)
+            if isinstance(symbol, Constant):
+                return self.const(symbol.value, ir_type(symbol.type))
+            if symbol.local is not None:
+                return self.emit(Op.GET, ir_type(symbol.type), self.variable(symbol))
+            type, address, offset = self.address(node)
+            return self.emit(Op.LOAD, ir_type(type), self.base(address), offset)
+        if isinstance(node, ast.ExpressionFactor):
+            return self.expression(node.expression)
+        if isinstance(node, ast.Negation):
+            return self.emit(Op.EQZ, ir.Type.BOOL, self.expression(node.factor))
+        if isinstance(node, ast.FunctionCall):
+            if self.gen.lookup(node.ident).name == "ODD":
+                value = self.expression(node.params[0])
+                return self.emit(Op.AND, ir.Type.BOOL, value, self.const(1))
+            self.flush()
+            eot = self.fn.arguments([])
+            return self.emit(Op.CALL, ir.Type.BOOL, self.gen.imports["Eot"], eot)
+        raise self.gen.error(f"unexpected '{node}'")
+
+    def operation(self, left: int, op: str, node: ast.Node) -> int:
+        if op in ("OR", "&"):
+            return self.short_circuit(left, op, node)
+        if op in ("DIV", "MOD"):
+            divisor = self.gen.constant(node)
+            shift = power_of_two(divisor.value if divisor else None)
+            if shift is not None and op == "DIV":
+                return self.emit(Op.SHR, ir.Type.INT, left, self.const(shift))
+            if shift is not None:
+                mask = self.const(divisor.value - 1)
+                return self.emit(Op.AND, ir.Type.INT, left, mask)
+        return self.emit(ARITHMETIC[op], ir.Type.INT, left, self.expression(node))
+
+    def short_circuit(self, left: int, op: str, node: ast.Node) -> int:
+        """`left OR node` or `left & node`, without evaluating `node` if the
+        result is `left`."""
+        result = self.temporary()
+        self.emit(Op.SET, None, result, left)
+        right, join = self.fn.block(), self.fn.block()
+        if op == "OR":
+            self.branch(left, join, right)
+        else:
+            self.branch(left, right, join)
+        self.block = right
+        self.emit(Op.SET, None, result, self.expression(node))
+        self.jump(join)
+        self.block = join
+        return self.emit(Op.GET, ir.Type.BOOL, result)
+
+    def address(self, node: ast.SimpleFactor | ast.Assignment) -> tuple[Type, int, int]:
+        """The type of a variable in memory, with its selectors, the value of
+        its address (or `NONE` for 0) and an offset to add to it."""
+        var = self.gen.variable(node.ident)
+        offset = 0
+        if var.ref is not None:
+            address = self.emit(Op.PARAM, ir.Type.ADDR, var.ref)
+        elif var.level > 0:
+            address = self.emit(Op.FRAME, ir.Type.ADDR)
+            offset = var.address
+        else:
+            address = NONE
+            offset = var.address
+        type = var.type
+        for selector in node.selector:
+            index = self.gen.constant(selector.expression)
+            if index is not None:
+                offset += index.value * type.element.size
+            else:
+                index = self.expression(selector.expression)
+                self.emit(Op.CHECK, None, index, type.length)
+                size = self.const(type.element.size)
+                scaled = self.emit(Op.MUL, ir.Type.ADDR, index, size)
+                if address == NONE:
+                    address = scaled
+                else:
+                    address = self.emit(Op.ADD, ir.Type.ADDR, address, scaled)
+            type = type.element
+        return type, address, offset
+
+    def base(self, address: int) -> int:
+        return self.const(0, ir.Type.ADDR) if address == NONE else address
+
+    def pointer(self, address: int, offset: int) -> int:
+        """The value of `address` plus `offset`."""
+        if address == NONE:
+            return self.const(offset, ir.Type.ADDR)
+        if offset:
+            return self.emit(Op.ADD, ir.Type.ADDR, address, self.const(offset))
+        return address
+
+    def reference(self, node: ast.SimpleFactor) -> tuple[Type, int]:
+        """The type and the address of a variable in memory."""
+        type, address, offset = self.address(node)
+        return type, self.pointer(address, offset)
+
+    # Statements
+
+    def statement_sequence(self, node: ast.StatementSequence) -> None:
+        for statement in node.statements:
+            self.statement(statement)
+
+    def statement(self, node: ast.Statement) -> None:
+        if isinstance(node, ast.Assignment):
+            self.assignment(node)
+        elif isinstance(node, ast.ProcedureCall):
+            self.procedure_call(node)
+        elif isinstance(node, ast.If):
+            self.if_statement(node)
+        elif isinstance(node, ast.While):
+            header, body, exit = self.fn.block(), self.fn.block(), self.fn.block()
+            self.jump(header)
+            self.block = header
+            self.branch(self.expression(node.condition), body, exit)
+            self.block = body
+            self.statement_sequence(node.body)
+            self.jump(header)
+            self.block = exit
+        elif isinstance(node, ast.Repeat):
+            body, exit = self.fn.block(), self.fn.block()
+            self.jump(body)
+            self.block = body
+            self.statement_sequence(node.body)
+            self.branch(self.expression(node.condition), exit, body)
+            self.block = exit
+
+    def if_statement(self, node: ast.If) -> None:
+        join = self.fn.block()
+        branches = [(node.condition, node.then), *(node.elsif or [])]
+        for condition, statements in branches:
+            then, else_ = self.fn.block(), self.fn.block()
+            self.branch(self.expression(condition), then, else_)
+            self.block = then
+            self.statement_sequence(statements)
+            self.jump(join)
+            self.block = else_
+        if node.else_:
+            self.statement_sequence(node.else_)
+        self.jump(join)
+        self.block = join
+
+    def assignment(self, node: ast.Assignment) -> None:
+        symbol = self.gen.lookup(node.ident)
+        if symbol.local is not None:
+            value = self.expression(node.expression)
+            self.emit(Op.SET, None, self.variable(symbol), value)
+            return
+        type, address, offset = self.address(node)
+        if isinstance(type, ArrayType):
+            address = self.pointer(address, offset)
+            _, source = self.reference(designator_of(node.expression))
+            self.emit(Op.MEMCPY, None, address, source, type.size)
+            return
+        value = self.expression(node.expression)
+        self.emit(Op.STORE, None, self.base(address), value, offset)
+
+    def procedure_call(self, node: ast.ProcedureCall) -> None:
+        symbol = self.gen.lookup(node.ident)
+        if isinstance(symbol, Builtin):
+            self.builtin_call(symbol.name, node)
+            return
+        args = []
+        for param, (by_ref, type) in zip(node.params, symbol.params, strict=True):
+            if by_ref or isinstance(type, ArrayType):
+                args.append(self.reference(designator_of(param))[1])
+            else:
+                args.append(self.expression(param))
+        self.call(symbol.index, args)
+
+    def builtin_call(self, name: str, node: ast.ProcedureCall) -> None:
+        if name == "ReadInt":
+            _, address = self.reference(designator_of(node.params[0]))
+            self.flush()
+            self.call(self.gen.imports["ReadInt"], [address])
+        elif name in ("WriteInt", "WriteChar", "WriteLn"):
+            args = [self.expression(p) for p in node.params]
+            if name == "WriteInt" and len(args) == 1:
+                args.append(self.const(0))
+            if self.gen.buffered_output:
+                self.call(self.gen.helper(name), args)
+            else:
+                self.call(self.gen.imports[name], args)
+        else:
+            self.call(self.gen.imports[name], [])
+
+    def call(self, index: int, args: list[int]) -> None:
+        self.emit(Op.CALL, None, index, self.fn.arguments(args))
+
+    def flush(self) -> None:
+        if self.gen.buffered_output:
+            self.call(self.gen.helper("Flush"), [])
+
+
+def generate(gen: CodeGenerator, node: ast.StatementSequence) -> ir.Function:
+    return IRGenerator(gen).generate(node)
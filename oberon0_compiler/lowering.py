@@ -0,0 +1,431 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Lowers a function of the intermediate representation to structured
+WebAssembly control flow
+
+The blocks are placed along the dominator tree, as in Ramsey, "Beyond
+Relooper: Recursive Translation of Unstructured Control Flow to Structured
+Control Flow": a loop header is wrapped in a `loop`, and the blocks that
+are reached from several others ("merges") follow a `block` that their
+predecessors leave with `br`. The phis are locals, set on the edges.
+
+A value used once, in the block that defines it, is left on the stack and
+computed where it is used, if nothing in between may write to the memory or
+trap, and the constants are computed where they are used. The other values
+are kept in locals, a phi sharing its local with its operands when their
+values are never needed at the same time.
+"""
+
+from collections import Counter
+from collections.abc import Iterable, Iterator
+
+from oberon0_compiler import ir
+from oberon0_compiler.code_gen import CodeGenerator
+from oberon0_compiler.ir import CLOBBERS, NONE, Function, Instruction
+from oberon0_compiler.wasm import VOID, Op
+
+OPERATIONS = {
+    ir.Op.ADD: Op.I32_ADD,
+    ir.Op.SUB: Op.I32_SUB,
+    ir.Op.MUL: Op.I32_MUL,
+    ir.Op.AND: Op.I32_AND,
+    ir.Op.SHR: Op.I32_SHR_S,
+    ir.Op.EQ: Op.I32_EQ,
+    ir.Op.NE: Op.I32_NE,
+    ir.Op.LT: Op.I32_LT_S,
+    ir.Op.LE: Op.I32_LE_S,
+    ir.Op.GT: Op.I32_GT_S,
+    ir.Op.GE: Op.I32_GE_S,
+}
+# The instructions that cannot be moved across each other, and what may not
+# move across them
+BARRIERS = CLOBBERS | {ir.Op.CHECK, ir.Op.DIV, ir.Op.MOD}
+NEVER = -1  # An epoch that is never reached
+REMATERIALIZED = frozenset(
+    [ir.Op.CONST, ir.Op.PARAM, ir.Op.FRAME]
+)  # Computed at each use
+NEGATIONS = {
+    ir.Op.EQ: Op.I32_NE,
+    ir.Op.NE: Op.I32_EQ,
+    ir.Op.LT: Op.I32_GE_S,
+    ir.Op.LE: Op.I32_GT_S,
+    ir.Op.GT: Op.I32_LE_S,
+    ir.Op.GE: Op.I32_LT_S,
+}
+
+
+class Lowering:
+    def __init__(self, gen: CodeGenerator, fn: Function):
+        self.gen = gen
+        self.fn = fn
+        self.f = gen.f
+        self.order = fn.reverse_postorder()
+        self.rank = {b: i for i, b in enumerate(self.order)}
+        self.preds = fn.predecessors()
+        idom = fn.dominators(self.order, self.preds)
+        self.children: list[list[int]] = [[] for _ in fn.blocks]
+        for b in self.order[1:]:
+            self.children[idom[b]].append(b)
+        self.headers = {
+            s for b in self.order for s in fn.blocks[b].next if self.backward(b, s)
+        }
+        self.merges = {
+            b
+            for b in self.order
+            if sum(not self.backward(p, b) for p in self.preds[b]) > 1
+        }
+        self.classes: dict[int, int] = {}  # Value: phi whose local it shares
+        self.locals: dict[int, int] = {}
+        self.context: list[tuple[str, int]] = []  # Enclosing constructs
+        self.exits = False  # Whether the code branches to its end
+        self.stack()
+        self.coalesce()
+
+    def backward(self, source: int, target: int) -> bool:
+        return self.rank[target] <= self.rank[source]
+
+    def stack(self) -> None:  # noqa: C901
+        """Find the values that are not kept in locals (`deferred`), with
+        their definitions."""
+        fn = self.fn
+        uses: Counter[int] = Counter()
+        self.definitions: dict[int, Instruction] = {}
+        for b in self.order:
+            block = fn.blocks[b]
+            for _, operands in block.phis:
+                uses.update(operands)
+            for instruction in block:
+                uses.update(fn.operands(instruction))
+                self.definitions[instruction[1]] = instruction
+            if block.condition != NONE:
+                uses[block.condition] += 1
+        self.uses = uses
+
+        self.deferred: set[int] = set()
+        for b in self.order:
+            block = fn.blocks[b]
+            once = {v for v in self.block_uses(b) if uses[v] == 1}
+            epoch = 0
+            needs: dict[int, int | None] = {}  # Value: epoch where it can be used
+            for instruction in block:
+                op, dest = instruction[0], instruction[1]
+                required = self.defer(fn.operands(instruction), needs, epoch)
+                if op in BARRIERS:
+                    epoch += 1
+                if op in REMATERIALIZED:
+                    self.deferred.add(dest)
+                elif dest in once:
+                    if op in BARRIERS or op == ir.Op.LOAD:
+                        needs[dest] = epoch
+                    else:
+                        needs[dest] = required
+            self.defer(self.block_uses(b, end=True), needs, epoch)
+
+    def block_uses(self, b: int, end: bool = False) -> list[int]:
+        """The values used in block `b`, or at its end only: its condition,
+        and the operands of the phis of its successor if it has only one."""
+        block = self.fn.blocks[b]
+        values = []
+        if not end:
+            for instruction in block:
+                values += self.fn.operands(instruction)
+        if block.condition != NONE:
+            values.append(block.condition)
+        if len(block.next) == 1:
+            values += (value for _, value in self.copies(b, block.next[0]))
+        return values
+
+    def defer(
+        self, values: Iterable[int], needs: dict[int, int | None], epoch: int
+    ) -> int | None:
+        """Leave on the stack the values that can be computed at `epoch`, and
+        return the epoch where the operation that uses them can be."""
+        required = set()
+        for v in values:
+            if v in needs and needs[v] in (None, epoch):
+                self.deferred.add(v)
+                required.add(needs[v])
+        required.discard(None)
+        if not required:
+            return None
+        return required.pop() if len(required) == 1 else NEVER
+
+    # Locals
+
+    def reads(self, values: Iterable[int]) -> Iterator[int]:
+        """The values in locals that are read to compute `values`."""
+        for v in values:
+            if v in self.deferred:
+                yield from self.reads(self.fn.operands(self.definitions[v]))
+            else:
+                yield v
+
+    def live_out(self, b: int, live_in: dict[int, set[int]]) -> set[int]:
+        block = self.fn.blocks[b]
+        live = set(self.reads([block.condition] if block.condition != NONE else []))
+        for s in block.next:
+            index = self.preds[s].index(b)
+            live.update(
+                self.reads(operands[index] for _, operands in self.fn.blocks[s].phis)
+            )
+            live |= live_in[s]
+        return live
+
+    def coalesce(self) -> None:  # noqa: C901
+        """Put a phi and its operands in the same local when none of them is
+        live where another one is defined (Budimlić et al., "Fast Copy
+        Coalescing and Live-Range Identification")."""
+        fn = self.fn
+        live_in: dict[int, set[int]] = {b: set() for b in self.order}
+        interference: dict[int, set[int]] = {}  # Value: live where it is defined
+        changed = True
+        while changed:
+            changed = False
+            for b in reversed(self.order):
+                block = fn.blocks[b]
+                live = self.live_out(b, live_in)
+                for instruction in reversed(list(block)):
+                    dest = instruction[1]
+                    if dest in self.deferred:
+                        continue
+                    live.discard(dest)
+                    interference[dest] = set(live)
+                    live.update(self.reads(fn.operands(instruction)))
+                for phi, _ in block.phis:
+                    interference[phi] = live - {phi}
+                live -= {phi for phi, _ in block.phis}
+                if live != live_in[b]:
+                    live_in[b] = live
+                    changed = True
+
+        members = {}
+        for b in self.order:
+            for phi, operands in fn.blocks[b].phis:
+                for value in operands:
+                    a, c = self.find(phi), self.find(value)
+                    if a == c or value in self.deferred:
+                        continue
+                    group_a = members.get(a, [a])
+                    group_c = members.get(c, [c])
+                    if not any(
+                        x in interference[y] or y in interference[x]
+                        for x in group_a
+                        for y in group_c
+                    ):
+                        self.classes[c] = a
+                        members[a] = group_a + group_c
+
+    def find(self, value: int) -> int:
+        while value in self.classes:
+            value = self.classes[value]
+        return value
+
+    def local(self, value: int) -> int:
+        value = self.find(value)
+        if value not in self.locals:
+            self.locals[value] = self.f.local()
+        return self.locals[value]
+
+    # Values
+
+    def push(self, value: int) -> None:
+        if value in self.deferred:
+            self.evaluate(self.definitions[value])
+        else:
+            self.f.emit(Op.LOCAL_GET, self.local(value))
+
+    def push_negated(self, value: int) -> None:
+        """Push the negation of a BOOLEAN value."""
+        op, _, a, b, _ = self.definitions.get(value, (ir.Op.NOP, NONE, 0, 0, 0))
+        if value in self.deferred and op in NEGATIONS:
+            self.push(a)
+            self.push(b)
+            self.f.emit(NEGATIONS[op])
+        elif value in self.deferred and op == ir.Op.EQZ:
+            self.push(a)
+        else:
+            self.push(value)
+            self.f.emit(Op.I32_EQZ)
+
+    def instruction(self, instruction: Instruction) -> None:
+        dest = instruction[1]
+        if dest in self.deferred:
+            return
+        self.evaluate(instruction)
+        if dest != NONE:
+            if self.uses[dest]:
+                self.f.emit(Op.LOCAL_SET, self.local(dest))
+            else:
+                self.f.emit(Op.DROP)
+
+    def evaluate(self, instruction: Instruction) -> None:  # noqa: C901
+        f, gen = self.f, self.gen
+        op, _, a, b, c = instruction
+        if op == ir.Op.CONST:
+            f.i32_const(a)
+        elif op == ir.Op.PARAM:
+            f.emit(Op.LOCAL_GET, a)
+        elif op == ir.Op.FRAME:
+            f.emit(Op.LOCAL_GET, gen.scope.fp)
+        elif op in OPERATIONS:
+            self.push(a)
+            self.push(b)
+            f.emit(OPERATIONS[op])
+        elif op in (ir.Op.DIV, ir.Op.MOD):
+            self.push(a)
+            self.push(b)
+            f.emit(Op.CALL, gen.helper("Div" if op == ir.Op.DIV else "Mod"))
+        elif op == ir.Op.EQZ:
+            self.push(a)
+            f.emit(Op.I32_EQZ)
+        elif op == ir.Op.LOAD:
+            self.push(a)
+            f.load(b)
+        elif op == ir.Op.STORE:
+            self.push(a)
+            self.push(b)
+            f.store(c)
+        elif op == ir.Op.CHECK:
+            self.push(a)
+            f.i32_const(b)
+            f.emit(Op.I32_GE_U)
+            f.emit(Op.IF, VOID)
+            f.emit(Op.CALL, gen.helper("Trap"))
+            f.emit(Op.END)
+        elif op == ir.Op.CALL:
+            for value in self.fn.lists[b]:
+                self.push(value)
+            f.emit(Op.CALL, a)
+        elif op == ir.Op.MEMCPY:
+            self.push(a)
+            self.push(b)
+            f.i32_const(c)
+            f.memory_copy()
+
+    # Control flow
+
+    def lower(self) -> None:
+        code = self.f.code
+        start = len(code)
+        self.tree(0)
+        if self.exits:
+            code[start:start] = bytes([Op.BLOCK, VOID])
+            code.append(Op.END)
+
+    def tree(self, b: int) -> None:
+        merges = sorted(
+            (c for c in self.children[b] if c in self.merges),
+            key=self.rank.__getitem__,
+            reverse=True,
+        )
+        if b in self.headers:
+            self.f.emit(Op.LOOP, VOID)
+            self.context.append(("loop", b))
+            self.within(b, merges)
+            self.context.pop()
+            self.f.emit(Op.END)
+        else:
+            self.within(b, merges)
+
+    def within(self, b: int, merges: list[int]) -> None:
+        """Block `b`, followed by the merges that it dominates."""
+        if not merges:
+            for instruction in self.fn.blocks[b]:
+                self.instruction(instruction)
+            self.leave(b)
+            return
+        self.f.emit(Op.BLOCK, VOID)
+        self.context.append(("block", merges[0]))
+        self.within(b, merges[1:])
+        self.context.pop()
+        self.f.emit(Op.END)
+        self.tree(merges[0])
+
+    def leave(self, b: int) -> None:
+        f = self.f
+        block = self.fn.blocks[b]
+        if not block.next:
+            # The end of the function, unless a merge follows
+            if any(kind == "block" for kind, _ in self.context):
+                self.exits = True
+                f.emit(Op.BR, len(self.context))
+            return
+        if len(block.next) == 1:
+            self.branch(b, block.next[0])
+            return
+        then, else_ = block.next
+        if self.jump(b, else_) and not self.falls(else_):
+            self.push_negated(block.condition)
+            f.emit(Op.BR_IF, self.depth(b, else_))
+            self.branch(b, then)
+        elif self.jump(b, then) and not self.falls(then):
+            self.push(block.condition)
+            f.emit(Op.BR_IF, self.depth(b, then))
+            self.branch(b, else_)
+        else:
+            if self.jump(b, then):  # And falls through to it
+                self.push_negated(block.condition)
+                then, else_ = else_, then
+            else:
+                self.push(block.condition)
+            f.emit(Op.IF, VOID)
+            self.context.append(("if", NONE))
+            self.branch(b, then)
+            f.emit(Op.ELSE)
+            start = len(f.code)
+            self.branch(b, else_)
+            if len(f.code) == start:
+                del f.code[start - 1]  # The ELSE
+            self.context.pop()
+            f.emit(Op.END)
+
+    def jump(self, source: int, target: int) -> bool:
+        """Whether the edge is a `br` without copies."""
+        return (
+            self.backward(source, target) or target in self.merges
+        ) and not self.copies(source, target)
+
+    def falls(self, target: int) -> bool:
+        """Whether the code reaches merge `target` without `br`."""
+        for kind, b in reversed(self.context):
+            if kind != "if":
+                return (kind, b) == ("block", target)
+        return False
+
+    def depth(self, source: int, target: int) -> int:
+        kind = "loop" if self.backward(source, target) else "block"
+        for i, frame in enumerate(reversed(self.context)):
+            if frame == (kind, target):
+                return i
+        raise AssertionError(f"no {kind} for b{target}")
+
+    def copies(self, source: int, target: int) -> list[tuple[int, int]]:
+        """The phis of `target` to set along the edge: phi, value."""
+        index = self.preds[target].index(source)
+        return [
+            (phi, operands[index])
+            for phi, operands in self.fn.blocks[target].phis
+            if self.find(operands[index]) != self.find(phi)
+        ]
+
+    def branch(self, source: int, target: int) -> None:
+        copies = self.copies(source, target)
+        for _, value in copies:
+            self.push(value)
+        for phi, _ in reversed(copies):
+            self.f.emit(Op.LOCAL_SET, self.local(phi))
+        if self.backward(source, target):
+            self.f.emit(Op.BR, self.depth(source, target))
+        elif target in self.merges:
+            if not self.falls(target):
+                self.f.emit(Op.BR, self.depth(source, target))
+        else:
+            self.tree(target)
+
+
+def lower(gen: CodeGenerator, fn: Function) -> None:
+    """Append the code of `fn` to the current function of `gen`."""
+    Lowering(gen, fn).lower()
@@ -0,0 +1,410 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Optimization of an Oberon-0 tree, between the parser and the code generator
+
+`optimize` returns a copy of a tree where:
+
+- constants are replaced by their values, and constant subexpressions by their
+  results, computed like the generated code does: on 32 bits, wrapping around
+  on overflow, with DIV and MOD rounding down;
+- the constant operands of sums and of products are combined, as arithmetic
+  modulo 2**32 is associative and commutative, and neutral operands dropped;
+- the branches of IF statements whose condition is FALSE, and those after a
+  branch whose condition is TRUE, are removed, as are the WHILE loops whose
+  condition is FALSE and the REPEAT loops that end with UNTIL TRUE;
+- the procedures that are neither exported nor called are removed.
+
+Operands that are not constant are always kept, as they may trap or call
+`Eot`. The tree must be correct: `CodeGenerator` checks it before optimizing
+it, so that the errors in the code that is removed are reported.
+"""
+
+from collections.abc import Callable
+
+from oberon0_compiler import ast
+from oberon0_compiler.code_gen import (
+    BOOLEAN,
+    INTEGER,
+    MAX_INT,
+    MIN_INT,
+    OPERATIONS,
+    RELATIONS,
+    UNIVERSE,
+    Builtin,
+    Constant,
+    wrap,
+)
+
+# A constant, the qualified name of a procedure, or another declaration
+Symbol = Constant | str | None
+# An operator, its operand, and the value of the operand if it is constant
+Operand = tuple[str, ast.Node, Constant | None]
+Make = Callable[[Constant], ast.Node]  # Makes a literal
+
+NEUTRAL = {"+": 0, "-": 0, "*": 1, "DIV": 1, "OR": 0, "&": 1}
+ABSORBING = {"OR": 1, "&": 0}  # Operands after it are not evaluated
+
+
+def term(factor: ast.Factor) -> ast.Term:
+    return ast.Term(factor=factor, mulop_factors=[])
+
+
+def simple_expression(factor: ast.Factor) -> ast.SimpleExpression:
+    return ast.SimpleExpression(sign=None, term=term(factor), addop_terms=[])
+
+
+def expression(factor: ast.Factor) -> ast.ComplexExpression:
+    return ast.ComplexExpression(
+        simple_expression=simple_expression(factor), relation=None
+    )
+
+
+def single_factor(node: ast.ComplexExpression) -> ast.Factor | None:
+    """The factor that is all of `node`, if any."""
+    simple = node.simple_expression
+    if node.relation or simple.sign or simple.addop_terms or simple.term.mulop_factors:
+        return None
+    return simple.term.factor
+
+
+class Optimizer:
+    def optimize(self, module: ast.Module) -> ast.Module:
+        self.scopes: list[dict[str, Symbol]] = [{}]
+        self.names = [module.ident]  # Qualified names of the procedures
+        self.calls: dict[str, set[str]] = {module.ident: set()}
+        self.roots = {module.ident}
+        declarations = self.declarations(module.Declarations)
+        body = self.statement_sequence(module.body)
+        used = self.reachable()
+        return module.model_copy(
+            update={
+                "Declarations": self.prune(declarations, module.ident, used),
+                "body": body,
+            }
+        )
+
+    def lookup(self, name: str) -> Symbol | Builtin:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return UNIVERSE.get(name)
+
+    def literal(self, value: Constant) -> ast.Factor:
+        if value.type == INTEGER:
+            return ast.Number(value=value.value)
+        name = "TRUE" if value.value else "FALSE"
+        if self.lookup(name) == UNIVERSE[name]:
+            return ast.SimpleFactor(ident=name, selector=[])
+        # TRUE or FALSE is declared again
+        zero = simple_expression(ast.Number(value=0))
+        relation = ("=" if value.value else "#", zero)
+        return ast.ExpressionFactor(
+            expression=ast.ComplexExpression(simple_expression=zero, relation=relation)
+        )
+
+    # Procedures
+
+    def reachable(self) -> set[str]:
+        """The procedures that may be called, and the module."""
+        reached: set[str] = set()
+        todo = list(self.roots)
+        while todo:
+            name = todo.pop()
+            if name not in reached:
+                reached.add(name)
+                todo.extend(self.calls[name])
+        return reached
+
+    def prune(
+        self, node: ast.Declarations, name: str, used: set[str]
+    ) -> ast.Declarations:
+        procedures = []
+        for p in node.procedure_declarations:
+            qualified = f"{name}.{p.ident}"
+            if qualified in used:
+                declarations = self.prune(p.declarations, qualified, used)
+                procedures.append(p.model_copy(update={"declarations": declarations}))
+        return node.model_copy(update={"procedure_declarations": procedures})
+
+    # Declarations
+
+    def declarations(self, node: ast.Declarations) -> ast.Declarations:
+        scope = self.scopes[-1]
+        constants = []
+        for d in node.const_declarations:
+            e, value = self.expression(d.expression)
+            scope[d.ident] = value
+            constants.append(d.model_copy(update={"expression": e}))
+        types = []
+        for d in node.type_declarations:
+            types.append(d.model_copy(update={"type": self.type(d.type)}))
+            scope[d.ident] = None
+        variables = []
+        for d in node.var_declarations:
+            variables.append(d.model_copy(update={"type": self.type(d.type)}))
+            scope.update(dict.fromkeys(d.ident_list))
+        return ast.Declarations(
+            const_declarations=constants,
+            type_declarations=types,
+            var_declarations=variables,
+            procedure_declarations=[
+                self.procedure(d) for d in node.procedure_declarations
+            ],
+        )
+
+    def type(self, node: ast.Type) -> ast.Type:
+        if isinstance(node, ast.ArrayType):
+            size, _ = self.expression(node.size)
+            return node.model_copy(update={"size": size, "type": self.type(node.type)})
+        return node
+
+    def procedure(self, node: ast.ProcedureDeclaration) -> ast.ProcedureDeclaration:
+        name = f"{self.names[-1]}.{node.ident}"
+        self.scopes[-1][node.ident] = name
+        self.calls[name] = set()
+        if node.exported:
+            self.roots.add(name)
+        params = [p.model_copy(update={"type": self.type(p.type)}) for p in node.params]
+        self.names.append(name)
+        self.scopes.append(
+            dict.fromkeys(ident for p in node.params for ident in p.ident_list)
+        )
+        declarations = self.declarations(node.declarations)
+        body = self.statement_sequence(node.body)
+        self.scopes.pop()
+        self.names.pop()
+        return node.model_copy(
+            update={"params": params, "declarations": declarations, "body": body}
+        )
+
+    # Statements
+
+    def statement_sequence(self, node: ast.StatementSequence) -> ast.StatementSequence:
+        statements = []
+        for statement in node.statements:
+            statements += self.statement(statement)
+        return ast.StatementSequence(statements=statements)
+
+    def statement(self, node: ast.Statement) -> list[ast.Statement]:  # noqa: PLR0911
+        """The statements that replace `node`."""
+        if isinstance(node, ast.Assignment):
+            return [
+                node.model_copy(
+                    update={
+                        "selector": self.selectors(node.selector),
+                        "expression": self.expression(node.expression)[0],
+                    }
+                )
+            ]
+        if isinstance(node, ast.ProcedureCall):
+            symbol = self.lookup(node.ident)
+            if isinstance(symbol, str):
+                self.calls[self.names[-1]].add(symbol)
+            params = [self.expression(p)[0] for p in node.params]
+            return [node.model_copy(update={"params": params})]
+        if isinstance(node, ast.If):
+            return self.if_statement(node)
+        if isinstance(node, ast.While):
+            condition, value = self.expression(node.condition)
+            if value is not None and not value.value:
+                return []
+            body = self.statement_sequence(node.body)
+            return [ast.While(condition=condition, body=body)]
+        if isinstance(node, ast.Repeat):
+            body = self.statement_sequence(node.body)
+            condition, value = self.expression(node.condition)
+            if value is not None and value.value:
+                return body.statements
+            return [ast.Repeat(body=body, condition=condition)]
+        return []  # Empty
+
+    def if_statement(self, node: ast.If) -> list[ast.Statement]:
+        branches = []
+        else_ = node.else_
+        for c, statements in [(node.condition, node.then), *(node.elsif or [])]:
+            condition, value = self.expression(c)
+            if value is None:
+                branches.append((condition, self.statement_sequence(statements)))
+            elif value.value:
+                else_ = statements
+                break
+        else_ = self.statement_sequence(else_) if else_ else None
+        if not branches:
+            return else_.statements if else_ else []
+        (condition, then), *elsif = branches
+        return [ast.If(condition=condition, then=then, elsif=elsif, else_=else_)]
+
+    # Expressions. Each method returns the optimized node, and its value if it
+    # is constant, in which case the node is a literal.
+
+    def expression(
+        self, node: ast.ComplexExpression
+    ) -> tuple[ast.ComplexExpression, Constant | None]:
+        left, value = self.simple(node.simple_expression)
+        if node.relation is None:
+            return node.model_copy(update={"simple_expression": left}), value
+        op, right = node.relation
+        right, right_value = self.simple(right)
+        if value is not None and right_value is not None:
+            value = Constant(
+                BOOLEAN, int(RELATIONS[op](value.value, right_value.value))
+            )
+            return expression(self.literal(value)), value
+        return ast.ComplexExpression(simple_expression=left, relation=(op, right)), None
+
+    def simple(
+        self, node: ast.SimpleExpression
+    ) -> tuple[ast.SimpleExpression, Constant | None]:
+        first, value = self.term(node.term)
+        if not node.addop_terms and node.sign != "-":
+            return node.model_copy(update={"sign": None, "term": first}), value
+        operands = [(node.sign or "+", first, value)]
+        operands += [(op, *self.term(t)) for op, t in node.addop_terms]
+
+        def make(value: Constant) -> ast.Term:
+            return term(self.literal(value))
+
+        if operands[-1][0] == "OR":
+            operands = self.boolean("OR", operands, make)
+        else:
+            operands = self.commute("+", operands, make)
+        (op, first, value), *rest = operands
+        if value is not None and not rest:
+            return simple_expression(first.factor), value
+        sign = "-" if op == "-" else None
+        addop_terms = [(op, t) for op, t, _ in rest]
+        return (
+            ast.SimpleExpression(sign=sign, term=first, addop_terms=addop_terms),
+            None,
+        )
+
+    def term(self, node: ast.Term) -> tuple[ast.Term, Constant | None]:
+        first, value = self.factor(node.factor)
+        if not node.mulop_factors:
+            return node.model_copy(update={"factor": first}), value
+        operands = [("*", first, value)]
+        operands += [(op, *self.factor(f)) for op, f in node.mulop_factors]
+        ops = {op for op, _, _ in operands}
+        if "&" in ops:
+            operands = self.boolean("&", operands, self.literal)
+        elif ops == {"*"}:
+            operands = self.commute("*", operands, self.literal)
+        else:
+            operands = self.fold(operands, self.literal)
+        (_, first, value), *rest = operands
+        if value is not None and not rest:
+            return term(first), value
+        mulop_factors = [(op, f) for op, f, _ in rest]
+        return ast.Term(factor=first, mulop_factors=mulop_factors), None
+
+    @staticmethod
+    def commute(op: str, operands: list[Operand], make: Make) -> list[Operand]:
+        """Combine the constant operands of a sum or a product into one, at
+        its end."""
+        total = NEUTRAL[op]
+        kept = []
+        for o, node, value in operands:
+            if value is None:
+                kept.append((o, node, None))
+            elif o == "-":
+                total -= value.value
+            else:
+                total = OPERATIONS[o](total, value.value)
+        total = wrap(total)
+        if not kept:
+            value = Constant(INTEGER, total)
+            return [(op, make(value), value)]
+        if op == "+" and MIN_INT < total < 0:
+            value = Constant(INTEGER, -total)
+            kept.append(("-", make(value), value))
+        elif total != NEUTRAL[op]:
+            value = Constant(INTEGER, total)
+            kept.append((op, make(value), value))
+        return kept
+
+    @staticmethod
+    def fold(operands: list[Operand], make: Make) -> list[Operand]:
+        """Fold the constant operands at the start of a chain of operations
+        that do not commute, and drop its neutral operands."""
+        (op, first, value), *rest = operands
+        while value is not None and rest and rest[0][2] is not None:
+            o, _, right = rest[0]
+            if o in ("DIV", "MOD") and right.value == 0:
+                break
+            if o == "DIV" and value.value == MIN_INT and right.value == -1:
+                break  # Traps at run time
+            value = Constant(INTEGER, wrap(OPERATIONS[o](value.value, right.value)))
+            first = make(value)
+            rest.pop(0)
+        rest = [o for o in rest if o[2] is None or o[2].value != NEUTRAL.get(o[0])]
+        if value is not None and value.value == 1 and rest and rest[0][0] == "*":
+            return rest  # 1 * x
+        return [(op, first, value), *rest]
+
+    @staticmethod
+    def boolean(op: str, operands: list[Operand], make: Make) -> list[Operand]:
+        """Drop the neutral constant operands of a disjunction or a
+        conjunction, and the operands after an absorbing one, which are not
+        evaluated."""
+        kept = []
+        for operand in operands:
+            value = operand[2]
+            if value is None or value.value == ABSORBING[op]:
+                kept.append(operand)
+            if value is not None and value.value == ABSORBING[op]:
+                break
+        if not kept:
+            value = Constant(BOOLEAN, NEUTRAL[op])
+            return [(op, make(value), value)]
+        return kept
+
+    def factor(  # noqa: C901, PLR0911
+        self, node: ast.Factor
+    ) -> tuple[ast.Factor, Constant | None]:
+        if isinstance(node, ast.Number):
+            return node, (
+                Constant(INTEGER, node.value) if node.value <= MAX_INT else None
+            )
+        if isinstance(node, ast.SimpleFactor):
+            if node.selector:
+                return (
+                    node.model_copy(update={"selector": self.selectors(node.selector)}),
+                    None,
+                )
+            symbol = self.lookup(node.ident)
+            if isinstance(symbol, Constant):
+                return self.literal(symbol), symbol
+            return node, None
+        if isinstance(node, ast.ExpressionFactor):
+            e, value = self.expression(node.expression)
+            if value is not None:
+                return self.literal(value), value
+            return single_factor(e) or ast.ExpressionFactor(expression=e), None
+        if isinstance(node, ast.Negation):
+            factor, value = self.factor(node.factor)
+            if value is not None:
+                value = Constant(BOOLEAN, 1 - value.value)
+                return self.literal(value), value
+            if isinstance(factor, ast.Negation):
+                return factor.factor, None
+            return ast.Negation(factor=factor), None
+        if isinstance(node, ast.FunctionCall):
+            params = [self.expression(p) for p in node.params]
+            if self.lookup(node.ident) == UNIVERSE["ODD"] and params[0][1]:
+                value = Constant(BOOLEAN, params[0][1].value & 1)
+                return self.literal(value), value
+            return node.model_copy(update={"params": [p for p, _ in params]}), None
+        return node, None
+
+    def selectors(self, selectors: list[ast.IndexSelector]) -> list[ast.IndexSelector]:
+        return [
+            s.model_copy(update={"expression": self.expression(s.expression)[0]})
+            for s in selectors
+        ]
+
+
+def optimize(module: ast.Module) -> ast.Module:
+    return Optimizer().optimize(module)
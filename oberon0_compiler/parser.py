@@ -0,0 +1,453 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Oberon-0 recursive-descent parser
+
+The parser reports every syntax error of a module in one pass. An error is
+recorded in `errors` instead of being raised, and the parser resynchronizes
+on the symbols that can follow the construct it was parsing: `;`, `END`,
+`ELSIF`, ... for statements, `CONST`, `TYPE`, `VAR`, `PROCEDURE`, `BEGIN`
+for declarations. A missing symbol is reported and assumed to be present. As
+in Wirth's compilers, an error at the position of the previous one is not
+reported, so that a single mistake does not produce a cascade of errors.
+"""
+
+from pydantic import BaseModel, ConfigDict
+
+from compiler_common.instrument import trace_calls
+from oberon0_compiler import ast
+from oberon0_compiler.scanner import Scanner
+from oberon0_compiler.tokens import Token
+
+RELATIONS = {Token.EQL, Token.NEQ, Token.LSS, Token.LEQ, Token.GTR, Token.GEQ}
+ADD_OPERATORS = {Token.PLUS, Token.MINUS, Token.OR}
+MUL_OPERATORS = {Token.TIMES, Token.DIV, Token.MOD, Token.AND}
+
+STATEMENT_START = {Token.IDENT, Token.IF, Token.WHILE, Token.REPEAT}
+STATEMENT_FOLLOW = {
+    Token.SEMICOLON,
+    Token.END,
+    Token.ELSE,
+    Token.ELSIF,
+    Token.UNTIL,
+    Token.EOF,
+}
+STATEMENT_NEXT = STATEMENT_FOLLOW | STATEMENT_START
+# Where to resume after an error in a statement. Identifiers are left out, as
+# they also appear inside expressions.
+STATEMENT_SYNC = STATEMENT_FOLLOW | {Token.IF, Token.WHILE, Token.REPEAT}
+
+DECLARATION_START = {Token.CONST, Token.TYPE, Token.VAR, Token.PROCEDURE}
+DECLARATION_SYNC = DECLARATION_START | {
+    Token.SEMICOLON,
+    Token.BEGIN,
+    Token.END,
+    Token.EOF,
+}
+
+# Where to resume after an error in an expression
+EXPRESSION_SYNC = STATEMENT_SYNC | {
+    Token.RPAREN,
+    Token.RBRACK,
+    Token.COMMA,
+    Token.THEN,
+    Token.DO,
+    Token.OF,
+    Token.BECOMES,
+}
+FACTOR_SYNC = EXPRESSION_SYNC | RELATIONS | ADD_OPERATORS | MUL_OPERATORS
+
+BUILTIN_TYPES = {"INTEGER": ast.IntegerType, "BOOLEAN": ast.BooleanType}
+
+RULES = (
+    "module",
+    "declarations",
+    "declaration",
+    "procedure_declaration",
+    "formal_parameters",
+    "type",
+    "statement_sequence",
+    "statement",
+    "assignment_or_call",
+    "if_statement",
+    "while_statement",
+    "repeat_statement",
+    "expression",
+    "simple_expression",
+    "term",
+    "factor",
+)
+
+
+class Parser(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+    scanner: Scanner
+    errors: list[SyntaxError] = []
+    trace: bool = False  # Log every rule (see compiler_common.instrument)
+
+    _last_error: tuple[int, int] = (0, 0)  # Line and column
+
+    def model_post_init(self, context):
+        if self.trace:
+            trace_calls(self, RULES)
+
+    @property
+    def has_error(self) -> bool:
+        return bool(self.errors)
+
+    # Error handling
+
+    def error(self, msg: str) -> None:
+        """Record an error at the current symbol, unless there already is one
+        there."""
+        location = self.scanner.location()
+        if location > self._last_error:
+            self.errors.append(self.scanner.error(msg))
+            self._last_error = location
+
+    def next(self) -> None:
+        try:
+            self.scanner.get_next_symbol()
+        except SyntaxError as e:  # Unterminated comment
+            self.errors.append(e)
+            self.scanner.skip_to_end()
+
+    def skip(self, stop: set[Token]) -> None:
+        while self.scanner.sym not in stop:
+            self.next()
+
+    def expect(self, token: Token) -> None:
+        if self.scanner.sym == token:
+            self.next()
+        else:
+            self.error(f"Expected '{token}', but got '{self.scanner.sym}'")
+
+    def ident(self) -> str:
+        """The value of an expected identifier, or "" if it is missing."""
+        if self.scanner.sym != Token.IDENT:
+            self.error(f"Expected identifier, but got '{self.scanner.sym}'")
+            return ""
+        value = self.scanner.value
+        self.next()
+        return value
+
+    def ident_list(self) -> list[str]:
+        idents = [self.ident()]
+        while self.scanner.sym == Token.COMMA:
+            self.next()
+            idents.append(self.ident())
+        return idents
+
+    def end_name(self, name: str) -> None:
+        """The name after the `END` of a module or a procedure."""
+        if self.scanner.sym == Token.IDENT and self.scanner.value != name:
+            self.error(f"Expected '{name}', but got '{self.scanner.value}'")
+        self.ident()
+
+    # Expressions
+
+    def selector(self) -> list[ast.IndexSelector]:
+        selectors = []
+        while self.scanner.sym == Token.LBRACK:
+            self.next()
+            selectors.append(ast.IndexSelector(expression=self.expression()))
+            self.expect(Token.RBRACK)
+        return selectors
+
+    def actual_parameters(self) -> list[ast.Expression]:
+        self.expect(Token.LPAREN)
+        params = []
+        if self.scanner.sym != Token.RPAREN:
+            params.append(self.expression())
+            while self.scanner.sym == Token.COMMA:
+                self.next()
+                params.append(self.expression())
+        self.expect(Token.RPAREN)
+        return params
+
+    def factor(self) -> ast.Factor:
+        sym = self.scanner.sym
+        if sym == Token.IDENT:
+            ident = self.ident()
+            if self.scanner.sym == Token.LPAREN:
+                return ast.FunctionCall(ident=ident, params=self.actual_parameters())
+            return ast.SimpleFactor(ident=ident, selector=self.selector())
+        if sym == Token.NUMBER:
+            value = self.scanner.value
+            self.next()
+            return ast.Number(value=value)
+        if sym == Token.LPAREN:
+            self.next()
+            expression = self.expression()
+            self.expect(Token.RPAREN)
+            return ast.ExpressionFactor(expression=expression)
+        if sym == Token.NOT:
+            self.next()
+            return ast.Negation(factor=self.factor())
+        self.error(f"Expected factor, but got '{sym}'")
+        self.skip(FACTOR_SYNC)
+        return ast.Number(value=0)
+
+    def term(self) -> ast.Term:
+        factor = self.factor()
+        mulop_factors = []
+        while self.scanner.sym in MUL_OPERATORS:
+            op = str(self.scanner.sym)
+            self.next()
+            mulop_factors.append((op, self.factor()))
+        return ast.Term(factor=factor, mulop_factors=mulop_factors)
+
+    def simple_expression(self) -> ast.SimpleExpression:
+        sign = None
+        if self.scanner.sym in (Token.PLUS, Token.MINUS):
+            sign = str(self.scanner.sym)
+            self.next()
+        term = self.term()
+        addop_terms = []
+        while self.scanner.sym in ADD_OPERATORS:
+            op = str(self.scanner.sym)
+            self.next()
+            addop_terms.append((op, self.term()))
+        return ast.SimpleExpression(sign=sign, term=term, addop_terms=addop_terms)
+
+    def expression(self) -> ast.ComplexExpression:
+        simple_expression = self.simple_expression()
+        relation = None
+        if self.scanner.sym in RELATIONS:
+            op = str(self.scanner.sym)
+            self.next()
+            relation = (op, self.simple_expression())
+        return ast.ComplexExpression(
+            simple_expression=simple_expression, relation=relation
+        )
+
+    # Statements
+
+    def if_statement(self) -> ast.If:
+        self.next()
+        condition = self.expression()
+        self.expect(Token.THEN)
+        then = self.statement_sequence()
+        elsif = []
+        while self.scanner.sym == Token.ELSIF:
+            self.next()
+            c = self.expression()
+            self.expect(Token.THEN)
+            elsif.append((c, self.statement_sequence()))
+        else_ = None
+        if self.scanner.sym == Token.ELSE:
+            self.next()
+            else_ = self.statement_sequence()
+        self.expect(Token.END)
+        return ast.If(condition=condition, then=then, elsif=elsif, else_=else_)
+
+    def while_statement(self) -> ast.While:
+        self.next()
+        condition = self.expression()
+        self.expect(Token.DO)
+        body = self.statement_sequence()
+        self.expect(Token.END)
+        return ast.While(condition=condition, body=body)
+
+    def repeat_statement(self) -> ast.Repeat:
+        self.next()
+        body = self.statement_sequence()
+        self.expect(Token.UNTIL)
+        return ast.Repeat(body=body, condition=self.expression())
+
+    def assignment_or_call(self) -> ast.Statement:
+        ident = self.ident()
+        selector = self.selector()
+        if self.scanner.sym in (Token.BECOMES, Token.EQL):
+            if self.scanner.sym == Token.EQL:
+                self.error("Expected ':=', but got '='")
+            self.next()
+            return ast.Assignment(
+                ident=ident, selector=selector, expression=self.expression()
+            )
+        if selector:
+            self.expect(Token.BECOMES)
+            return ast.Statement()
+        params = []
+        if self.scanner.sym == Token.LPAREN:
+            params = self.actual_parameters()
+        return ast.ProcedureCall(ident=ident, params=params)
+
+    def statement(self) -> ast.Statement:
+        sym = self.scanner.sym
+        if sym not in STATEMENT_NEXT:
+            self.error(f"Expected statement, but got '{sym}'")
+            self.skip(STATEMENT_SYNC)
+            sym = self.scanner.sym
+        if sym == Token.IDENT:
+            statement = self.assignment_or_call()
+        elif sym == Token.IF:
+            statement = self.if_statement()
+        elif sym == Token.WHILE:
+            statement = self.while_statement()
+        elif sym == Token.REPEAT:
+            statement = self.repeat_statement()
+        else:
+            statement = ast.Statement()  # Empty
+        if self.scanner.sym not in STATEMENT_NEXT:
+            self.error(f"Unexpected '{self.scanner.sym}' after statement")
+            self.skip(STATEMENT_SYNC)
+        return statement
+
+    def statement_sequence(self) -> ast.StatementSequence:
+        statements = [self.statement()]
+        while True:
+            if self.scanner.sym == Token.SEMICOLON:
+                self.next()
+            elif self.scanner.sym in STATEMENT_START:
+                self.error("Expected ';' between statements")
+            else:
+                break
+            statements.append(self.statement())
+        return ast.StatementSequence(statements=statements)
+
+    # Declarations
+
+    def type(self) -> ast.Type:
+        sym = self.scanner.sym
+        if sym == Token.IDENT:
+            ident = self.ident()
+            builtin = BUILTIN_TYPES.get(ident)
+            return builtin() if builtin else ast.CustomType(ident=ident)
+        if sym == Token.ARRAY:
+            self.next()
+            size = self.expression()
+            self.expect(Token.OF)
+            return ast.ArrayType(size=size, type=self.type())
+        if sym == Token.RECORD:
+            self.error("RECORD types are not supported")
+            self.skip({Token.END, Token.EOF})
+            self.next()
+        else:
+            self.error(f"Expected type, but got '{sym}'")
+        return ast.IntegerType()
+
+    def end_declaration(self) -> None:
+        """The `;` at the end of a declaration."""
+        if self.scanner.sym != Token.SEMICOLON:
+            self.error(f"Expected ';', but got '{self.scanner.sym}'")
+            self.skip(DECLARATION_SYNC | {Token.IDENT})
+        if self.scanner.sym == Token.SEMICOLON:
+            self.next()
+
+    def formal_parameters(self) -> list[ast.FormalParameter]:
+        self.next()
+        params = []
+        if self.scanner.sym != Token.RPAREN:
+            while True:
+                by_ref = self.scanner.sym == Token.VAR
+                if by_ref:
+                    self.next()
+                ident_list = self.ident_list()
+                self.expect(Token.COLON)
+                params.append(
+                    ast.FormalParameter(
+                        by_ref=by_ref, ident_list=ident_list, type=self.type()
+                    )
+                )
+                if self.scanner.sym != Token.SEMICOLON:
+                    break
+                self.next()
+        self.expect(Token.RPAREN)
+        return params
+
+    def procedure_declaration(self) -> ast.ProcedureDeclaration:
+        self.next()
+        ident = self.ident()
+        exported = self.scanner.sym == Token.TIMES
+        if exported:
+            self.next()
+        params = []
+        if self.scanner.sym == Token.LPAREN:
+            params = self.formal_parameters()
+        self.expect(Token.SEMICOLON)
+        declarations = self.declarations()
+        body = ast.StatementSequence(statements=[])
+        if self.scanner.sym == Token.BEGIN:
+            self.next()
+            body = self.statement_sequence()
+        self.expect(Token.END)
+        self.end_name(ident)
+        return ast.ProcedureDeclaration(
+            ident=ident,
+            exported=exported,
+            params=params,
+            declarations=declarations,
+            body=body,
+        )
+
+    def declaration(self, sym: Token, declarations: ast.Declarations) -> None:
+        """One declaration of the section `sym`, the current symbol being its
+        identifier."""
+        if sym == Token.CONST:
+            ident = self.ident()
+            self.expect(Token.EQL)
+            declarations.const_declarations.append(
+                ast.ConstantDeclaration(ident=ident, expression=self.expression())
+            )
+        elif sym == Token.TYPE:
+            ident = self.ident()
+            self.expect(Token.EQL)
+            declarations.type_declarations.append(
+                ast.TypeDeclaration(ident=ident, type=self.type())
+            )
+        else:
+            ident_list = self.ident_list()
+            self.expect(Token.COLON)
+            declarations.var_declarations.append(
+                ast.VariableDeclaration(ident_list=ident_list, type=self.type())
+            )
+        self.end_declaration()
+
+    def declarations(self) -> ast.Declarations:
+        declarations = ast.Declarations(
+            const_declarations=[],
+            type_declarations=[],
+            var_declarations=[],
+            procedure_declarations=[],
+        )
+        while True:
+            sym = self.scanner.sym
+            if sym in (Token.CONST, Token.TYPE, Token.VAR):
+                self.next()
+                while self.scanner.sym == Token.IDENT:
+                    self.declaration(sym, declarations)
+            elif sym == Token.PROCEDURE:
+                declarations.procedure_declarations.append(self.procedure_declaration())
+                self.end_declaration()
+            elif sym in (Token.BEGIN, Token.END, Token.EOF):
+                return declarations
+            else:
+                self.error(f"Expected declaration, but got '{sym}'")
+                self.skip(DECLARATION_SYNC)
+                if self.scanner.sym == Token.SEMICOLON:
+                    self.next()
+
+    def module(self) -> ast.Module:
+        self.expect(Token.MODULE)
+        ident = self.ident()
+        self.expect(Token.SEMICOLON)
+        declarations = self.declarations()
+        body = ast.StatementSequence(statements=[])
+        if self.scanner.sym == Token.BEGIN:
+            self.next()
+            body = self.statement_sequence()
+        self.expect(Token.END)
+        self.end_name(ident)
+        self.expect(Token.PERIOD)
+        if self.scanner.sym != Token.EOF:
+            self.error(f"Unexpected '{self.scanner.sym}' after the end of the module")
+        return ast.Module(ident=ident, Declarations=declarations, body=body)
+
+    def parse(self) -> ast.Module:
+        """Parse a module. The tree is complete even if there are errors, but
+        it is only meaningful if `errors` is empty."""
+        self.next()
+        return self.module()
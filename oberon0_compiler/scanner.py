@@ -6,87 +6,246 @@
 Oberon-0 scanner
 """
 
+import bisect
 import io
-import typing
+import re
+from collections.abc import Iterator
 from enum import Enum
 from pathlib import Path
 
 from loguru import logger
 from pydantic import BaseModel
 
-from oberon0_compiler.token import Token
+from compiler_common.instrument import trace_results
+from compiler_common.token_buffer import TokenBuffer
+from oberon0_compiler.tokens import Token
+
+# A single match skips the leading white space and recognizes one token. The
+# index of the group that matched tells the kind of the token; no group at all
+# means that the end of the source has been reached. Symbols that are not in
+# the symbol table are reported as `Token.OTHER`.
+_TOKEN_RE = re.compile(
+    r"\s*(?:([A-Za-z][A-Za-z0-9]*)|([0-9]+)|(\(\*)|(:=|<=|>=|.))?", re.DOTALL
+)
+_WORD, _NUMBER, _COMMENT, _SYMBOL = range(1, 5)
+
+
+def skip_comment(src: str, pos: int) -> int:
+    """Return the offset just after the (possibly nested) comment whose opening
+    `(*` ends at `pos`, or -1 if the comment is not terminated."""
+    depth = 1
+    while depth > 0:
+        close = src.find("*)", pos)
+        if close < 0:
+            return -1
+        nested = src.find("(*", pos, close)
+        if nested >= 0:
+            depth += 1
+            pos = nested + 2
+        else:
+            depth -= 1
+            pos = close + 2
+    return pos
 
 
 class Scanner(BaseModel):
     eof: bool = False
     sym: Enum | None = None  # Next Symbol
-    value: str = ""
+    value: str | int = ""
+    trace: bool = False  # Log every token (see compiler_common.instrument)
 
-    _ch: str = ""
     _file_name: Path | None = None
-    _text: typing.TextIO | None = None
-    _text_line: str = ""
-    _line_no: int = 0
-    _col_no: int = 0
+    _src: str = ""
+    _pos: int = 0  # Offset of the first character after the current symbol
+    _start: int = 0  # Offset of the current symbol
+    _line_starts: list[int] | None = None
+    _buffer: TokenBuffer | None = None  # Replayed instead of the source
+    _index: int = -1  # Of the current symbol in `_buffer`
 
     _keyword = {str(i): i for i in Token if str(i).isupper()}
     _symbol = {
         str(i): i for i in Token if not str(i).isupper() and not str(i).islower()
     }
 
+    def model_post_init(self, context):
+        if self.trace:
+            trace_results(
+                self,
+                "get_next_symbol",
+                lambda: f"Token: {self.sym}, Value: {self.value}",
+            )
+
     def open(self, text: io.TextIOBase) -> None:
-        self._text = text
         if hasattr(text, "name"):
             self._file_name = Path(text.name)
         else:
             self._file_name = None
+        self._src = text.read()
+        self._pos = 0
+        self._start = 0
+        self._line_starts = None
+        self._buffer = None
 
-        self.get_next_char()
+    def location(self, offset: int | None = None) -> tuple[int, int]:
+        """Return the line and the column (both starting at 1) of `offset`, by
+        default of the current symbol."""
+        if offset is None:
+            offset = self._start
+        if self._line_starts is None:
+            self._line_starts = [0, *(m.end() for m in re.finditer("\n", self._src))]
+        line = bisect.bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1] + 1
 
-    def raise_error(self, msg: str) -> None:
+    def error(self, msg: str, offset: int | None = None) -> SyntaxError:
+        """A `SyntaxError` at `offset`, by default at the current symbol."""
+        line_no, col_no = self.location(offset)
+        start = self._line_starts[line_no - 1]
+        end = self._src.find("\n", start)
+        text_line = self._src[start : end if end >= 0 else len(self._src)]
+        return SyntaxError(msg, (self._file_name, line_no, col_no, text_line.rstrip()))
+
+    def raise_error(self, msg: str, offset: int | None = None) -> None:
         logger.error(msg)
-        raise SyntaxError(
-            msg, (self._file_name, self._line_no, self._col_no, self._text_line)
-        )
+        raise self.error(msg, offset)
+
+    def skip_to_end(self) -> None:
+        """Move to the end of the source, after an error that the scanner
+        cannot recover from."""
+        self._start = self._pos = len(self._src)
+        self._buffer = None
+        self.eof = True
+        self.sym = Token.EOF
+        self.value = ""
 
-    def skip_space(self):
-        while self._ch.isspace():
-            self.get_next_char()
+    def _match(self, pos: int) -> re.Match:
+        """Match the next token at `pos`, skipping comments."""
+        src = self._src
+        m = _TOKEN_RE.match(src, pos)
+        while m.lastindex == _COMMENT:
+            pos = skip_comment(src, m.end())
+            if pos < 0:
+                self.raise_error("Unterminated comment", m.start(_COMMENT))
+            m = _TOKEN_RE.match(src, pos)
+        return m
 
-    def skip_comment(self):
+    def get_next_symbol(self):
+        if self._buffer is not None:
+            self._next_replayed()
+            return
+        m = self._match(self._pos)
+        kind = m.lastindex
+        self._start = m.start(kind) if kind else m.end()
+        self._pos = m.end()
+        if kind == _WORD:
+            self.value = m.group(_WORD)
+            self.sym = self._keyword.get(self.value, Token.IDENT)
+        elif kind == _NUMBER:
+            self.sym = Token.NUMBER
+            self.value = int(m.group(_NUMBER))
+        elif kind == _SYMBOL:
+            self.value = m.group(_SYMBOL)
+            self.sym = self._symbol.get(self.value, Token.OTHER)
+        else:
+            self.eof = True
+            self.sym = Token.EOF
+            self.value = ""
+
+    def iter_tokens(self) -> Iterator[tuple[Enum, str | int, int, int]]:
+        """Yield `(token, value, line, column)` for the remaining symbols, up to
+        and including `Token.EOF`. The scanner is left at the end of the source.
+        """
+        keyword = self._keyword
+        symbol = self._symbol
+        src = self._src
+        pos = self._pos
+        line, col = self.location(pos)
+        line_start = last = pos - col + 1
         while True:
-            self.get_next_char()
-            if self.eof:
-                self.error("Unterminated comment")
-                return
-            if self._ch == "(":
-                self.get_next_char()
-                if self._ch == "*":
-                    self.get_next_char()
-                    self.skip_comment()
-            if self._ch == "*":
-                self.get_next_char()
-                if self._ch == ")":
-                    self.get_next_char()
-                    return
-
-    def get_next_char(self):
-        while not self.eof and self._text_line == "":
-            self._text_line = self._text.readline()
-            self._line_no += 1
-            self._col_no = 0
-            if self._text_line == "":
+            m = self._match(pos)
+            kind = m.lastindex
+            start = m.start(kind) if kind else m.end()
+            newlines = src.count("\n", last, start)
+            if newlines:
+                line += newlines
+                line_start = src.rfind("\n", last, start) + 1
+            last = start
+            if kind == _WORD:
+                value = m.group(_WORD)
+                yield keyword.get(
+                    value, Token.IDENT
+                ), value, line, start - line_start + 1
+            elif kind == _NUMBER:
+                yield Token.NUMBER, int(m.group(_NUMBER)), line, start - line_start + 1
+            elif kind == _SYMBOL:
+                value = m.group(_SYMBOL)
+                yield symbol.get(
+                    value, Token.OTHER
+                ), value, line, start - line_start + 1
+            else:
+                self._start = self._pos = start
                 self.eof = True
+                self.sym = Token.EOF
+                self.value = ""
+                yield Token.EOF, "", line, start - line_start + 1
+                return
+            pos = m.end()
+
+    def tokenize(self) -> TokenBuffer:
+        """Scan the rest of the source into a `TokenBuffer`, up to and including
+        `Token.EOF`. The scanner is left at the end of the source."""
+        keyword = self._keyword
+        symbol = self._symbol
+        buf = TokenBuffer(Token, self._src)
+        kinds = buf.kinds.append
+        starts = buf.starts.append
+        ends = buf.ends.append
+        value_ids = buf.value_ids.append
+        intern = buf.intern
+        pos = self._pos
+        while True:
+            m = self._match(pos)
+            kind = m.lastindex
+            start = m.start(kind) if kind else m.end()
+            pos = m.end()
+            if kind == _WORD:
+                value = m.group(_WORD)
+                sym = keyword.get(value, Token.IDENT)
+            elif kind == _NUMBER:
+                sym = Token.NUMBER
+                value = int(m.group(_NUMBER))
+            elif kind == _SYMBOL:
+                value = m.group(_SYMBOL)
+                sym = symbol.get(value, Token.OTHER)
+            else:
                 break
-            self._text_line = self._text_line.rstrip()
-        if self.eof:
-            self._ch = ""
-        else:
-            assert self._text_line != ""
-            self._ch = self._text_line[0]
-            self._text_line = self._text_line[1:]
-            self._col_no += 1
+            kinds(sym.value)
+            starts(start)
+            ends(pos)
+            value_ids(intern(value))
+        buf.append(Token.EOF, start, start)
+        self._start = self._pos = start
+        self.eof = True
+        self.sym = Token.EOF
+        self.value = ""
+        return buf
 
-    def get_next_symbol(self):
-        # TODO (student): Implement the scanner.
-        pass
+    def replay(self, buffer: TokenBuffer) -> None:
+        """Read the tokens of `buffer` (from `tokenize`) instead of scanning
+        the source again, so that scanning and parsing can be timed apart."""
+        self._src = buffer.source
+        self._pos = self._start = 0
+        self._line_starts = None
+        self._buffer = buffer
+        self._index = -1
+        self.eof = False
+
+    def _next_replayed(self) -> None:
+        buffer = self._buffer
+        if self._index < len(buffer) - 1:
+            self._index += 1
+        i = self._index
+        self.sym = buffer.kind(i)
+        self.value = buffer.value(i)
+        self._start = buffer.starts[i]
+        self._pos = buffer.ends[i]
+        self.eof = self.sym == Token.EOF
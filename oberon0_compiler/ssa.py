@@ -0,0 +1,291 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Static single assignment form of the intermediate representation, and the
+optimizations that work on it
+
+`optimize` removes the unreachable blocks, replaces the variables by values
+and phis (`construct`), then removes the copies, the common subexpressions,
+the stores that are overwritten before being read and the values that are not
+used. Memory is not in SSA form: a STORE may change any LOAD, as VAR
+parameters alias the variables.
+"""
+
+from collections import defaultdict
+
+from oberon0_compiler.ir import (
+    CLOBBERS,
+    COMMUTATIVE,
+    NONE,
+    PURE,
+    SIGNATURES,
+    WIDTH,
+    Function,
+    Op,
+)
+
+# Operations kept even if their value is not used: they change the memory or
+# the output, or they may trap
+EFFECTS = frozenset([Op.STORE, Op.CALL, Op.CHECK, Op.MEMCPY, Op.DIV, Op.MOD])
+
+
+def optimize(fn: Function) -> None:
+    remove_unreachable(fn)
+    construct(fn)
+    propagate_copies(fn)
+    eliminate_common_subexpressions(fn)
+    eliminate_dead_stores(fn)
+    eliminate_dead_code(fn)
+
+
+def remove_unreachable(fn: Function) -> None:
+    """Take the branches on constants, and empty the blocks that cannot be
+    reached, so that they are not the predecessors of the others (the code
+    after `WHILE TRUE`, for example)."""
+    constants = {
+        dest: a for block in fn.blocks for op, dest, a, _, _ in block if op == Op.CONST
+    }
+    for block in fn.blocks:
+        if block.condition in constants:
+            block.next = [block.next[0 if constants[block.condition] else 1]]
+            block.condition = NONE
+    reachable = set(fn.reverse_postorder())
+    for block in fn.blocks:
+        if block.index not in reachable:
+            block.code = block.code[:0]
+            block.next = []
+            block.condition = NONE
+
+
+class Construction:
+    """SSA construction by Braun et al., "Simple and Efficient Construction of
+    Static Single Assignment Form": the blocks are filled in reverse
+    postorder, a block is sealed when all its predecessors are filled, and
+    reading a variable in a block that is not sealed yet adds a phi that gets
+    its operands when it is."""
+
+    def __init__(self, fn: Function):
+        self.fn = fn
+        self.preds = fn.predecessors()
+        self.defs: dict[tuple[int, int], int] = {}  # Variable, block: value
+        self.types: dict[int, int] = {}  # Of the variables
+        self.sealed: set[int] = set()
+        self.incomplete: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        self.phis: dict[int, tuple[int, list[int]]] = {}  # Value: block, operands
+
+    def run(self) -> None:
+        fn = self.fn
+        filled = set()
+        for b in fn.reverse_postorder():
+            if all(p in filled for p in self.preds[b]):
+                self.seal(b)
+            code = fn.blocks[b].code
+            for i in range(0, len(code), WIDTH):
+                if code[i] == Op.SET:
+                    variable, value = code[i + 2], code[i + 3]
+                    self.types.setdefault(variable, fn.types[value])
+                    self.defs[variable, b] = value
+                    code[i] = Op.NOP
+                elif code[i] == Op.GET:
+                    code[i] = Op.COPY
+                    code[i + 2] = self.read(code[i + 2], b)
+            filled.add(b)
+            for s in fn.blocks[b].next:
+                if s not in self.sealed and all(p in filled for p in self.preds[s]):
+                    self.seal(s)
+        for phi, (b, operands) in self.phis.items():
+            fn.blocks[b].phis.append((phi, operands))
+
+    def read(self, variable: int, b: int) -> int:
+        value = self.defs.get((variable, b))
+        if value is not None:
+            return value
+        if b not in self.sealed:
+            value = self.phi(variable, b)
+            self.incomplete[b].append((variable, value))
+        elif len(self.preds[b]) == 1:
+            value = self.read(variable, self.preds[b][0])
+        else:
+            assert self.preds[b], f"x{variable} is read before it is set"
+            value = self.phi(variable, b)
+            self.defs[variable, b] = value  # Breaks the cycles
+            self.add_operands(variable, value)
+        self.defs[variable, b] = value
+        return value
+
+    def phi(self, variable: int, b: int) -> int:
+        value = self.fn.value(self.types[variable])
+        self.phis[value] = (b, [])
+        return value
+
+    def add_operands(self, variable: int, phi: int) -> None:
+        b, operands = self.phis[phi]
+        operands.extend(self.read(variable, p) for p in self.preds[b])
+
+    def seal(self, b: int) -> None:
+        self.sealed.add(b)
+        for variable, phi in self.incomplete.pop(b, []):
+            self.add_operands(variable, phi)
+
+
+def construct(fn: Function) -> None:
+    """Replace GET by COPY of the value of the variable, and remove SET."""
+    Construction(fn).run()
+
+
+def find(replace: dict[int, int], value: int) -> int:
+    while value in replace:
+        value = replace[value]
+    return value
+
+
+def rewrite(fn: Function, replace: dict[int, int]) -> None:  # noqa: C901
+    """Replace the values used according to `replace`, and remove the phis
+    that are then trivial (whose operands are the same value, or itself)."""
+    changed = True
+    while changed:
+        changed = False
+        for block in fn.blocks:
+            phis = []
+            for phi, operands in block.phis:
+                operands[:] = (find(replace, v) for v in operands)
+                values = set(operands) - {phi}
+                if len(values) == 1:
+                    replace[phi] = values.pop()
+                    changed = True
+                else:
+                    phis.append((phi, operands))
+            block.phis = phis
+    for block in fn.blocks:
+        code = block.code
+        for i in range(0, len(code), WIDTH):
+            for k, kind in enumerate(SIGNATURES[code[i]]):
+                if kind == "v":
+                    code[i + 2 + k] = find(replace, code[i + 2 + k])
+                elif kind == "l":
+                    values = fn.lists[code[i + 2 + k]]
+                    values[:] = (find(replace, v) for v in values)
+        if block.condition != NONE:
+            block.condition = find(replace, block.condition)
+
+
+def propagate_copies(fn: Function) -> None:
+    replace = {}
+    for block in fn.blocks:
+        code = block.code
+        for i in range(0, len(code), WIDTH):
+            if code[i] == Op.COPY:
+                replace[code[i + 1]] = code[i + 2]
+                code[i] = Op.NOP
+    rewrite(fn, replace)
+
+
+def dominator_tree(fn: Function) -> list[list[int]]:
+    """The blocks immediately dominated by each block."""
+    order = fn.reverse_postorder()
+    idom = fn.dominators(order, fn.predecessors())
+    children: list[list[int]] = [[] for _ in fn.blocks]
+    for b in order[1:]:
+        children[idom[b]].append(b)
+    return children
+
+
+def eliminate_common_subexpressions(fn: Function) -> None:  # noqa: C901, PLR0912
+    """Replace an operation by the same one in a dominating block, and a LOAD
+    by what the same block loaded or stored at its address, if nothing was
+    stored or called in between. A CHECK dominated by the same one is
+    removed."""
+    children = dominator_tree(fn)
+    replace: dict[int, int] = {}
+    available: dict[tuple[int, ...], int] = {}
+    stack: list[tuple[int, list[tuple[int, ...]]]] = [(0, [])]
+    while stack:
+        b, added = stack.pop()
+        if b == NONE:  # Leaving a subtree
+            for key in added:
+                del available[key]
+            continue
+        block = fn.blocks[b]
+        code = block.code
+        loads: dict[tuple[int, int], int] = {}  # Address, offset: value
+        for i in range(0, len(code), WIDTH):
+            op, dest = code[i], code[i + 1]
+            for k, kind in enumerate(SIGNATURES[op]):
+                if kind == "v":
+                    code[i + 2 + k] = find(replace, code[i + 2 + k])
+            a, b_, c = code[i + 2], code[i + 3], code[i + 4]
+            if op in PURE or op in (Op.DIV, Op.MOD, Op.CHECK):
+                if op in COMMUTATIVE and a > b_:
+                    a, b_ = b_, a
+                key = (op, fn.types[dest] if dest != NONE else NONE, a, b_, c)
+                if key in available:
+                    if dest != NONE:
+                        replace[dest] = available[key]
+                    block.remove(i // WIDTH)
+                else:
+                    available[key] = dest
+                    added.append(key)
+            elif op == Op.LOAD:
+                if (a, b_) in loads:
+                    replace[dest] = loads[a, b_]
+                    block.remove(i // WIDTH)
+                else:
+                    loads[a, b_] = dest
+            elif op in CLOBBERS:
+                loads.clear()
+                if op == Op.STORE:
+                    loads[a, c] = b_
+        stack.append((NONE, added))
+        stack.extend((child, []) for child in reversed(children[b]))
+    rewrite(fn, replace)
+
+
+def eliminate_dead_stores(fn: Function) -> None:
+    """Remove the stores overwritten at the same address later in their block,
+    with nothing that may read the memory or trap in between (the memory is
+    kept when a command traps)."""
+    for block in fn.blocks:
+        code = block.code
+        overwritten: set[tuple[int, int]] = set()
+        for i in reversed(range(0, len(code), WIDTH)):
+            op = code[i]
+            if op == Op.STORE:
+                key = (code[i + 2], code[i + 4])
+                if key in overwritten:
+                    code[i] = Op.NOP
+                overwritten.add(key)
+            elif op in (Op.LOAD, Op.CALL, Op.MEMCPY, Op.CHECK, Op.DIV, Op.MOD):
+                overwritten.clear()
+
+
+def eliminate_dead_code(fn: Function) -> None:  # noqa: C901
+    """Remove the operations and the phis whose values are not used, and
+    compact the blocks."""
+    operands: dict[int, list[int]] = {}  # Of the definition of each value
+    work = []
+    for block in fn.blocks:
+        for phi, values in block.phis:
+            operands[phi] = values
+        for instruction in block:
+            op, dest = instruction[0], instruction[1]
+            if op in EFFECTS:
+                work.extend(fn.operands(instruction))
+            elif dest != NONE:
+                operands[dest] = list(fn.operands(instruction))
+        if block.condition != NONE:
+            work.append(block.condition)
+    live = set()
+    while work:
+        value = work.pop()
+        if value not in live:
+            live.add(value)
+            work.extend(operands.get(value, []))
+    for block in fn.blocks:
+        block.phis = [(phi, values) for phi, values in block.phis if phi in live]
+        code = block.code
+        for i in range(0, len(code), WIDTH):
+            if code[i] not in EFFECTS and code[i + 1] not in live:
+                code[i] = Op.NOP
+        block.compact()
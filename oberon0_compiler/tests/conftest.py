@@ -0,0 +1,73 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Helpers of the Oberon-0 compiler tests, as fixtures: parse or compile a source,
+and call a command of a compiled module
+"""
+
+import io
+from collections.abc import Callable
+
+import pytest
+
+from oberon0_compiler import ast
+from oberon0_compiler.code_gen import CodeGenerator
+from oberon0_compiler.parser import Parser
+from oberon0_compiler.scanner import Scanner
+from oberon0_runtime.context import Session
+from oberon0_runtime.input import ListSource
+from oberon0_runtime.output import OutputWriter
+
+
+@pytest.fixture(scope="session")
+def make_parser() -> Callable[[str], Parser]:
+    """A parser of the source `src`."""
+
+    def make_parser(src: str) -> Parser:
+        scanner = Scanner()
+        scanner.open(io.StringIO(src))
+        return Parser(scanner=scanner)
+
+    return make_parser
+
+
+@pytest.fixture(scope="session")
+def parse(make_parser) -> Callable[[str], ast.Module]:
+    """The tree of a source without syntax errors."""
+
+    def parse(src: str) -> ast.Module:
+        parser = make_parser(src)
+        tree = parser.parse()
+        assert parser.errors == []
+        return tree
+
+    return parse
+
+
+@pytest.fixture(scope="session")
+def compile(parse) -> Callable[..., bytes]:
+    """The binary module of a source."""
+
+    def compile(src: str, buffered_output: bool = True, optimize: bool = True) -> bytes:
+        return CodeGenerator(buffered_output, optimize).generate(parse(src))
+
+    return compile
+
+
+@pytest.fixture(scope="session")
+def call() -> Callable[..., str]:
+    """The output of a command. It is also kept in `session.output`, for the
+    commands that fail."""
+
+    def call(session: Session, command: str, input: list[int] | None = None) -> str:
+        stream = io.BytesIO()
+        output = OutputWriter(stream, line_buffered=False)
+        try:
+            session.call(command, ListSource(input or []), output)
+        finally:
+            session.output = stream.getvalue().decode()
+        return session.output
+
+    return call
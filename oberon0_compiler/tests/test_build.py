@@ -0,0 +1,102 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import io
+import subprocess
+import sys
+
+import pytest
+from typer.testing import CliRunner
+from wasmtime import Module
+
+from oberon0_compiler import app, build
+from oberon0_compiler.build import CompileError, compile_source, load_module
+from oberon0_runtime.cache import EngineOptions, ModuleCache
+from oberon0_runtime.context import ReturnCode, Session
+from oberon0_runtime.input import ListSource
+from oberon0_runtime.output import OutputWriter
+
+PROGRAM = """
+MODULE Sum;
+  VAR x, s: INTEGER;
+  PROCEDURE Main*;
+  BEGIN s := 0; WHILE ~Eot() DO ReadInt(x); s := s + x END; WriteInt(s, 0)
+  END Main;
+END Sum.
+"""
+
+
+def run(engine, module: Module, input: list[int]) -> str:
+    stream = io.BytesIO()
+    session = Session(engine, module, output=OutputWriter(stream))
+    session.call("Main", ListSource(input), OutputWriter(stream))
+    return stream.getvalue().decode()
+
+
+def test_compile_source():
+    engine = EngineOptions().engine()
+    module = Module(engine, compile_source(io.StringIO(PROGRAM)))
+    assert run(engine, module, [1, 2, 39]) == "42"
+
+
+def test_compile_errors():
+    source = io.StringIO("MODULE M;\nVAR x INTEGER;\nBEGIN x := END M.")
+    with pytest.raises(CompileError) as e:
+        compile_source(source)
+    assert len(e.value.errors) > 1  # All the syntax errors, not just the first
+    assert "Line 2" in e.value.errors[0]
+    with pytest.raises(CompileError, match="'y' is not declared"):
+        compile_source(io.StringIO("MODULE M; BEGIN y := 1 END M."))
+
+
+def test_load_module(tmp_path, monkeypatch):
+    options = EngineOptions()
+    engine = options.engine()
+    source = tmp_path / "sum.mod"
+    source.write_text(PROGRAM)
+    cache = ModuleCache(tmp_path / "cache")
+    load_module(engine, source, options, cache)
+    calls = []
+    monkeypatch.setattr(build, "compile_source", lambda *a: calls.append(a))
+    for _ in range(2):
+        module = load_module(engine, source, options, cache)
+        assert run(engine, module, [5, 6]) == "11"
+    assert calls == []  # Not compiled again
+
+    # Nor parsed: only the runtime and the cache are loaded on a hit
+    code = (
+        "import sys; from oberon0_compiler.build import load_module;"
+        "from oberon0_runtime.cache import EngineOptions, ModuleCache;"
+        "from pathlib import Path; o = EngineOptions();"
+        f"load_module(o.engine(), Path({str(source)!r}), o,"
+        f" ModuleCache(Path({str(tmp_path / 'cache')!r})));"
+        "print(*(m for m in sys.modules if m.startswith(('pydantic', "
+        "'oberon0_compiler.parser'))))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == []
+
+    # The source is part of the key
+    source.write_text(PROGRAM.replace("s + x", "s - x"))
+    monkeypatch.undo()
+    module = load_module(engine, source, options, cache)
+    assert run(engine, module, [5, 6]) == "-11"
+
+
+def test_command_line(tmp_path):
+    source = tmp_path / "sum.mod"
+    source.write_text(PROGRAM)
+    runner = CliRunner()
+    assert runner.invoke(app, [str(source)]).exit_code == 0  # main by default
+    assert source.with_suffix(".wasm").exists()
+    result = runner.invoke(app, ["run", str(source), "Main", "1", "2", "--no-cache"])
+    assert result.stdout == "3"
+
+    source.write_bytes(b"MODULE M; \xff END M.")
+    result = runner.invoke(app, ["run", str(source), "Main", "--no-cache"])
+    assert result.exit_code == ReturnCode.FILE_NOT_FOUND.value
+    assert "cannot read source" in result.stdout
+    assert runner.invoke(app, [str(source)]).exit_code == 1
@@ -0,0 +1,216 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import io
+
+import pytest
+from wasmtime import Engine, Module
+
+from oberon0_compiler.code_gen import SemanticError
+from oberon0_runtime.context import Abort, ReturnCode, Session
+from oberon0_runtime.output import OutputWriter
+
+PROGRAM = """
+MODULE Test;
+  CONST N = 4; Half = -N DIV 3;
+  TYPE Row = ARRAY N OF INTEGER;
+  VAR x, y, w: INTEGER; r: Row; g: ARRAY 3 OF Row; ok: BOOLEAN;
+
+  PROCEDURE Format*;
+  BEGIN
+    WHILE ~Eot() DO ReadInt(x); ReadInt(w); WriteInt(x, w); WriteChar(124) END;
+    WriteLn
+  END Format;
+
+  PROCEDURE DivMod*;
+  BEGIN
+    WHILE ~Eot() DO
+      ReadInt(x); ReadInt(y);
+      WriteInt(x DIV y, 0); WriteInt(x MOD y, 3);
+      WriteInt(x DIV 4, 3); WriteInt(x MOD 8, 3); WriteLn
+    END
+  END DivMod;
+
+  PROCEDURE Fact(n: INTEGER; VAR res: INTEGER);
+  BEGIN
+    IF n <= 1 THEN res := 1 ELSE Fact(n - 1, res); res := res * n END
+  END Fact;
+
+  PROCEDURE Fill(VAR a: Row; v: INTEGER);
+    VAR i: INTEGER;
+  BEGIN i := 0; WHILE i < N DO a[i] := v + i; i := i + 1 END
+  END Fill;
+
+  PROCEDURE Sum(a: Row; VAR s: INTEGER);
+    VAR i: INTEGER;
+  BEGIN
+    s := 0; i := 0;
+    REPEAT s := s + a[i]; a[i] := 0; i := i + 1 UNTIL i = N
+  END Sum;
+
+  PROCEDURE Main*;
+    VAR i, s: INTEGER;
+    PROCEDURE Twice(VAR z: INTEGER);
+    BEGIN z := z * 2; x := x + 1
+    END Twice;
+  BEGIN
+    Fact(10, s); WriteInt(s, 0); WriteLn;
+    Fill(r, 5); Sum(r, s); WriteInt(s, 0); WriteInt(r[0], 2); WriteLn;
+    i := 0; WHILE i < 3 DO Fill(g[i], i * 10); i := i + 1 END;
+    g[1] := g[2]; WriteInt(g[1][3], 0); WriteLn;
+    x := 0; Twice(s); Twice(s); WriteInt(s, 0); WriteInt(x, 2); WriteLn;
+    ok := (x = 0) & (10 DIV x > 1);
+    IF ok THEN WriteInt(1, 0) ELSIF (x # 0) OR (10 DIV x > 1) THEN WriteInt(2, 0)
+    ELSE WriteInt(3, 0)
+    END;
+    WriteInt(Half, 3); WriteInt(2147483647 + 1, 12);
+    IF ODD(-3) & ~ODD(4) THEN WriteChar(33) END;
+    WriteLn
+  END Main;
+
+  PROCEDURE Fib(n: INTEGER; VAR r: INTEGER);
+    VAR a, b: INTEGER;
+  BEGIN
+    IF n < 2 THEN r := n ELSE Fib(n - 1, a); Fib(n - 2, b); r := a + b END
+  END Fib;
+
+  PROCEDURE Fibs*;
+    VAR i, n, r: INTEGER;
+  BEGIN
+    i := 0;
+    WHILE ~Eot() DO
+      IF i >= 0 THEN ReadInt(n) END;
+      Fib(n, r); WriteInt(r, 0); WriteChar(32); i := i + 1
+    END;
+    WriteInt(i, 0)
+  END Fibs;
+
+  PROCEDURE OutOfRange*;
+  BEGIN x := N; WriteInt(42, 0); r[x] := 1
+  END OutOfRange;
+
+  PROCEDURE Divide*;
+  BEGIN ReadInt(x); ReadInt(y); WriteInt(42, 0); WriteInt(x DIV y, 3)
+  END Divide;
+
+  PROCEDURE Modulo*;
+  BEGIN ReadInt(x); ReadInt(y); WriteInt(42, 0); WriteInt(x MOD y, 3)
+  END Modulo;
+
+  PROCEDURE Deep(n: INTEGER);
+  BEGIN Deep(n + 1)
+  END Deep;
+
+  PROCEDURE Recurse*;
+  BEGIN Deep(0)
+  END Recurse;
+
+BEGIN
+  WriteInt(N, 0); WriteLn
+END Test.
+"""
+
+
+@pytest.fixture(
+    scope="module",
+    params=[(True, True), (False, True), (True, False)],
+    ids=["buffered", "direct", "unoptimized"],
+)
+def session(request, compile) -> Session:
+    engine = Engine()
+    module = Module(engine, compile(PROGRAM, *request.param))
+    stream = io.BytesIO()
+    session = Session(engine, module, output=OutputWriter(stream))
+    assert stream.getvalue() == b"4\n"  # The body of the module
+    return session
+
+
+def test_program(session, call):
+    assert call(session, "Main") == "3628800\n26 5\n23\n104 2\n2 -1 -2147483648!\n"
+
+
+def test_write_int(session, call):
+    values = [0, -1, 123, -2147483648, 2147483647]
+    widths = [0, 1, 12, -4, 2000]
+    cases = [(v, w) for v in values for w in widths]
+    expected = b"".join(b"%*d|" % (w, v) for v, w in cases).decode() + "\n"
+    assert call(session, "Format", [n for c in cases for n in c]) == expected
+
+
+def test_div_mod(session, call):
+    cases = [(x, y) for x in (-9, -8, -1, 0, 7, 8) for y in (-3, 2, 5)]
+    expected = "".join(f"{x // y}{x % y:3d}{x // 4:3d}{x % 8:3d}\n" for x, y in cases)
+    assert call(session, "DivMod", [n for c in cases for n in c]) == expected
+
+
+def test_locals(session, call):
+    # n and the variables of Fib are passed by reference, i is a local
+    assert call(session, "Fibs", [0, 1, 2, 10, 20]) == "0 1 1 55 6765 5"
+
+
+def test_locals_smaller(compile):
+    src = """MODULE M;
+      PROCEDURE Sum*;
+        VAR i, s: INTEGER;
+      BEGIN i := 0; s := 0; WHILE i < 10 DO s := s + i; i := i + 1 END; WriteInt(s)
+      END Sum;
+    END M."""
+    assert len(compile(src)) < len(compile(src, optimize=False))
+
+
+def test_traps(session, call):
+    with pytest.raises(Abort) as e:
+        call(session, "OutOfRange")
+    assert e.value.code == ReturnCode.TRAP
+    assert session.output == "42"  # Written before the trap
+    with pytest.raises(Abort) as e:
+        call(session, "Recurse")  # Until the stack overflows
+    assert e.value.code == ReturnCode.TRAP
+    for command, input in [
+        ("Divide", [1, 0]),
+        ("Divide", [-2147483648, -1]),
+        ("Modulo", [1, 0]),
+    ]:
+        with pytest.raises(Abort) as e:
+            call(session, command, input)
+        assert e.value.code == ReturnCode.TRAP
+        assert session.output == "42"
+    assert call(session, "Modulo", [-2147483648, -1]) == "42  0"
+
+
+def test_constants_wrap(compile, call):
+    # 65536 * 65536 wraps around to 0 before the division, as at run time
+    src = """MODULE M;
+      CONST C = 65536 * 65536 DIV 2;
+      VAR x: INTEGER;
+      PROCEDURE P*;
+      BEGIN x := 65536; WriteInt(C, 0); WriteInt(x * x DIV 2, 2)
+      END P;
+    END M."""
+    engine = Engine()
+    session = Session(engine, Module(engine, compile(src, optimize=False)))
+    assert call(session, "P") == "0 0"
+
+
+@pytest.mark.parametrize(
+    ("src", "message"),
+    [
+        ("BEGIN x := 1", "'x' is not declared"),
+        ("VAR b: BOOLEAN; BEGIN b := 1", "cannot assign INTEGER to BOOLEAN"),
+        ("CONST c = 1; BEGIN c := 2", "cannot assign to 'c'"),
+        ("PROCEDURE P(VAR x: INTEGER); END P; BEGIN P(1)", "'1' is not a variable"),
+        ("VAR a: ARRAY 3 OF INTEGER; BEGIN a[3] := 1", "index '3' is out of range"),
+        ("VAR a: INTEGER; BEGIN a := a DIV 0", "division by zero"),
+        ("CONST c = (-2147483647 - 1) DIV (-1);", "integer overflow"),
+        ("BEGIN WHILE 1 DO END", "'1' is of type INTEGER, not BOOLEAN"),
+        (
+            "PROCEDURE P; VAR a: INTEGER; PROCEDURE Q; BEGIN a := 1 END Q; END P;",
+            "'a' is a variable of an enclosing procedure",
+        ),
+        ("PROCEDURE P; BEGIN IF FALSE THEN y := 1 END END P;", "'y' is not"),
+    ],
+)
+def test_semantic_errors(compile, src, message):
+    with pytest.raises(SemanticError, match=message):
+        compile(f"MODULE M; {src} END M.")
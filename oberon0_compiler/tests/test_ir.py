@@ -0,0 +1,149 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import io
+
+import pytest
+from wasmtime import Engine, Module
+
+from oberon0_compiler.code_gen import CodeGenerator
+from oberon0_runtime.context import Session
+from oberon0_runtime.output import OutputWriter
+
+PROGRAM = """
+MODULE Test;
+  VAR g: INTEGER;
+
+  PROCEDURE Swap*;
+    VAR a, b, i, t: INTEGER;
+  BEGIN
+    a := 1; b := 2; i := 0;
+    WHILE i < 3 DO t := a; a := b; b := t; i := i + 1 END;
+    WriteInt(a, 0); WriteInt(b, 2)
+  END Swap;
+
+  PROCEDURE Digits*;
+    VAR n, count: INTEGER;
+  BEGIN
+    ReadInt(n); count := 0;
+    REPEAT n := n DIV 10; count := count + 1 UNTIL (n = 0) OR (count > 5);
+    WriteInt(count, 0)
+  END Digits;
+
+  PROCEDURE Set(VAR v: INTEGER);
+  BEGIN g := 1; v := 2; WriteInt(g, 0)
+  END Set;
+
+  PROCEDURE Inc;
+  BEGIN g := g + 1
+  END Inc;
+
+  PROCEDURE Alias*;
+    VAR y: INTEGER;
+  BEGIN
+    Set(g); g := 5; y := g; Inc; WriteInt(y + g, 3)
+  END Alias;
+END Test.
+"""
+
+
+@pytest.fixture(scope="module")
+def session(compile) -> Session:
+    engine = Engine()
+    module = Module(engine, compile(PROGRAM))
+    return Session(engine, module, output=OutputWriter(io.BytesIO()))
+
+
+def test_optimized(parse):
+    tree = parse(
+        """MODULE M;
+          VAR g: INTEGER;
+          PROCEDURE P(a, b: INTEGER);
+            VAR x, y: INTEGER;
+          BEGIN
+            x := a * b; y := a * b;
+            g := x; g := y + 1;
+            WHILE x < y DO x := x + 1 END;
+            WriteInt(g + x, 0)
+          END P;
+        BEGIN P(2, 3)
+        END M."""
+    )
+    gen = CodeGenerator()
+    gen.generate(tree)
+    # y is x, and g := x is overwritten
+    assert str(gen.ir["M.P"]) == (
+        "M.P:\n"
+        "b0:\n"
+        "  v0: INT = param 0\n"
+        "  v1: INT = param 1\n"
+        "  v2: INT = const 0\n"
+        "  v6: INT = mul v0, v1\n"
+        "  v11: ADDR = const 0\n"
+        "  v13: INT = const 1\n"
+        "  v14: INT = add v6, v13\n"
+        "  store v11, v14, 1024\n"
+        "  br b1\n"
+        "b1:\n"
+        "  v27: INT = phi v6, v21\n"
+        "  v18: BOOL = lt v27, v6\n"
+        "  br v18, b2, b3\n"
+        "b2:\n"
+        "  v21: INT = add v27, v13\n"
+        "  br b1\n"
+        "b3:\n"
+        "  v23: INT = load v11, 1024\n"
+        "  v25: INT = add v23, v27\n"
+        "  call 8, (v25, v2)\n"
+        "  return"
+    )
+
+
+def test_parallel_copies(session, call):
+    assert call(session, "Swap") == "2 1"
+
+
+def test_short_circuit(session, call):
+    assert call(session, "Digits", [12345]) == "5"
+    assert call(session, "Digits", [-1234567]) == "6"
+
+
+def test_memory(session, call):
+    # The stores to a VAR parameter and the calls change the loads
+    assert call(session, "Alias") == "2 11"
+
+
+def test_dead_stores(parse):
+    tree = parse(
+        """MODULE M;
+          VAR x: INTEGER; r: ARRAY 4 OF INTEGER;
+          PROCEDURE Keep*;
+          BEGIN x := 1; r[x + 10] := 0; x := 2; x := 3
+          END Keep;
+        END M."""
+    )
+    gen = CodeGenerator()
+    gen.generate(tree)
+    # x := 1 is kept, as the index may trap
+    stores = [s for s in str(gen.ir["M.Keep"]).splitlines() if "store" in s]
+    assert stores == [
+        "  store v1, v0, 1024",
+        "  store v7, v8, 1028",
+        "  store v1, v11, 1024",
+    ]
+
+
+def test_unreachable(parse):
+    tree = parse(
+        """MODULE M;
+          VAR x: INTEGER;
+          PROCEDURE Loop*;
+          BEGIN WHILE TRUE DO x := x + 1 END; x := 0
+          END Loop;
+        END M."""
+    )
+    gen = CodeGenerator()
+    gen.generate(tree)
+    Module(Engine(), gen.wasm.encode())  # Valid
+    assert len(gen.ir["M.Loop"].blocks[3].code) == 0
@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+from oberon0_compiler import ast
+
+SAMPLE = """
+MODULE Sample;
+  CONST N = 10;
+  TYPE Vector = ARRAY N OF INTEGER;
+  VAR a: Vector; i, s: INTEGER;
+
+  PROCEDURE Swap(VAR x, y: INTEGER);
+    VAR t: INTEGER;
+  BEGIN t := x; x := y; y := t
+  END Swap;
+
+  PROCEDURE Sum*;
+  BEGIN
+    s := 0; i := 0;
+    WHILE i < N DO ReadInt(a[i]); s := s + a[i]; i := i + 1 END;
+    IF s > 0 THEN WriteInt(s, 4) ELSIF s = 0 THEN WriteLn ELSE END;
+    REPEAT i := i - 1 UNTIL (i = 0) OR ~(s # 0)
+  END Sum;
+END Sample.
+"""
+
+ERRORS = """
+MODULE Errors;
+  VAR a, b INTEGER;
+  CONST c = ;
+  PROCEDURE P;
+  BEGIN
+    a := (b + ;
+    b = 2
+    IF a THEN b := 1 END
+  END Q;
+  PROCEDURE R;
+  BEGIN
+    WHILE a < DO a := 1 END;
+    a := 3 b := 4
+  END R;
+END Errors.
+"""
+
+
+def test_module(parse):
+    module = parse(SAMPLE)
+    decl = module.Declarations
+    assert [str(d) for d in decl.const_declarations] == ["CONST N = 10"]
+    assert str(decl.type_declarations[0].type) == "ARRAY N OF INTEGER"
+    assert [d.ident_list for d in decl.var_declarations] == [["a"], ["i", "s"]]
+    swap, total = decl.procedure_declarations
+    assert (swap.exported, total.exported) == (False, True)
+    assert swap.params[0].by_ref
+    assert swap.params[0].ident_list == ["x", "y"]
+    kinds = [type(s) for s in total.body.statements]
+    assert kinds == [ast.Assignment, ast.Assignment, ast.While, ast.If, ast.Repeat]
+    if_ = total.body.statements[3]
+    assert len(if_.elsif) == 1
+    assert if_.else_ is not None
+    assert str(total.body.statements[1]) == "i := 0"
+
+
+def test_errors(make_parser):
+    parser = make_parser(ERRORS)
+    module = parser.parse()
+    assert [(e.lineno, e.msg) for e in parser.errors] == [
+        (3, "Expected ':', but got 'identifier'"),
+        (4, "Expected factor, but got ';'"),
+        (7, "Expected factor, but got ';'"),
+        (8, "Expected ':=', but got '='"),
+        (9, "Expected ';' between statements"),
+        (10, "Expected 'P', but got 'Q'"),
+        (13, "Expected factor, but got 'DO'"),
+        (14, "Expected ';' between statements"),
+    ]
+    # The tree is built after the errors
+    assert [p.ident for p in module.Declarations.procedure_declarations] == ["P", "R"]
+
+
+def test_unterminated_comment(make_parser):
+    parser = make_parser("MODULE M; BEGIN (* x := 1 END M.")
+    parser.parse()
+    assert parser.errors[0].msg == "Unterminated comment"
@@ -0,0 +1,125 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+from collections.abc import Callable
+
+import pytest
+
+from oberon0_compiler.optimizer import optimize
+
+
+@pytest.fixture(scope="module")
+def statements(parse) -> Callable[[str], list[str]]:
+    """The optimized statements of `body`, in a module with a few
+    declarations."""
+
+    def statements(body: str) -> list[str]:
+        src = f"""MODULE M;
+          CONST N = 10; Big = 2147483647;
+          VAR x, y: INTEGER; b: BOOLEAN; a: ARRAY N OF INTEGER;
+        BEGIN {body} END M."""
+        return [str(s) for s in optimize(parse(src)).body.statements]
+
+    return statements
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("-N DIV 3", "-3"),  # The sign applies to the term
+        ("-7 MOD N", "-7"),
+        ("(-7) MOD 3", "2"),  # Rounds down
+        ("(-7) DIV 2", "-4"),
+        ("Big + 1", "-2147483648"),  # Wraps around
+        ("Big * Big", "1"),
+        ("1 + x + 2 - 5", "x - 2"),
+        ("2 * x * N", "x * 20"),
+        ("5 - x", "-x + 5"),
+        ("-x + 1 - 1", "-x"),
+        ("x + Big + 1", "x + -2147483648"),
+        ("x * 1 DIV 1", "x"),
+        ("6 DIV 4 * x", "x"),
+        ("x DIV 2 MOD 1", "x DIV 2 MOD 1"),
+        ("x * 0", "x * 0"),  # x may trap
+        ("(-Big - 1) DIV (-1)", "-2147483648 DIV -1"),  # Traps
+        ("a[N - 1] + ((x))", "a[9] + x"),
+    ],
+)
+def test_integer_expressions(statements, expression, expected):
+    assert statements(f"y := {expression}") == [f"y := {expected}"]
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("(N > 5) & ~FALSE", "TRUE"),
+        ("b OR FALSE", "b"),
+        ("FALSE OR b", "b"),
+        ("TRUE OR (a[x] = 1)", "TRUE"),  # Not evaluated
+        ("b OR TRUE OR b", "b OR TRUE"),  # b is evaluated
+        ("b & FALSE & b", "b & FALSE"),
+        ("~~b", "b"),
+        ("ODD(N + 1)", "TRUE"),
+        ("x = N", "x = 10"),
+    ],
+)
+def test_boolean_expressions(statements, expression, expected):
+    assert statements(f"b := {expression}") == [f"b := {expected}"]
+
+
+def test_shadowed_true(parse):
+    tree = optimize(parse("MODULE M; VAR TRUE, b: BOOLEAN; BEGIN b := 1 > 0 END M."))
+    assert str(tree.body.statements[0]) == "b := (0 = 0)"
+
+
+def test_dead_code(statements):
+    assert statements("IF N > 20 THEN x := 1 ELSIF b THEN x := 2 ELSE x := 3 END") == [
+        "IF b THEN\nx := 2ELSE\nx := 3\nEND"
+    ]
+    assert statements("IF b THEN x := 1 ELSIF N > 1 THEN x := 2 ELSE x := 3 END") == [
+        "IF b THEN\nx := 1ELSE\nx := 2\nEND"
+    ]
+    assert statements("IF TRUE THEN x := 1; y := 2 ELSE x := 3 END") == [
+        "x := 1",
+        "y := 2",
+    ]
+    assert statements("IF FALSE THEN x := 1 END; WHILE N < 0 DO x := 1 END") == []
+    assert statements("REPEAT x := x + 1 UNTIL TRUE") == ["x := x + 1"]
+    assert statements("WHILE TRUE DO x := 1 END") == ["WHILE TRUE DO\nx := 1\nEND"]
+
+
+def test_unused_procedures(parse):
+    tree = optimize(
+        parse(
+            """MODULE M;
+          PROCEDURE Unused; BEGIN Unused END Unused;
+          PROCEDURE Dead; END Dead;
+          PROCEDURE Used; END Used;
+          PROCEDURE Run*;
+            PROCEDURE Local; BEGIN Used END Local;
+            PROCEDURE Unused; END Unused;
+          BEGIN Local; IF FALSE THEN Dead END
+          END Run;
+        END M."""
+        )
+    )
+    procedures = tree.Declarations.procedure_declarations
+    assert [p.ident for p in procedures] == ["Used", "Run"]
+    assert [p.ident for p in procedures[1].declarations.procedure_declarations] == [
+        "Local"
+    ]
+
+
+def test_smaller_code(compile):
+    src = """MODULE M;
+      CONST Debug = FALSE; N = 4;
+      VAR x: INTEGER;
+      PROCEDURE Trace(v: INTEGER); BEGIN WriteInt(v, 0); WriteLn END Trace;
+      PROCEDURE Run*;
+      BEGIN
+        x := N * 2 + 1;
+        IF Debug THEN Trace(x) END
+      END Run;
+    END M."""
+    assert len(compile(src)) < len(compile(src, optimize=False))
@@ -3,9 +3,10 @@
 # SPDX-License-Identifier: Apache-2.0 OR MIT
 
 import io
+import pickle
 
 from oberon0_compiler.scanner import Scanner
-from oberon0_compiler.token import Token
+from oberon0_compiler.tokens import Token
 
 
 def test_assignment():
@@ -52,3 +53,86 @@ def test_compare_less():
     scanner.get_next_symbol()
     assert scanner.sym == Token.NUMBER
     assert scanner.value == 0
+
+
+def test_nested_comment():
+    number = 12
+    src = f"x (* a (* b *) c *) := {number}"
+    scanner = Scanner()
+    scanner.open(io.StringIO(src))
+    scanner.get_next_symbol()
+    assert scanner.sym == Token.IDENT
+    scanner.get_next_symbol()
+    assert scanner.sym == Token.BECOMES
+    scanner.get_next_symbol()
+    assert scanner.sym == Token.NUMBER
+    assert scanner.value == number
+    scanner.get_next_symbol()
+    assert scanner.sym == Token.EOF
+
+
+def test_iter_tokens():
+    src = "WHILE i >= 10 DO\n  i := i - 1\nEND"
+    scanner = Scanner()
+    scanner.open(io.StringIO(src))
+    assert list(scanner.iter_tokens()) == [
+        (Token.WHILE, "WHILE", 1, 1),
+        (Token.IDENT, "i", 1, 7),
+        (Token.GEQ, ">=", 1, 9),
+        (Token.NUMBER, 10, 1, 12),
+        (Token.DO, "DO", 1, 15),
+        (Token.IDENT, "i", 2, 3),
+        (Token.BECOMES, ":=", 2, 5),
+        (Token.IDENT, "i", 2, 8),
+        (Token.MINUS, "-", 2, 10),
+        (Token.NUMBER, 1, 2, 12),
+        (Token.END, "END", 3, 1),
+        (Token.EOF, "", 3, 4),
+    ]
+
+
+def test_tokenize():
+    src = "x := x + 1; y := x"
+    scanner = Scanner()
+    scanner.open(io.StringIO(src))
+    buffer = scanner.tokenize()
+    assert len(buffer) == 10  # noqa: PLR2004
+    assert [buffer.kind(i) for i in range(len(buffer))] == [
+        Token.IDENT,
+        Token.BECOMES,
+        Token.IDENT,
+        Token.PLUS,
+        Token.NUMBER,
+        Token.SEMICOLON,
+        Token.IDENT,
+        Token.BECOMES,
+        Token.IDENT,
+        Token.EOF,
+    ]
+    assert buffer.value(4) == 1
+    assert buffer.text(6) == "y"
+    assert buffer.location(6) == (1, 13)
+    assert buffer.value_ids[0] == buffer.value_ids[2] == buffer.value_ids[8]
+    assert [t for t, _, _, _ in buffer[5:]] == [
+        Token.SEMICOLON,
+        Token.IDENT,
+        Token.BECOMES,
+        Token.IDENT,
+        Token.EOF,
+    ]
+    assert pickle.loads(pickle.dumps(buffer)).value(8) == "x"
+
+
+def test_replay():
+    src = "MODULE m; (* x *) BEGIN i := 42 END m."
+    scanner = Scanner()
+    scanner.open(io.StringIO(src))
+    expected = [(t, v) for t, v, _, _ in scanner.iter_tokens()]
+    scanner.open(io.StringIO(src))
+    scanner.replay(scanner.tokenize())
+    replayed = []
+    while not scanner.eof:
+        scanner.get_next_symbol()
+        replayed.append((scanner.sym, scanner.value))
+    assert replayed == expected
+    assert scanner.location() == (1, len(src) + 1)
@@ -0,0 +1,50 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import pytest
+from wasmtime import Engine, Instance, Module, Store
+
+from oberon0_compiler.wasm import Function, Op, sized, sleb128, uleb128
+from oberon0_compiler.wasm import Module as WasmModule
+
+
+@pytest.mark.parametrize(
+    ("value", "encoded"),
+    [(0, "00"), (127, "7f"), (128, "8001"), (624485, "e58e26")],
+)
+def test_uleb128(value, encoded):
+    out = bytearray()
+    uleb128(out, value)
+    assert out.hex() == encoded
+
+
+@pytest.mark.parametrize(
+    ("value", "encoded"),
+    [(0, "00"), (63, "3f"), (64, "c000"), (-1, "7f"), (-64, "40"), (-65, "bf7f")],
+)
+def test_sleb128(value, encoded):
+    out = bytearray()
+    sleb128(out, value)
+    assert out.hex() == encoded
+
+
+def test_sized():
+    out = bytearray(b"\x01")
+    with sized(out):
+        out += bytes(200)
+    assert out[1:6].hex() == "c881808000"  # 200, padded to 5 bytes
+    assert len(out) == 206  # noqa: PLR2004
+
+
+def test_module():
+    wasm = WasmModule()
+    f = Function("Answer", results=1)
+    f.i32_const(-42)
+    f.emit(Op.I32_CONST, 0)  # Unsigned immediate, as 0 is the same
+    f.emit(Op.I32_ADD)
+    wasm.export("Answer", wasm.add(f))
+    engine = Engine()
+    store = Store(engine)
+    instance = Instance(store, Module(engine, wasm.encode()), [])
+    assert instance.exports(store)["Answer"](store) == -42  # noqa: PLR2004
@@ -0,0 +1,294 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Binary WebAssembly encoder
+
+Functions are encoded as they are generated, each in its own `bytearray`, and
+`Module.encode` assembles them in the binary format in one `bytearray`. The
+size of a section is only known once the section is written: 5 bytes are
+reserved for it and patched with a padded LEB128 afterwards, so that nothing
+has to be encoded twice or moved. Only what the Oberon-0 code generator needs
+is supported: i32 values, one imported memory and imported globals.
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from enum import IntEnum
+
+MAGIC = b"\0asm\1\0\0\0"
+I32 = 0x7F  # Value type
+VOID = 0x40  # Block type without result
+FUNC = 0x60  # Function type
+
+# Sections
+CUSTOM, TYPE, IMPORT, FUNCTION = 0, 1, 2, 3
+EXPORT, START, CODE = 7, 8, 10
+
+# Import and export kinds
+KIND_FUNC, KIND_MEMORY, KIND_GLOBAL = 0, 2, 3
+
+ALIGN_I32 = 2  # log2 of the alignment of an i32 access
+SIZE_BYTES = 5  # Of a padded LEB128 size
+
+
+class Op(IntEnum):
+    UNREACHABLE = 0x00
+    BLOCK = 0x02
+    LOOP = 0x03
+    IF = 0x04
+    ELSE = 0x05
+    END = 0x0B
+    BR = 0x0C
+    BR_IF = 0x0D
+    RETURN = 0x0F
+    CALL = 0x10
+    DROP = 0x1A
+    SELECT = 0x1B
+    LOCAL_GET = 0x20
+    LOCAL_SET = 0x21
+    LOCAL_TEE = 0x22
+    GLOBAL_GET = 0x23
+    GLOBAL_SET = 0x24
+    I32_LOAD = 0x28
+    I32_STORE = 0x36
+    I32_STORE8 = 0x3A
+    I32_CONST = 0x41
+    I32_EQZ = 0x45
+    I32_EQ = 0x46
+    I32_NE = 0x47
+    I32_LT_S = 0x48
+    I32_LT_U = 0x49
+    I32_GT_S = 0x4A
+    I32_GT_U = 0x4B
+    I32_LE_S = 0x4C
+    I32_LE_U = 0x4D
+    I32_GE_S = 0x4E
+    I32_GE_U = 0x4F
+    I32_ADD = 0x6A
+    I32_SUB = 0x6B
+    I32_MUL = 0x6C
+    I32_DIV_S = 0x6D
+    I32_DIV_U = 0x6E
+    I32_REM_S = 0x6F
+    I32_REM_U = 0x70
+    I32_AND = 0x71
+    I32_OR = 0x72
+    I32_XOR = 0x73
+    I32_SHL = 0x74
+    I32_SHR_S = 0x75
+    I32_SHR_U = 0x76
+    PREFIX_FC = 0xFC  # memory.copy and memory.fill
+
+
+MEMORY_COPY = 10  # After PREFIX_FC
+MEMORY_FILL = 11
+
+
+def uleb128(out: bytearray, value: int) -> None:
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def sleb128(out: bytearray, value: int) -> None:
+    while True:
+        byte = value & 0x7F
+        value >>= 7  # Arithmetic shift: -1 stays -1
+        if (value == 0 and not byte & 0x40) or (value == -1 and byte & 0x40):
+            out.append(byte)
+            return
+        out.append(byte | 0x80)
+
+
+def name(out: bytearray, s: str) -> None:
+    data = s.encode()
+    uleb128(out, len(data))
+    out += data
+
+
+@contextmanager
+def sized(out: bytearray) -> Iterator[None]:
+    """Prefix what is written in the block with its size, as a padded 5-byte
+    LEB128."""
+    start = len(out)
+    out += bytes(SIZE_BYTES)
+    yield
+    size = len(out) - start - SIZE_BYTES
+    for i in range(SIZE_BYTES):
+        more = 0x80 if i < SIZE_BYTES - 1 else 0
+        out[start + i] = (size >> (7 * i)) & 0x7F | more
+
+
+class Function:
+    """A function being generated. Parameters and locals are all i32."""
+
+    def __init__(self, name: str, params: int = 0, results: int = 0):
+        self.name = name
+        self.params = params
+        self.results = results
+        self.locals = 0
+        self.code = bytearray()
+
+    def local(self) -> int:
+        """Index of a new local."""
+        self.locals += 1
+        return self.params + self.locals - 1
+
+    def emit(self, op: Op, *immediates: int) -> None:
+        """An instruction with unsigned immediates."""
+        self.code.append(op)
+        for i in immediates:
+            uleb128(self.code, i)
+
+    def i32_const(self, value: int) -> None:
+        self.code.append(Op.I32_CONST)
+        sleb128(self.code, value)
+
+    def load(self, offset: int = 0) -> None:
+        self.emit(Op.I32_LOAD, ALIGN_I32, offset)
+
+    def store(self, offset: int = 0) -> None:
+        self.emit(Op.I32_STORE, ALIGN_I32, offset)
+
+    def store8(self, offset: int = 0) -> None:
+        self.emit(Op.I32_STORE8, 0, offset)
+
+    def memory_copy(self) -> None:
+        self.emit(Op.PREFIX_FC, MEMORY_COPY, 0, 0)
+
+    def memory_fill(self) -> None:
+        self.emit(Op.PREFIX_FC, MEMORY_FILL, 0)
+
+    def body(self, out: bytearray) -> None:
+        """Append the encoded body, with its size."""
+        with sized(out):
+            if self.locals:
+                out += b"\x01"
+                uleb128(out, self.locals)
+                out.append(I32)
+            else:
+                out += b"\x00"
+            out += self.code
+            out.append(Op.END)
+
+
+class Module:
+    """A module whose imports all come from `namespace`. Functions must be
+    imported before any function is added, so that the indices of the
+    functions do not change."""
+
+    def __init__(self, namespace: str = "env"):
+        self.namespace = namespace
+        self.imports: list[tuple[str, int, int]] = []  # Functions
+        self.memory: str | None = None
+        self.globals: list[str] = []  # Mutable i32
+        self.functions: list[Function] = []
+        self.exports: dict[str, int] = {}
+        self.start: int | None = None
+
+    def import_function(self, name: str, params: int = 0, results: int = 0) -> int:
+        assert not self.functions, "functions must be imported first"
+        self.imports.append((name, params, results))
+        return len(self.imports) - 1
+
+    def import_memory(self, name: str) -> None:
+        self.memory = name
+
+    def import_global(self, name: str) -> int:
+        self.globals.append(name)
+        return len(self.globals) - 1
+
+    def add(self, function: Function) -> int:
+        """Index of `function`, which can still be generated afterwards."""
+        self.functions.append(function)
+        return len(self.imports) + len(self.functions) - 1
+
+    def export(self, name: str, index: int) -> None:
+        self.exports[name] = index
+
+    def encode(self) -> bytes:
+        out = bytearray(MAGIC)
+        types: dict[tuple[int, int], int] = {}
+        signatures = [(p, r) for _, p, r in self.imports]
+        signatures += [(f.params, f.results) for f in self.functions]
+        for signature in signatures:
+            types.setdefault(signature, len(types))
+
+        out.append(TYPE)
+        with sized(out):
+            uleb128(out, len(types))
+            for params, results in types:
+                out.append(FUNC)
+                uleb128(out, params)
+                out += bytes([I32]) * params
+                uleb128(out, results)
+                out += bytes([I32]) * results
+
+        self._imports(out, types)
+
+        out.append(FUNCTION)
+        with sized(out):
+            uleb128(out, len(self.functions))
+            for f in self.functions:
+                uleb128(out, types[f.params, f.results])
+
+        out.append(EXPORT)
+        with sized(out):
+            uleb128(out, len(self.exports))
+            for n, index in self.exports.items():
+                name(out, n)
+                out.append(KIND_FUNC)
+                uleb128(out, index)
+
+        if self.start is not None:
+            out.append(START)
+            with sized(out):
+                uleb128(out, self.start)
+
+        out.append(CODE)
+        with sized(out):
+            uleb128(out, len(self.functions))
+            for f in self.functions:
+                f.body(out)
+
+        self._names(out)
+        return bytes(out)
+
+    def _imports(self, out: bytearray, types: dict[tuple[int, int], int]) -> None:
+        out.append(IMPORT)
+        with sized(out):
+            uleb128(out, len(self.imports) + len(self.globals) + bool(self.memory))
+            for n, params, results in self.imports:
+                name(out, self.namespace)
+                name(out, n)
+                out.append(KIND_FUNC)
+                uleb128(out, types[params, results])
+            if self.memory:
+                name(out, self.namespace)
+                name(out, self.memory)
+                out += bytes([KIND_MEMORY, 0, 1])  # At least one page, no maximum
+            for n in self.globals:
+                name(out, self.namespace)
+                name(out, n)
+                out += bytes([KIND_GLOBAL, I32, 1])  # Mutable
+
+    def _names(self, out: bytearray) -> None:
+        """The names of the functions, for the backtraces of traps."""
+        out.append(CUSTOM)
+        with sized(out):
+            name(out, "name")
+            out.append(1)  # Function names
+            with sized(out):
+                names = [n for n, _, _ in self.imports]
+                names += [f.name for f in self.functions]
+                uleb128(out, len(names))
+                for index, n in enumerate(names):
+                    uleb128(out, index)
+                    name(out, n)
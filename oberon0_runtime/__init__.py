@@ -4,161 +4,199 @@
 
 """
 Oberon0 runtime for WASM module
+
+The modules needed to run a single command are light to import. The others
+(pydantic and the process pool for `batch`, loguru for `--debug`, rich for
+error messages) are imported on the paths that need them.
 """
 
 import sys
-from enum import Enum
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, NoReturn
 
 import typer
-from loguru import logger
-from pydantic import BaseModel, ConfigDict
-from rich import print
-from wasmtime import (
-    Func,
-    FuncType,
-    Global,
-    GlobalType,
-    Instance,
-    Limits,
-    Memory,
-    MemoryType,
-    Module,
-    Store,
-    ValType,
+from wasmtime import Engine, Module
+
+from compiler_common.cli import DefaultCommandGroup
+from oberon0_runtime.cache import EngineOptions, ModuleCache, OptLevel, load_module
+from oberon0_runtime.context import Abort, Context, ReturnCode, Session, run
+from oberon0_runtime.input import BinarySource, InputSource, ListSource, TextSource
+from oberon0_runtime.limits import RunLimits
+from oberon0_runtime.options import (
+    Cache,
+    CacheDir,
+    Fuel,
+    InputFormat,
+    Metrics,
+    Opt,
+    ParallelCompile,
+    Timeout,
 )
+from oberon0_runtime.output import BUFFER_SIZE, OutputWriter
 
-INT32_SIZE = 4
-INITIAL_STACK_POINTER = 1 << 16
-
-
-class ReturnCode(Enum):
-    SUCCESS = 0
-    FILE_NOT_FOUND = 1
-    COMMAND_NOT_FOUND = 2
-    NO_MORE_INPUT = 3
+__all__ = ["Context", "ReturnCode", "Session", "app", "run"]
 
 
-app = typer.Typer()
+app = typer.Typer(cls=DefaultCommandGroup)
 
 
-class Context(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-    store: None | Store
-    buffer: list[int]
-    memory: None | Memory
+def fail(message: str, code: ReturnCode) -> NoReturn:
+    from rich import print
 
+    print(f"[bold red]Error: {message}[/bold red]")
+    raise typer.Exit(code=code.value)
 
-context = Context(buffer=[], store=None, memory=None)
 
+def enable_debug_logging() -> None:
+    from loguru import logger
 
-# Runtime functions
-def open_input():
-    """open-inout is a no-op for compatibility with the original Oberon0 runtime."""
-    logger.debug("OpenInput()")
+    logger.remove()
+    logger.add(sys.stdout, level="DEBUG")
 
 
-def read_int(address: int):
-    """Reads an integer from the input buffer and store it in the memory
-    at the given address."""
-    logger.debug(f"ReadInt({address})")
+def open_input(
+    numbers: list[int] | None, input: Path | None, input_format: InputFormat
+) -> InputSource:
+    """The input of a run: the numbers of the command line, or a file."""
+    if numbers and input is not None:
+        raise typer.BadParameter("give either numbers or --input, not both")
     try:
-        val = context.buffer.pop(0)
-    except IndexError:
-        print("[bold red]Error: no more input[/bold red]")
-        raise typer.Exit(code=ReturnCode.NO_MORE_INPUT.value) from None
-
-    context.memory.write(context.store, val.to_bytes(INT32_SIZE, "little"), address)
-
-
-def eot_() -> int:
-    """Check if there are still elements in the input buffer."""
-    logger.debug("EOT()")
-    return 1 if len(context.buffer) == 0 else 0
-
-
-def write_char(c):
-    """
-    Write a character to the standard output.
-    """
-    logger.debug(f"WriteChar({c})")
-    print(chr(c), end="")
-
-
-def write_int(i, len):
-    """Write an integer to the standard output using a width of `len` characters
-    (padded with spaces).
-    """
-    logger.debug(f"WriteInt({i}, {len})")
-    print(f"{i:{len}d}", end="")
+        if input is None:
+            return ListSource(numbers or [])
+        if input_format == InputFormat.BINARY:
+            return BinarySource(input)
+        return TextSource.open(input)
+    except (OSError, ValueError) as e:
+        fail(f"cannot read input: {e}", ReturnCode.FILE_NOT_FOUND)
+
+
+def engine_options(
+    opt_level: OptLevel, parallel_compile: bool, limits: RunLimits
+) -> EngineOptions:
+    return limits.engine_options(
+        EngineOptions(opt_level=opt_level, parallel_compilation=parallel_compile)
+    )
 
 
-def write_ln():
-    """Write a newline character to the standard output."""
-    print()
+def execute(  # noqa: PLR0913
+    engine: Engine,
+    module: Module,
+    command: str,
+    source: InputSource,
+    limits: RunLimits,
+    debug: bool = False,
+) -> None:
+    """Run `command` and exit with its return code if it fails. The metrics
+    are written to the standard error as JSON."""
+    # In debug mode, the output is written at once, between the log messages
+    output = OutputWriter(buffer_size=1 if debug else BUFFER_SIZE)
+    session = None
+    try:
+        session = Session(engine, module, source, output, debug, limits)
+        session.call(command, source, output)
+    except Abort as e:
+        fail(str(e), e.code)
+    finally:
+        source.close()
+        if session is not None and session.metrics is not None:
+            sys.stderr.write(session.metrics.to_json() + "\n")
+
+
+def compile_module(  # noqa: PLR0913
+    wasm_file: Path,
+    cache_dir: Path | None,
+    cache: bool,
+    opt_level: OptLevel,
+    parallel_compile: bool,
+    limits: RunLimits,
+) -> tuple[Engine, Module, EngineOptions]:
+    options = engine_options(opt_level, parallel_compile, limits)
+    engine = options.engine()
+    try:
+        module = load_module(
+            engine, wasm_file, options, ModuleCache(cache_dir) if cache else None
+        )
+    except FileNotFoundError:
+        fail(f"WASM file '{wasm_file}' not found", ReturnCode.FILE_NOT_FOUND)
+    return engine, module, options
 
 
 # Main function
 @app.command()
-def main(
+def main(  # noqa: PLR0913
     wasm_file: Annotated[Path, typer.Argument()],
     command: Annotated[str, typer.Argument()],
     numbers: Annotated[list[int] | None, typer.Argument()] = None,
+    input: Annotated[
+        Path | None,
+        typer.Option(help="Read the input from a file ('-' for the standard input)"),
+    ] = None,
+    input_format: Annotated[
+        InputFormat, typer.Option(help="Format of the --input file")
+    ] = InputFormat.TEXT,
+    cache_dir: CacheDir = None,
+    cache: Cache = True,
+    opt_level: Opt = OptLevel.SPEED,
+    parallel_compile: ParallelCompile = True,
+    fuel: Fuel = None,
+    timeout: Timeout = None,
+    metrics: Metrics = False,
     debug: bool = False,
 ):
-    logger.remove()
+    """
+    Run a command of a WASM module. With --metrics, the metrics of the run
+    are written to the standard error as JSON.
+    """
     if debug:
-        logger.add(sys.stdout, level="DEBUG")
-    else:
-        logger.add(sys.stdout, level="INFO")
-
-    if numbers is not None:
-        context.buffer.extend(numbers)
-
-    context.store = Store()
-
-    try:
-        module = Module.from_file(context.store.engine, wasm_file)
-    except FileNotFoundError:
-        print(f"[bold red]Error: WASM file '{wasm_file}' not found[/bold red]")
-        raise typer.Exit(code=ReturnCode.FILE_NOT_FOUND.value) from None
-
-    f_open_input = Func(context.store, FuncType([], []), open_input)
-    f_read_int = Func(context.store, FuncType([ValType.i32()], []), read_int)
-    f_eot = Func(context.store, FuncType([], [ValType.i32()]), eot_)
-    f_write_char = Func(context.store, FuncType([ValType.i32()], []), write_char)
-    f_write_int = Func(
-        context.store, FuncType([ValType.i32(), ValType.i32()], []), write_int
+        enable_debug_logging()
+    source = open_input(numbers, input, input_format)
+    limits = RunLimits(fuel=fuel, timeout=timeout, metrics=metrics)
+    engine, module, _ = compile_module(
+        wasm_file, cache_dir, cache, opt_level, parallel_compile, limits
     )
-    f_write_ln = Func(context.store, FuncType([], []), write_ln)
+    execute(engine, module, command, source, limits, debug)
 
-    context.memory = Memory(context.store, MemoryType(Limits(1, None)))
-    sp = Global(
-        context.store, GlobalType(ValType.i32(), mutable=True), INITIAL_STACK_POINTER
-    )
 
-    instance = Instance(
-        context.store,
-        module,
-        [
-            f_open_input,
-            f_read_int,
-            f_eot,
-            f_write_char,
-            f_write_int,
-            f_write_ln,
-            context.memory,
-            sp,
-        ],
-    )
+@app.command()
+def batch(  # noqa: PLR0913
+    wasm_file: Annotated[Path, typer.Argument()],
+    cases: Annotated[
+        Path,
+        typer.Argument(help="JSON lines file of cases ('-' for the standard input)"),
+    ],
+    jobs: Annotated[
+        int, typer.Option("--jobs", "-j", help="Workers (0: one per core)")
+    ] = 0,
+    processes: Annotated[
+        bool, typer.Option(help="Run the cases in processes instead of threads")
+    ] = False,
+    cache_dir: CacheDir = None,
+    cache: Cache = True,
+    opt_level: Opt = OptLevel.SPEED,
+    parallel_compile: ParallelCompile = True,
+    fuel: Fuel = None,
+    timeout: Timeout = None,
+    metrics: Metrics = False,
+):
+    """
+    Run many cases, one JSON object per line: {"command": "Main", "input": [1, 2]}.
+    Print one JSON result per case, in order. Every case gets the whole
+    --fuel budget and --timeout.
+    """
+    from oberon0_runtime.batch import run_batch
 
+    limits = RunLimits(fuel=fuel, timeout=timeout, metrics=metrics)
+    engine, module, options = compile_module(
+        wasm_file, cache_dir, cache, opt_level, parallel_compile, limits
+    )
     try:
-        cmd = instance.exports(context.store)[command]
-    except KeyError:
-        print(f"[bold red]Error: command '{command}' not found[/bold red]")
-        raise typer.Exit(code=ReturnCode.COMMAND_NOT_FOUND.value) from None
-    cmd(context.store)
+        f = sys.stdin if str(cases) == "-" else open(cases)
+    except OSError as e:
+        fail(f"cannot read cases: {e}", ReturnCode.FILE_NOT_FOUND)
+    with f:
+        results = run_batch(engine, module, options, f, jobs, processes, limits)
+        for result in results:
+            sys.stdout.write(result.model_dump_json() + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Batch execution: many input cases against one compiled module
+
+Each line of the input is a JSON object `{"command": "Main", "input": [1, 2]}`.
+The module is compiled once; the cases run in a pool of threads (wasmtime
+releases the GIL while WASM code runs) or of processes (which receive the
+serialized module). Every worker instantiates the module once and runs its
+cases in a `Session`, which resets the instance between two cases. Results are
+yielded in the order of the cases, while later cases are still running. A case
+that fails, even with an unexpected error, only fails its own result.
+"""
+
+import functools
+import io
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from pydantic import BaseModel, ValidationError
+from wasmtime import Engine, Module
+
+from oberon0_runtime.cache import EngineOptions
+from oberon0_runtime.context import Abort, ReturnCode, Session
+from oberon0_runtime.input import ListSource
+from oberon0_runtime.limits import Metrics, RunLimits
+from oberon0_runtime.output import OutputWriter
+
+
+class Case(BaseModel):
+    command: str
+    input: list[int] = []
+
+
+class Result(BaseModel):
+    index: int  # Line of the case, from 0
+    code: int  # ReturnCode value
+    stdout: str = ""
+    error: str | None = None
+    time: float = 0.0  # Seconds
+    metrics: Metrics | None = None
+
+
+def run_case(session: Callable[[], Session], index: int, line: str) -> Result:
+    """Run the case `line` in the session returned by `session()`, which
+    instantiates the module on its first call."""
+    start = time.perf_counter()
+    stream = io.BytesIO()
+    result = Result(index=index, code=ReturnCode.SUCCESS.value)
+    current = None
+    try:
+        case = Case.model_validate_json(line)
+        output = OutputWriter(stream, line_buffered=False)
+        current = session()
+        current.call(case.command, ListSource(case.input), output)
+        result.metrics = current.metrics
+    except ValidationError as e:
+        result.code = ReturnCode.INVALID_INPUT.value
+        result.error = f"invalid case: {e.errors()[0]['msg']}"
+    except Abort as e:
+        result.code = e.code.value
+        result.error = str(e)
+        if current is not None:
+            result.metrics = current.metrics
+    except Exception as e:
+        result.code = ReturnCode.INTERNAL_ERROR.value
+        message = str(e).splitlines()[0] if str(e) else ""
+        result.error = f"internal error: {type(e).__name__}: {message}"
+    result.stdout = stream.getvalue().decode(errors="replace")
+    result.time = time.perf_counter() - start
+    return result
+
+
+# State of a worker process
+_session: Callable[[], Session] | None = None
+
+
+def _init_worker(
+    options: EngineOptions, serialized: bytes, limits: RunLimits | None
+) -> None:
+    global _session  # noqa: PLW0603
+    engine = options.engine()
+    module = Module.deserialize(engine, serialized)
+    _session = functools.cache(lambda: Session(engine, module, limits=limits))
+
+
+def _run_in_worker(index: int, line: str) -> Result:
+    return run_case(_session, index, line)
+
+
+def _ordered(
+    executor: Executor, fn: Callable, items: Iterable[tuple], window: int
+) -> Iterator:
+    """Like `executor.map`, but with at most `window` items submitted ahead of
+    the result being yielded, so that the input is read lazily."""
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(fn, *item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def run_batch(  # noqa: PLR0913
+    engine: Engine,
+    module: Module,
+    options: EngineOptions,
+    lines: Iterable[str],
+    jobs: int = 0,
+    processes: bool = False,
+    limits: RunLimits | None = None,
+) -> Iterator[Result]:
+    """Run the cases of `lines` (blank lines are skipped) with `jobs` workers
+    (one per core if 0) and yield the results in order. Every case gets the
+    whole budget of `limits`."""
+    jobs = jobs or os.cpu_count() or 1
+    cases = ((i, line) for i, line in enumerate(lines) if line.strip())
+    if jobs == 1:
+        session = functools.cache(lambda: Session(engine, module, limits=limits))
+        for i, line in cases:
+            yield run_case(session, i, line)
+        return
+    if processes:
+        executor = ProcessPoolExecutor(
+            jobs,
+            initializer=_init_worker,
+            initargs=(options, module.serialize(), limits),
+        )
+        fn = _run_in_worker
+    else:
+        executor = ThreadPoolExecutor(jobs)
+        local = threading.local()  # A store must stay in its thread
+
+        def session() -> Session:
+            if not hasattr(local, "session"):
+                local.session = Session(engine, module, limits=limits)
+            return local.session
+
+        fn = functools.partial(run_case, session)
+
+    with executor:
+        yield from _ordered(executor, fn, cases, jobs * 4)
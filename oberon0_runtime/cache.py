@@ -0,0 +1,208 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Engine options and on-disk cache of compiled modules
+
+Compiling a WASM module with Cranelift takes most of the start-up time of a
+short program. The cache keeps the native code produced by `Module.serialize`
+in a directory, under a key made of the SHA-256 of the WASM bytes, the version
+of wasmtime, the platform and every engine option that changes the generated
+code. Files are written atomically, a hit refreshes the modification time of
+its file, and the least recently used files are removed when the directory
+grows over its size limit.
+
+Deserializing runs native code from the cache directory: it is created
+private, and not used at all unless it belongs to the user and only they can
+write to it.
+"""
+
+import contextlib
+import functools
+import hashlib
+import os
+import platform
+import stat
+import tempfile
+from collections.abc import Callable
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+import wasmtime
+from wasmtime import Config, Engine, Module
+
+SUFFIX = ".cwasm"
+MAX_CACHE_SIZE = 256 << 20  # Bytes
+
+
+class OptLevel(str, Enum):
+    NONE = "none"
+    SPEED = "speed"
+    SPEED_AND_SIZE = "speed_and_size"
+
+
+@functools.cache
+def wasmtime_version() -> str:
+    # The name of the dist-info directory is much faster to find than the
+    # metadata of the package
+    site = Path(wasmtime.__file__).parent.parent
+    for info in site.glob("wasmtime-*.dist-info"):
+        return info.name.removeprefix("wasmtime-").removesuffix(".dist-info")
+    from importlib.metadata import version
+
+    return version("wasmtime")
+
+
+@dataclass(frozen=True)
+class EngineOptions:
+    opt_level: OptLevel = OptLevel.SPEED
+    parallel_compilation: bool = True
+    consume_fuel: bool = False
+    epoch_interruption: bool = False
+
+    def config(self) -> Config:
+        config = Config()
+        config.cranelift_opt_level = self.opt_level.value
+        config.parallel_compilation = self.parallel_compilation
+        config.consume_fuel = self.consume_fuel
+        config.epoch_interruption = self.epoch_interruption
+        return config
+
+    def engine(self) -> Engine:
+        return Engine(self.config())
+
+    def fingerprint(self) -> str:
+        """What, besides the WASM bytes, determines the compiled code. The
+        number of compilation threads does not."""
+        options = {
+            "opt_level": self.opt_level.value,
+            "consume_fuel": self.consume_fuel,
+            "epoch_interruption": self.epoch_interruption,
+        }
+        return f"wasmtime={wasmtime_version()};{platform.machine()};{options}"
+
+
+def default_directory() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "oberon0-rt"
+
+
+class ModuleCache:
+    def __init__(self, directory: Path | None = None, max_size: int = MAX_CACHE_SIZE):
+        self.directory = default_directory() if directory is None else directory
+        self.max_size = max_size
+
+    def key(self, wasm: bytes, options: EngineOptions) -> str:
+        h = hashlib.sha256(options.fingerprint().encode())
+        h.update(b"\0")
+        h.update(wasm)
+        return h.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}{SUFFIX}"
+
+    def trusted(self) -> bool:
+        """Whether the directory belongs to the user and only they can write
+        to it."""
+        try:
+            st = self.directory.stat()
+        except OSError:
+            return False
+        if hasattr(os, "getuid") and st.st_uid != os.getuid():
+            return False
+        return not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+    def load(self, engine: Engine, key: str) -> Module | None:
+        path = self.path(key)
+        if not path.is_file():  # wasmtime does not raise FileNotFoundError
+            return None
+        if not self.trusted():
+            from loguru import logger
+
+            logger.debug("Not loading {}: the directory is not private", path)
+            return None
+        try:
+            module = Module.deserialize_file(engine, str(path))
+        except Exception as e:
+            # Truncated file or artifact of an incompatible engine
+            from loguru import logger
+
+            logger.debug("Dropping cache entry {}: {}", path, e)
+            path.unlink(missing_ok=True)
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)  # Most recently used
+        return module
+
+    def save(self, key: str, module: Module) -> None:
+        self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if not self.trusted():
+            raise PermissionError(f"{self.directory} is not private to the user")
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(module.serialize())
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used files until the cache fits in
+        `max_size` bytes."""
+        entries = []
+        for path in self.directory.glob(f"*{SUFFIX}"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue  # Removed by another process
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def get_or_compile(
+        self,
+        engine: Engine,
+        wasm: bytes,
+        options: EngineOptions,
+        compile: Callable[[Engine, bytes], Module] = Module,
+    ) -> Module:
+        return self.get_or_build(
+            engine, self.key(wasm, options), lambda: compile(engine, wasm)
+        )
+
+    def get_or_build(
+        self, engine: Engine, key: str, build: Callable[[], Module]
+    ) -> Module:
+        """The module saved under `key`, or the one made by `build`, which is
+        then saved under it."""
+        module = self.load(engine, key)
+        if module is None:
+            module = build()
+            try:
+                self.save(key, module)
+            except OSError as e:
+                from loguru import logger
+
+                logger.warning("Cannot write to the module cache: {}", e)
+        return module
+
+
+def load_module(
+    engine: Engine,
+    wasm_file: Path,
+    options: EngineOptions,
+    cache: ModuleCache | None = None,
+) -> Module:
+    """Compile `wasm_file`, or load it from `cache`."""
+    wasm = wasm_file.read_bytes()
+    if cache is None:
+        return Module(engine, wasm)
+    return cache.get_or_compile(engine, wasm, options)
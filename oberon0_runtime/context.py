@@ -0,0 +1,412 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Execution context of a WASM program: its store, its input and output, and the
+host functions it imports
+
+Every instance gets its own `Context`, so that many programs can run side by
+side with the same engine and module. A `Session` keeps an instance and runs
+many commands with it: between two commands, it restores the memory and the
+globals from a `Snapshot` taken after the instantiation, which costs one copy
+of the memory instead of a new store and a new instance.
+
+The context also keeps the error of its host functions: wasmtime passes it to
+the caller through a global that all the threads share, so a program that runs
+beside others could get the error of another program instead of its own.
+"""
+
+import ctypes
+import io
+import time
+from collections import Counter
+from collections.abc import Callable
+from enum import Enum
+
+from wasmtime import (
+    Engine,
+    Func,
+    FuncType,
+    Global,
+    GlobalType,
+    Instance,
+    Limits,
+    Memory,
+    MemoryType,
+    Module,
+    Store,
+    Trap,
+    TrapCode,
+    Val,
+    ValType,
+    WasmtimeError,
+)
+
+from oberon0_runtime.input import InputSource, ListSource
+from oberon0_runtime.limits import UNLIMITED_FUEL, Metrics, RunLimits, start_ticker
+from oberon0_runtime.memory import MemoryView
+from oberon0_runtime.output import OutputWriter
+
+INITIAL_STACK_POINTER = 1 << 16
+
+# Names of the imports, in the order used by modules that import by position.
+# Modules that import by name can also use the bulk functions `ReadInts` and
+# `WriteBuffer`.
+IMPORTS = (
+    "OpenInput",
+    "ReadInt",
+    "Eot",
+    "WriteChar",
+    "WriteInt",
+    "WriteLn",
+    "memory",
+    "sp",
+)
+
+
+class ReturnCode(Enum):
+    SUCCESS = 0
+    FILE_NOT_FOUND = 1
+    COMMAND_NOT_FOUND = 2
+    NO_MORE_INPUT = 3
+    INVALID_INPUT = 4
+    TRAP = 5
+    FUEL_EXHAUSTED = 6
+    TIMEOUT = 7
+    COMPILE_ERROR = 8  # Of an Oberon-0 source, see `oberon0_compiler.build`
+    INTERNAL_ERROR = 9  # An unexpected error of the runtime
+
+
+class Abort(Exception):  # noqa: N818
+    """Stops a program with a return code other than SUCCESS."""
+
+    def __init__(self, code: ReturnCode, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _traced(name: str, f: Callable) -> Callable:
+    from loguru import logger  # Only for debugging, loguru is slow to import
+
+    def wrapper(*args):
+        logger.debug("{}({})", name, ", ".join(map(str, args)))
+        return f(*args)
+
+    return wrapper
+
+
+def _counted(name: str, f: Callable, calls: Counter) -> Callable:
+    def wrapper(*args):
+        calls[name] += 1
+        return f(*args)
+
+    return wrapper
+
+
+def _recorded(f: Callable, context: "Context") -> Callable:
+    def wrapper(*args):
+        try:
+            return f(*args)
+        except Exception as e:
+            context.error = e
+            raise
+
+    return wrapper
+
+
+class Context:
+    def __init__(self, store: Store, input: InputSource, output: OutputWriter):
+        self.store = store
+        self.input = input
+        self.output = output
+        self.memory: Memory | None = None
+        self.view: MemoryView | None = None
+        self.sp: Global | None = None
+        self.calls: Counter | None = None  # Host calls per import, if counted
+        self.error: Exception | None = None  # Raised by a host function
+
+    # Runtime functions
+    def open_input(self):
+        """open-inout is a no-op for compatibility with the original Oberon0
+        runtime."""
+
+    def read_int(self, address: int):
+        """Reads an integer from the input and store it in the memory at the
+        given address."""
+        try:
+            self.view.write_int(address, self.input.read())
+        except EOFError:
+            raise Abort(ReturnCode.NO_MORE_INPUT, "no more input") from None
+        except (ValueError, OverflowError) as e:
+            raise Abort(ReturnCode.INVALID_INPUT, f"invalid input: {e}") from None
+        except IndexError as e:
+            raise Abort(ReturnCode.TRAP, f"trap: {e}") from None
+
+    def read_ints(self, address: int, count: int) -> int:
+        """Read up to `count` integers into the memory at `address`, and
+        return how many were read: fewer than `count` at the end of the
+        input. Nothing is read if the integers would not fit in the
+        memory."""
+        try:
+            self.view.check_ints(address, count)
+            values = self.input.read_many(count)
+            self.view.write_ints(address, values)
+        except (ValueError, OverflowError) as e:
+            raise Abort(ReturnCode.INVALID_INPUT, f"invalid input: {e}") from None
+        except IndexError as e:
+            raise Abort(ReturnCode.TRAP, f"trap: {e}") from None
+        return len(values)
+
+    def eot(self) -> int:
+        """Check if the input is exhausted."""
+        try:
+            return 1 if self.input.at_end() else 0
+        except ValueError as e:
+            raise Abort(ReturnCode.INVALID_INPUT, f"invalid input: {e}") from None
+
+    # The output functions go through the context, so that a session can
+    # change its output between two commands
+    def write_char(self, c: int):
+        try:
+            self.output.write_char(c)
+        except ValueError as e:
+            raise Abort(ReturnCode.TRAP, f"trap: {e}") from None
+
+    def write_int(self, i: int, width: int):
+        self.output.write_int(i, width)
+
+    def write_ln(self):
+        self.output.write_ln()
+
+    def write_buffer(self, address: int, length: int):
+        """Write `length` bytes of the memory at `address`, as they are."""
+        try:
+            self.output.write_bytes(self.view.read_bytes(address, length))
+        except IndexError as e:
+            raise Abort(ReturnCode.TRAP, f"trap: {e}") from None
+
+    def imports(self, module: Module, debug: bool = False, count: bool = False) -> list:
+        """The host functions, the memory and the stack pointer, in the order
+        of the imports of `module`. With `debug`, every call is logged. With
+        `count`, the calls are counted in `calls`."""
+        store = self.store
+        i32 = ValType.i32()
+        self.memory = Memory(store, MemoryType(Limits(1, None)))
+        self.view = MemoryView(store, self.memory)
+        functions = {
+            "OpenInput": (FuncType([], []), self.open_input),
+            "ReadInt": (FuncType([i32], []), self.read_int),
+            "Eot": (FuncType([], [i32]), self.eot),
+            "WriteChar": (FuncType([i32], []), self.write_char),
+            "WriteInt": (FuncType([i32, i32], []), self.write_int),
+            "WriteLn": (FuncType([], []), self.write_ln),
+            "ReadInts": (FuncType([i32, i32], [i32]), self.read_ints),
+            "WriteBuffer": (FuncType([i32, i32], []), self.write_buffer),
+        }
+        functions = {
+            name: (t, _recorded(f, self)) for name, (t, f) in functions.items()
+        }
+        if count:
+            self.calls = Counter()
+            functions = {
+                name: (t, _counted(name, f, self.calls))
+                for name, (t, f) in functions.items()
+            }
+        externs = {
+            name: Func(store, t, _traced(name, f) if debug else f)
+            for name, (t, f) in functions.items()
+        }
+        externs["memory"] = self.memory
+        self.sp = Global(
+            store, GlobalType(i32, mutable=True), Val.i32(INITIAL_STACK_POINTER)
+        )
+        externs["sp"] = self.sp
+        names = [i.name for i in module.imports]
+        if all(name in externs for name in names):
+            return [externs[name] for name in names]
+        return [externs[name] for name in IMPORTS]
+
+
+class Snapshot:
+    """Content of the memories and values of the mutable globals of an
+    instance."""
+
+    def __init__(self, store: Store, memories: list[Memory], globals: list[Global]):
+        self.memories = [(m, m.size(store), bytes(m.read(store))) for m in memories]
+        self.globals = [(g, g.value(store)) for g in globals]
+
+    def restore(self, store: Store) -> bool:
+        """Copy the snapshot back into the instance. Return False, without
+        changing anything, if a memory has grown since the snapshot: memories
+        cannot shrink."""
+        if any(m.size(store) != size for m, size, _ in self.memories):
+            return False
+        for m, _, data in self.memories:
+            ctypes.memmove(m.data_ptr(store), data, len(data))
+        for g, value in self.globals:
+            g.set_value(store, value)
+        return True
+
+
+def _trap_code(e: Trap) -> TrapCode | None:
+    try:
+        return e.trap_code
+    except ValueError:  # Not known by the bindings, such as out of fuel
+        return None
+
+
+class Session:
+    """An instance of `module` that runs commands one after the other, each
+    from the state that follows the instantiation.
+
+    The state that is restored is the memory and the stack pointer shared
+    with the host, and the exported memories and mutable globals. Mutable
+    globals that a module does not export are not restored (the Oberon0
+    compiler does not generate any). `input` and `output` are used by the
+    start function of the module, if any.
+
+    The engine must be configured for `limits` (see `RunLimits.engine_options`).
+    Each command, and the instantiation, gets the whole budget of `limits`.
+    With `limits.metrics`, the metrics of the last command are in
+    `metrics`."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        engine: Engine,
+        module: Module,
+        input: InputSource | None = None,
+        output: OutputWriter | None = None,
+        debug: bool = False,
+        limits: RunLimits | None = None,
+    ):
+        self.engine = engine
+        self.module = module
+        self.debug = debug
+        self.limits = RunLimits() if limits is None else limits
+        self.metrics: Metrics | None = None
+        self.instantiations = 0
+        if self.limits.timeout is not None:
+            start_ticker(engine)
+        self._instantiate(
+            ListSource([]) if input is None else input,
+            (
+                OutputWriter(io.BytesIO(), line_buffered=False)
+                if output is None
+                else output
+            ),
+        )
+
+    def _instantiate(self, input: InputSource, output: OutputWriter) -> None:
+        self.store = Store(self.engine)
+        self.context = Context(store=self.store, input=input, output=output)
+        imports = self.context.imports(self.module, self.debug, self.limits.metrics)
+        self._dirty = False
+        self.instantiations += 1
+        self._arm()
+        try:
+            self.instance = Instance(self.store, self.module, imports)
+        except Exception as e:
+            raise self._error(e) from None
+        finally:
+            output.flush()
+        exports = self.instance.exports(self.store).values()
+        memories = [self.context.memory]
+        memories += [e for e in exports if isinstance(e, Memory)]
+        globals = [self.context.sp]
+        globals += [
+            e for e in exports if isinstance(e, Global) and e.type(self.store).mutable
+        ]
+        self.snapshot = Snapshot(self.store, memories, globals)
+
+    def _arm(self) -> None:
+        """Give the store the budget of the limits."""
+        if self.limits.metered:
+            self.store.set_fuel(
+                UNLIMITED_FUEL if self.limits.fuel is None else self.limits.fuel
+            )
+        if self.limits.timeout is not None:
+            self.store.set_epoch_deadline(self.limits.deadline())
+
+    def _error(self, e: Exception) -> Exception:
+        """The error of the program, which raised `e` while it ran. The error
+        of a host function is the one kept by the context, and `e` is then
+        not always that error. Any other exception than a `Trap` or a
+        `WasmtimeError` comes from a host function of another program: the
+        trap of this one is lost."""
+        if self.context.error is not None:
+            return self.context.error
+        if isinstance(e, WasmtimeError):  # Such as imports that do not match
+            return e
+        if self.limits.fuel is not None and self.store.get_fuel() == 0:
+            return Abort(ReturnCode.FUEL_EXHAUSTED, "fuel exhausted")
+        if not isinstance(e, Trap):
+            return Abort(ReturnCode.TRAP, "trap")
+        code = _trap_code(e)
+        if code == TrapCode.INTERRUPT and self.limits.timeout is not None:
+            return Abort(ReturnCode.TIMEOUT, f"timeout after {self.limits.timeout}s")
+        reason = code.name.lower() if code else e.message.splitlines()[0]
+        return Abort(ReturnCode.TRAP, f"trap: {reason}")
+
+    def _measure(self, wall_time: float, cpu_time: float) -> Metrics:
+        store = self.store
+        metrics = Metrics(
+            wall_time=wall_time,
+            cpu_time=cpu_time,
+            memory_pages=sum(m.size(store) for m, _, _ in self.snapshot.memories),
+            host_calls=dict(self.context.calls or {}),
+        )
+        if self.limits.metered:
+            budget = UNLIMITED_FUEL if self.limits.fuel is None else self.limits.fuel
+            metrics.fuel = budget - store.get_fuel()
+        return metrics
+
+    def call(self, command: str, input: InputSource, output: OutputWriter) -> None:
+        """Run the exported procedure `command`. Raise `Abort` if the program
+        does not complete. The output is flushed in any case."""
+        self.metrics = None  # Until the command starts
+        if self._dirty and not self.snapshot.restore(self.store):
+            self._instantiate(input, output)
+        else:
+            self._arm()
+        self.context.input = input
+        self.context.output = output
+        self.context.error = None
+        if self.context.calls is not None:
+            self.context.calls.clear()
+        self._dirty = True
+        wall_time = time.perf_counter()
+        cpu_time = time.thread_time()
+        try:
+            cmd = self.instance.exports(self.store).get(command)
+            if not isinstance(cmd, Func):
+                raise Abort(
+                    ReturnCode.COMMAND_NOT_FOUND, f"command '{command}' not found"
+                )
+            try:
+                cmd(self.store)
+            except Exception as e:
+                raise self._error(e) from None
+        finally:
+            output.flush()
+            if self.limits.metrics:
+                self.metrics = self._measure(
+                    time.perf_counter() - wall_time, time.thread_time() - cpu_time
+                )
+
+
+def run(  # noqa: PLR0913
+    engine: Engine,
+    module: Module,
+    command: str,
+    input: InputSource,
+    output: OutputWriter,
+    debug: bool = False,
+    limits: RunLimits | None = None,
+) -> Metrics | None:
+    """Run the exported procedure `command` in a new store. Raise `Abort` if
+    the program does not complete. The output is flushed in any case. Return
+    the metrics of the run if `limits.metrics`."""
+    session = Session(engine, module, input, output, debug, limits)
+    session.call(command, input, output)
+    return session.metrics
@@ -0,0 +1,145 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Input sources for `ReadInt`
+
+A source hands out integers one at a time. It reads its input lazily, one
+chunk at a time, into a deque, so a read is O(1) and a run never holds more
+than a chunk of a large input in memory. `at_end` only needs to know whether
+the next chunk is empty.
+"""
+
+import io
+import mmap
+import sys
+from array import array
+from collections import deque
+from collections.abc import Iterable
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 16  # Characters or integers per chunk
+INT32_SIZE = 4
+_INT32 = "i" if array("i").itemsize == INT32_SIZE else "l"  # array type code
+
+
+class InputSource:
+    def __init__(self):
+        self._buffer: deque[int] = deque()
+
+    def _fill(self) -> bool:
+        """Load the next chunk into the buffer; False at the end of the input."""
+        return False
+
+    def read(self) -> int:
+        """Return the next integer. Raise EOFError at the end of the input and
+        ValueError if the input is not an integer."""
+        if not self._buffer and not self._fill():
+            raise EOFError("no more input")
+        return self._buffer.popleft()
+
+    def read_many(self, count: int) -> list[int]:
+        """Return the next `count` integers, or fewer at the end of the input.
+        Raise ValueError if the input is not an integer."""
+        values: list[int] = []
+        buffer = self._buffer
+        while len(values) < count and (buffer or self._fill()):
+            n = count - len(values)
+            if n >= len(buffer):
+                values.extend(buffer)
+                buffer.clear()
+            else:
+                values.extend(buffer.popleft() for _ in range(n))
+        return values
+
+    def at_end(self) -> bool:
+        return not self._buffer and not self._fill()
+
+    def close(self) -> None:
+        pass
+
+
+class ListSource(InputSource):
+    """Integers given on the command line."""
+
+    def __init__(self, numbers: Iterable[int]):
+        super().__init__()
+        self._buffer.extend(numbers)
+
+
+class TextSource(InputSource):
+    """Integers separated by white space in a text stream."""
+
+    def __init__(self, stream: io.TextIOBase, chunk_size: int = CHUNK_SIZE):
+        super().__init__()
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._partial = ""  # Digits cut by the end of the previous chunk
+
+    def _fill(self) -> bool:
+        while not self._buffer:
+            if self._stream is None:
+                return False
+            chunk = self._stream.read(self._chunk_size)
+            if not chunk:
+                words = self._partial.split()
+                self._partial = ""
+                self._stream = None
+            else:
+                words = (self._partial + chunk).split()
+                # The last word may continue in the next chunk
+                if words and not chunk[-1].isspace():
+                    self._partial = words.pop()
+                else:
+                    self._partial = ""
+            self._buffer.extend(map(int, words))
+        return True
+
+    @classmethod
+    def open(cls, path: Path | str) -> "TextSource":
+        """Read `path`, or the standard input for "-"."""
+        if str(path) == "-":
+            return cls(sys.stdin)
+        return cls(open(path))
+
+    def close(self) -> None:
+        if self._stream is not None and self._stream is not sys.stdin:
+            self._stream.close()
+        self._stream = None
+
+
+class BinarySource(InputSource):
+    """Little-endian 32-bit signed integers in a memory-mapped file."""
+
+    def __init__(self, path: Path | str, chunk_size: int = CHUNK_SIZE):
+        super().__init__()
+        self._chunk_bytes = chunk_size * INT32_SIZE
+        self._offset = 0
+        with open(path, "rb") as f:
+            size = f.seek(0, io.SEEK_END)
+            if size % INT32_SIZE:
+                raise ValueError(f"{path}: size is not a multiple of {INT32_SIZE}")
+            # A zero-length file cannot be mapped
+            self._map = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+            )
+        self._size = size
+
+    def _fill(self) -> bool:
+        if self._offset >= self._size:
+            return False
+        end = min(self._offset + self._chunk_bytes, self._size)
+        chunk = array(_INT32)
+        chunk.frombytes(self._map[self._offset : end])
+        if sys.byteorder == "big":
+            chunk.byteswap()
+        self._buffer.extend(chunk)
+        self._offset = end
+        return True
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._size = self._offset = 0
@@ -0,0 +1,85 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Execution limits and metrics of a run
+
+A fuel budget bounds the number of WASM instructions of a run (the compiled
+code consumes about one unit of fuel per instruction) and a timeout bounds its
+wall time. Timeouts use epoch interruption: a daemon thread increments the
+epoch of the engine every `TICK` seconds and a store traps when the epoch
+passes its deadline. Both need an engine configured for them, see
+`RunLimits.engine_options`.
+"""
+
+import dataclasses
+import json
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+
+from wasmtime import Engine
+
+from oberon0_runtime.cache import EngineOptions
+
+TICK = 0.01  # Seconds between two epochs
+UNLIMITED_FUEL = 2**64 - 1
+
+
+@dataclass(frozen=True)
+class RunLimits:
+    fuel: int | None = None  # Units of fuel
+    timeout: float | None = None  # Seconds
+    metrics: bool = False  # Measure the runs
+
+    @property
+    def metered(self) -> bool:
+        return self.fuel is not None or self.metrics
+
+    def engine_options(self, options: EngineOptions) -> EngineOptions:
+        """`options` with what the engine needs to enforce these limits."""
+        return dataclasses.replace(
+            options,
+            consume_fuel=self.metered,
+            epoch_interruption=self.timeout is not None,
+        )
+
+    def deadline(self) -> int:
+        """Epochs until the timeout. The epoch may be incremented right after
+        the deadline is set, hence the extra one."""
+        return int(self.timeout / TICK) + 1
+
+
+@dataclass
+class Metrics:
+    fuel: int | None = None  # Consumed, if metered; not updated on a timeout
+    wall_time: float = 0.0  # Seconds
+    cpu_time: float = 0.0  # Seconds, in the thread of the run
+    memory_pages: int = 0  # At the end of the run, memories do not shrink
+    host_calls: dict[str, int] = field(default_factory=dict)
+
+    def to_json(self) -> str:
+        return json.dumps(dataclasses.asdict(self))
+
+
+_ticking: weakref.WeakSet[Engine] = weakref.WeakSet()
+_ticking_lock = threading.Lock()
+
+
+def _tick(ref: weakref.ref) -> None:
+    while (engine := ref()) is not None:
+        engine.increment_epoch()
+        del engine
+        time.sleep(TICK)
+
+
+def start_ticker(engine: Engine) -> None:
+    """Increment the epoch of `engine` every `TICK` seconds, until the engine
+    is collected. Calling it again for the same engine does nothing."""
+    with _ticking_lock:
+        if engine in _ticking:
+            return
+        _ticking.add(engine)
+    threading.Thread(target=_tick, args=(weakref.ref(engine),), daemon=True).start()
@@ -0,0 +1,90 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Zero-copy access to the linear memory of an instance
+
+`MemoryView` keeps a `memoryview` over the buffer at `Memory.data_ptr`, so that
+host functions read and write 32-bit integers, one or many at once, without
+going through `Memory.read` and `Memory.write` and without a `bytes` object per
+value. The view is made again when the memory grows.
+"""
+
+import ctypes
+import struct
+import sys
+from array import array
+from collections.abc import Iterable
+
+from wasmtime import Memory, Store
+
+INT32_SIZE = 4
+_INT32 = "i" if array("i").itemsize == INT32_SIZE else "l"  # array type code
+_INT32_LE = struct.Struct("<i")
+
+
+class MemoryView:
+    def __init__(self, store: Store, memory: Memory):
+        self.store = store
+        self.memory = memory
+        self._size = -1
+        self._view = memoryview(b"")
+
+    @property
+    def bytes(self) -> memoryview:
+        """The memory as bytes. Only valid until the memory grows."""
+        size = self.memory.data_len(self.store)
+        if size != self._size:
+            address = ctypes.addressof(self.memory.data_ptr(self.store).contents)
+            buffer = (ctypes.c_ubyte * size).from_address(address)
+            self._view = memoryview(buffer).cast("B")
+            self._size = size
+        return self._view
+
+    def _checked(self, address: int, count: int) -> memoryview:
+        view = self.bytes
+        if address < 0 or address + count * INT32_SIZE > len(view):
+            raise IndexError(f"out of bounds memory access at {address}")
+        return view
+
+    def check_ints(self, address: int, count: int) -> None:
+        """Raise `IndexError` unless `count` integers at `address` are in the
+        memory."""
+        if count < 0:
+            raise IndexError(f"out of bounds memory access at {address}")
+        self._checked(address, count)
+
+    def _slice(self, address: int, count: int) -> memoryview:
+        return self._checked(address, count)[address : address + count * INT32_SIZE]
+
+    def read_bytes(self, address: int, length: int) -> memoryview:
+        """A view of `length` bytes, valid until the memory grows."""
+        view = self.bytes
+        if address < 0 or length < 0 or address + length > len(view):
+            raise IndexError(f"out of bounds memory access at {address}")
+        return view[address : address + length]
+
+    def read_ints(self, address: int, count: int) -> array:
+        values = array(_INT32)
+        values.frombytes(self._slice(address, count))
+        if sys.byteorder == "big":  # WASM memory is little-endian
+            values.byteswap()
+        return values
+
+    def write_ints(self, address: int, values: Iterable[int]) -> None:
+        """Raise `OverflowError` if a value does not fit in 32 bits."""
+        values = array(_INT32, values)
+        if sys.byteorder == "big":
+            values.byteswap()
+        self._slice(address, len(values))[:] = memoryview(values).cast("B")
+
+    def read_int(self, address: int) -> int:
+        return _INT32_LE.unpack_from(self._checked(address, 1), address)[0]
+
+    def write_int(self, address: int, value: int) -> None:
+        view = self._checked(address, 1)
+        try:
+            _INT32_LE.pack_into(view, address, value)
+        except struct.error as e:
+            raise OverflowError(e) from None
@@ -0,0 +1,36 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Command line options of the runs, shared by `oberon0-rt` and
+`oberon0-compiler run`
+"""
+
+from enum import Enum
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from oberon0_runtime.cache import OptLevel
+
+
+class InputFormat(str, Enum):
+    TEXT = "text"
+    BINARY = "binary"
+
+
+CacheDir = Annotated[
+    Path | None, typer.Option(help="Directory of the compiled module cache")
+]
+Cache = Annotated[bool, typer.Option(help="Cache compiled modules")]
+Opt = Annotated[OptLevel, typer.Option(help="Cranelift optimization level")]
+ParallelCompile = Annotated[bool, typer.Option(help="Compile functions in parallel")]
+Fuel = Annotated[
+    int | None, typer.Option(help="Fuel budget of a run (about one per instruction)")
+]
+Timeout = Annotated[float | None, typer.Option(help="Timeout of a run [s]")]
+Metrics = Annotated[
+    bool, typer.Option(help="Measure fuel, time, memory and host calls of the runs")
+]
@@ -0,0 +1,69 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+"""
+Buffered output for `WriteChar`, `WriteInt`, `WriteLn` and `WriteBuffer`
+
+The host functions format directly into a `bytearray` that is written to the
+binary standard output when it reaches a threshold, at the end of each line if
+the output is a terminal (so that interactive programs show their output
+immediately), and when the program ends.
+"""
+
+import sys
+from typing import BinaryIO
+
+BUFFER_SIZE = 1 << 16
+NEW_LINE = ord("\n")
+
+
+class OutputWriter:
+    def __init__(
+        self,
+        stream: BinaryIO | None = None,
+        buffer_size: int = BUFFER_SIZE,
+        line_buffered: bool | None = None,
+    ):
+        self.stream = sys.stdout.buffer if stream is None else stream
+        self.buffer_size = buffer_size
+        if line_buffered is None:
+            line_buffered = self.stream.isatty()
+        self.line_buffered = line_buffered
+        self._buffer = bytearray()
+
+    def write_char(self, c: int) -> None:
+        """Write the character whose code point is `c`. Raises `ValueError` if
+        `c` is not the code point of a character."""
+        if 0 <= c < 0x80:  # noqa: PLR2004
+            self._buffer.append(c)
+        else:
+            try:
+                self._buffer += chr(c).encode()
+            except ValueError:  # Out of range, or a surrogate
+                raise ValueError(f"invalid character code {c}") from None
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_int(self, i: int, width: int) -> None:
+        self._buffer += b"%*d" % (width, i)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_ln(self) -> None:
+        self._buffer.append(NEW_LINE)
+        if self.line_buffered or len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_bytes(self, data: bytes | memoryview) -> None:
+        self._buffer += data
+        if len(self._buffer) >= self.buffer_size or (
+            self.line_buffered and NEW_LINE in data
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self.stream.write(self._buffer)
+            self._buffer.clear()
+        self.stream.flush()
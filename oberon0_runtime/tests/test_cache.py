@@ -0,0 +1,83 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import os
+
+from wasmtime import Instance, Module, Store, wat2wasm
+
+from oberon0_runtime.cache import EngineOptions, ModuleCache, OptLevel
+
+PROGRAM = wat2wasm('(module (func (export "answer") (result i32) i32.const 42))')
+
+
+def compile_counter():
+    calls = []
+
+    def compile(engine, wasm):
+        calls.append(wasm)
+        return Module(engine, wasm)
+
+    return compile, calls
+
+
+def answer(engine, module) -> int:
+    store = Store(engine)
+    return Instance(store, module, []).exports(store)["answer"](store)
+
+
+def test_hit_and_miss(tmp_path):
+    options = EngineOptions()
+    engine = options.engine()
+    cache = ModuleCache(tmp_path)
+    compile, calls = compile_counter()
+    for _ in range(2):
+        module = cache.get_or_compile(engine, PROGRAM, options, compile)
+        assert answer(engine, module) == 42  # noqa: PLR2004
+    assert len(calls) == 1
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # The optimization level is part of the key
+    other = EngineOptions(opt_level=OptLevel.NONE)
+    cache.get_or_compile(other.engine(), PROGRAM, other, compile)
+    assert len(calls) == 2  # noqa: PLR2004
+
+
+def test_corrupt_entry(tmp_path):
+    options = EngineOptions()
+    engine = options.engine()
+    cache = ModuleCache(tmp_path)
+    cache.path(cache.key(PROGRAM, options)).write_bytes(b"garbage")
+    compile, calls = compile_counter()
+    module = cache.get_or_compile(engine, PROGRAM, options, compile)
+    assert answer(engine, module) == 42  # noqa: PLR2004
+    assert len(calls) == 1
+    assert cache.load(engine, cache.key(PROGRAM, options)) is not None
+
+
+def test_eviction(tmp_path):
+    cache = ModuleCache(tmp_path, max_size=25)
+    for i, name in enumerate("abc"):
+        path = cache.path(name)
+        path.write_bytes(b"x" * 10)
+        os.utime(path, (i, i))
+    os.utime(cache.path("a"), (10, 10))  # Recently used
+    cache.evict()
+    assert sorted(p.stem for p in tmp_path.iterdir()) == ["a", "c"]
+
+
+def test_private_directory(tmp_path):
+    options = EngineOptions()
+    engine = options.engine()
+    cache = ModuleCache(tmp_path / "cache")
+    compile, calls = compile_counter()
+    cache.get_or_compile(engine, PROGRAM, options, compile)
+    assert (cache.directory.stat().st_mode & 0o777) == 0o700  # noqa: PLR2004
+
+    # Entries that others could have written are neither loaded nor saved
+    cache.directory.chmod(0o777)
+    assert cache.load(engine, cache.key(PROGRAM, options)) is None
+    cache.get_or_compile(engine, PROGRAM, options, compile)
+    assert len(calls) == 2  # noqa: PLR2004
+    cache.directory.chmod(0o700)
+    assert cache.load(engine, cache.key(PROGRAM, options)) is not None
@@ -0,0 +1,72 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import io
+
+import pytest
+from wasmtime import Engine, Module
+
+from oberon0_runtime.context import Abort, ReturnCode, run
+from oberon0_runtime.input import ListSource
+from oberon0_runtime.output import OutputWriter
+
+# Reads the input in blocks of 3 integers and writes their sum, after a label
+PROGRAM = """
+(module
+  (import "env" "ReadInts" (func $read (param i32 i32) (result i32)))
+  (import "env" "WriteInt" (func $wi (param i32 i32)))
+  (import "env" "WriteBuffer" (func $wb (param i32 i32)))
+  (import "env" "WriteLn" (func $wl))
+  (import "env" "memory" (memory 1))
+  (data (i32.const 100) "sum:")
+  (func (export "Sum") (local $n i32) (local $s i32) (local $i i32)
+    (loop $block
+      (local.set $n (call $read (i32.const 0) (i32.const 3)))
+      (local.set $i (i32.const 0))
+      (block $done
+        (loop $l
+          (br_if $done (i32.ge_s (local.get $i) (local.get $n)))
+          (local.set $s (i32.add (local.get $s)
+            (i32.load (i32.shl (local.get $i) (i32.const 2)))))
+          (local.set $i (i32.add (local.get $i) (i32.const 1)))
+          (br $l)))
+      (br_if $block (i32.eq (local.get $n) (i32.const 3))))
+    (call $wb (i32.const 100) (i32.const 4))
+    (call $wi (local.get $s) (i32.const 4))
+    (call $wl))
+  (func (export "Overflow")
+    (call $wb (i32.const 65534) (i32.const 4)))
+  (func (export "ReadOverflow")
+    (drop (call $read (i32.const 65532) (i32.const 2)))))
+"""
+
+
+def execute(command: str, numbers: list[int]) -> str:
+    engine = Engine()
+    stream = io.BytesIO()
+    output = OutputWriter(stream, line_buffered=False)
+    run(engine, Module(engine, PROGRAM), command, ListSource(numbers), output)
+    return stream.getvalue().decode()
+
+
+def test_bulk_io():
+    assert execute("Sum", list(range(10))) == "sum:  45\n"
+    assert execute("Sum", list(range(3))) == "sum:   3\n"
+    assert execute("Sum", []) == "sum:   0\n"
+
+
+def test_out_of_bounds():
+    with pytest.raises(Abort) as e:
+        execute("Overflow", [])
+    assert e.value.code == ReturnCode.TRAP
+
+
+def test_read_out_of_bounds():
+    engine = Engine()
+    source = ListSource([1, 2, 3])
+    output = OutputWriter(io.BytesIO(), line_buffered=False)
+    with pytest.raises(Abort) as e:
+        run(engine, Module(engine, PROGRAM), "ReadOverflow", source, output)
+    assert e.value.code == ReturnCode.TRAP
+    assert source.read_many(3) == [1, 2, 3]  # Nothing was consumed
@@ -0,0 +1,65 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import io
+from array import array
+
+import pytest
+
+from oberon0_runtime.input import BinarySource, ListSource, TextSource
+
+
+def read_all(source) -> list[int]:
+    res = []
+    while not source.at_end():
+        res.append(source.read())
+    with pytest.raises(EOFError):
+        source.read()
+    return res
+
+
+def test_list():
+    assert read_all(ListSource([1, -2, 3])) == [1, -2, 3]
+
+
+def test_text_chunks():
+    numbers = list(range(-50, 1000, 7))
+    text = " ".join(map(str, numbers)) + "\n"
+    # Small chunks cut numbers in two
+    assert read_all(TextSource(io.StringIO(text), chunk_size=5)) == numbers
+    assert read_all(TextSource(io.StringIO("1\n\n 2"), chunk_size=1)) == [1, 2]
+    assert read_all(TextSource(io.StringIO("  \n"))) == []
+
+
+def test_text_invalid():
+    source = TextSource(io.StringIO("1 x"))
+    assert source.read() == 1
+    with pytest.raises(ValueError):
+        source.read()
+
+
+def test_binary(tmp_path):
+    numbers = [0, 1, -1, 2**31 - 1, -(2**31)] * 1000
+    path = tmp_path / "input.bin"
+    data = array("i", numbers)
+    path.write_bytes(data.tobytes())
+    source = BinarySource(path, chunk_size=64)
+    assert read_all(source) == numbers
+    source.close()
+
+    (tmp_path / "empty.bin").write_bytes(b"")
+    assert read_all(BinarySource(tmp_path / "empty.bin")) == []
+
+    (tmp_path / "odd.bin").write_bytes(b"123")
+    with pytest.raises(ValueError):
+        BinarySource(tmp_path / "odd.bin")
+
+
+def test_read_many():
+    source = TextSource(io.StringIO(" ".join(map(str, range(10)))), chunk_size=4)
+    assert source.read_many(3) == [0, 1, 2]
+    assert source.read() == 3  # noqa: PLR2004
+    assert source.read_many(0) == []
+    assert source.read_many(100) == list(range(4, 10))
+    assert source.read_many(1) == []
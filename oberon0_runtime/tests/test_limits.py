@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import io
+
+import pytest
+from wasmtime import Module
+
+from oberon0_runtime.cache import EngineOptions
+from oberon0_runtime.context import Abort, ReturnCode, run
+from oberon0_runtime.input import ListSource
+from oberon0_runtime.limits import RunLimits
+from oberon0_runtime.output import OutputWriter
+
+PROGRAM = """
+(module
+  (import "env" "WriteInt" (func $wi (param i32 i32)))
+  (import "env" "WriteLn" (func $wl))
+  (import "env" "memory" (memory 1))
+  (func (export "Loop") (loop $l (br $l)))
+  (func (export "Count") (local $i i32)
+    (loop $l
+      (call $wi (local.get $i) (i32.const 0))
+      (call $wl)
+      (local.set $i (i32.add (local.get $i) (i32.const 1)))
+      (br_if $l (i32.lt_s (local.get $i) (i32.const 3))))))
+"""
+
+
+def execute(command: str, limits: RunLimits):
+    engine = limits.engine_options(EngineOptions()).engine()
+    output = OutputWriter(io.BytesIO(), line_buffered=False)
+    module = Module(engine, PROGRAM)
+    return run(engine, module, command, ListSource([]), output, limits=limits)
+
+
+def test_metrics():
+    metrics = execute("Count", RunLimits(metrics=True))
+    assert metrics.fuel > 0
+    assert metrics.memory_pages == 1
+    assert metrics.host_calls == {"WriteInt": 3, "WriteLn": 3}
+    assert execute("Count", RunLimits()) is None
+
+
+@pytest.mark.parametrize(
+    ("limits", "code"),
+    [
+        (RunLimits(fuel=10000), ReturnCode.FUEL_EXHAUSTED),
+        (RunLimits(timeout=0.05), ReturnCode.TIMEOUT),
+    ],
+)
+def test_limits(limits, code):
+    with pytest.raises(Abort) as e:
+        execute("Loop", limits)
+    assert e.value.code == code
+    execute("Count", limits)
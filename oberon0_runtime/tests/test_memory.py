@@ -0,0 +1,29 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import pytest
+from wasmtime import Limits, Memory, MemoryType, Store
+
+from oberon0_runtime.memory import MemoryView
+
+PAGE_SIZE = 1 << 16
+
+
+def test_memory_view():
+    store = Store()
+    memory = Memory(store, MemoryType(Limits(1, None)))
+    view = MemoryView(store, memory)
+    view.write_ints(6, [1, -2, 0x7FFFFFFF])
+    assert memory.read(store, 6, 10) == b"\x01\x00\x00\x00"
+    assert list(view.read_ints(6, 3)) == [1, -2, 0x7FFFFFFF]
+    memory.write(store, b"\xff\xff\xff\xff", 0)
+    assert view.read_int(0) == -1
+    with pytest.raises(OverflowError):
+        view.write_int(0, 1 << 31)
+    with pytest.raises(IndexError):
+        view.write_int(PAGE_SIZE - 2, 0)
+    # The view follows the memory when it grows
+    memory.grow(store, 1)
+    view.write_int(PAGE_SIZE - 2, 42)
+    assert view.read_int(PAGE_SIZE - 2) == 42  # noqa: PLR2004
@@ -0,0 +1,57 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import io
+
+import pytest
+
+from oberon0_runtime.output import OutputWriter
+
+
+def test_format():
+    stream = io.BytesIO()
+    writer = OutputWriter(stream, line_buffered=False)
+    writer.write_char(ord("a"))
+    writer.write_char(ord("é"))
+    writer.write_int(-42, 5)
+    writer.write_int(7, 0)
+    writer.write_ln()
+    assert stream.getvalue() == b""
+    writer.flush()
+    assert stream.getvalue().decode() == "aé  -427\n"
+
+
+def test_flush():
+    stream = io.BytesIO()
+    writer = OutputWriter(stream, buffer_size=4, line_buffered=False)
+    writer.write_int(123, 0)
+    assert stream.getvalue() == b""
+    writer.write_char(ord("x"))
+    assert stream.getvalue() == b"123x"
+
+    stream = io.BytesIO()
+    writer = OutputWriter(stream, line_buffered=True)
+    writer.write_int(1, 0)
+    writer.write_ln()
+    assert stream.getvalue() == b"1\n"
+
+
+def test_write_bytes():
+    stream = io.BytesIO()
+    writer = OutputWriter(stream, line_buffered=True)
+    writer.write_bytes(b"ab")
+    assert stream.getvalue() == b""
+    writer.write_bytes(memoryview(b"c\nd"))
+    assert stream.getvalue() == b"abc\nd"
+
+
+@pytest.mark.parametrize("c", [-1, 0xD800, 0x110000])
+def test_invalid_char(c):
+    stream = io.BytesIO()
+    writer = OutputWriter(stream, line_buffered=False)
+    writer.write_char(ord("a"))
+    with pytest.raises(ValueError, match="invalid character code"):
+        writer.write_char(c)
+    writer.flush()
+    assert stream.getvalue() == b"a"
@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import json
+
+import pytest
+from wasmtime import Module
+
+from oberon0_runtime.batch import run_batch
+from oberon0_runtime.cache import EngineOptions
+from oberon0_runtime.context import ReturnCode
+
+# Sum of the input; traps on a negative number
+PROGRAM = """
+(module
+  (import "env" "ReadInt" (func $read (param i32)))
+  (import "env" "Eot" (func $eot (result i32)))
+  (import "env" "WriteInt" (func $wi (param i32 i32)))
+  (import "env" "WriteLn" (func $wl))
+  (import "env" "memory" (memory 1))
+  (func (export "Sum") (local $s i32)
+    (block $done
+      (loop $l
+        (br_if $done (call $eot))
+        (call $read (i32.const 0))
+        (if (i32.lt_s (i32.load (i32.const 0)) (i32.const 0)) (then unreachable))
+        (local.set $s (i32.add (local.get $s) (i32.load (i32.const 0))))
+        (br $l)))
+    (call $wi (local.get $s) (i32.const 0))
+    (call $wl)))
+"""
+
+
+@pytest.mark.parametrize("jobs", [1, 3])
+def test_batch(jobs):
+    options = EngineOptions()
+    engine = options.engine()
+    module = Module(engine, PROGRAM)
+    lines = [json.dumps({"command": "Sum", "input": list(range(i))}) for i in range(20)]
+    lines += [
+        "",
+        '{"command": "Product"}',
+        '{"command": "Sum", "input": [1, -1]}',
+        "[1, 2]",
+    ]
+    results = list(run_batch(engine, module, options, lines, jobs))
+    assert [r.stdout for r in results[:20]] == [
+        f"{i * (i - 1) // 2}\n" for i in range(20)
+    ]
+    assert [(r.index, r.code) for r in results[20:]] == [
+        (21, ReturnCode.COMMAND_NOT_FOUND.value),
+        (22, ReturnCode.TRAP.value),
+        (23, ReturnCode.INVALID_INPUT.value),
+    ]
+    assert results[21].error == "trap: unreachable"
+
+
+def test_errors_stay_in_their_case():
+    options = EngineOptions()
+    engine = options.engine()
+    trap = Module(
+        engine,
+        """(module
+          (import "env" "WriteChar" (func $wc (param i32)))
+          (func (export "Run") (call $wc (i32.const -1))))""",
+    )
+    lines = ['{"command": "Run"}', '{"command": "Run"}', '{"command": "Nope"}']
+    results = list(run_batch(engine, trap, options, lines, jobs=1))
+    assert [r.code for r in results] == [
+        ReturnCode.TRAP.value,
+        ReturnCode.TRAP.value,
+        ReturnCode.COMMAND_NOT_FOUND.value,
+    ]
+
+    # The imports do not match: the module cannot be instantiated
+    mismatch = Module(
+        engine,
+        """(module
+          (import "env" "WriteLn" (func $wl (param i32)))
+          (func (export "Run")))""",
+    )
+    for jobs in (1, 2):
+        results = list(run_batch(engine, mismatch, options, lines, jobs))
+        assert [r.code for r in results] == [ReturnCode.INTERNAL_ERROR.value] * 3
+        assert results[0].error.startswith("internal error: ")
+
+
+def test_concurrent_errors():
+    # wasmtime passes the exceptions of the host functions through a global:
+    # the cases that fail at the same time must still get their own error
+    options = EngineOptions()
+    engine = options.engine()
+    module = Module(
+        engine,
+        """(module
+          (import "env" "ReadInt" (func $read (param i32)))
+          (import "env" "WriteChar" (func $wc (param i32)))
+          (import "env" "WriteLn" (func $wl))
+          (import "env" "memory" (memory 1))
+          (func (export "Read") (loop $l (call $read (i32.const 0)) (br $l)))
+          (func (export "Write") (call $wc (i32.const -1)))
+          (func (export "Crash") unreachable)
+          (func (export "Done") (call $wl)))""",
+    )
+    expected = {
+        "Read": ReturnCode.NO_MORE_INPUT,
+        "Write": ReturnCode.TRAP,
+        "Crash": ReturnCode.TRAP,
+        "Done": ReturnCode.SUCCESS,
+    }
+    commands = list(expected) * 500
+    lines = [
+        json.dumps({"command": c, "input": list(range(i % 7))})
+        for i, c in enumerate(commands)
+    ]
+    results = list(run_batch(engine, module, options, lines, jobs=8))
+    assert [r.code for r in results] == [expected[c].value for c in commands]
+    for c, r in zip(commands, results, strict=True):
+        if c == "Read":
+            assert r.error == "no more input"
+        elif c == "Write":
+            assert r.error.startswith("trap: invalid character code")
+        elif c == "Crash":
+            # The reason is lost when the error of another case comes instead
+            assert r.error in ("trap: unreachable", "trap")
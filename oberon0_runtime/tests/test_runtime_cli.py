@@ -0,0 +1,32 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import json
+
+from typer.testing import CliRunner
+from wasmtime import wat2wasm
+
+from oberon0_runtime import app
+
+PROGRAM = wat2wasm(
+    """(module
+      (import "env" "WriteInt" (func $wi (param i32 i32)))
+      (func (export "Answer") (call $wi (i32.const 42) (i32.const 0))))"""
+)
+
+
+def test_default_command(tmp_path):
+    wasm = tmp_path / "a.wasm"
+    wasm.write_bytes(PROGRAM)
+    runner = CliRunner()
+    for args in ([str(wasm), "Answer"], ["main", str(wasm), "Answer"]):
+        result = runner.invoke(app, [*args, "--no-cache"])
+        assert result.exit_code == 0
+        assert result.stdout == "42"
+
+    cases = tmp_path / "cases.jsonl"
+    cases.write_text('{"command": "Answer"}\n')
+    result = runner.invoke(app, ["batch", str(wasm), str(cases), "--no-cache"])
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["stdout"] == "42"
@@ -0,0 +1,76 @@
+# SPDX-FileCopyrightText: 2025 Jacques Supcik <jacques.supcik@hefr.ch>
+#
+# SPDX-License-Identifier: Apache-2.0 OR MIT
+
+import io
+
+import pytest
+from wasmtime import Engine, Module
+
+from oberon0_runtime.cache import EngineOptions
+from oberon0_runtime.context import INITIAL_STACK_POINTER, Abort, ReturnCode, Session
+from oberon0_runtime.input import ListSource
+from oberon0_runtime.limits import RunLimits
+from oberon0_runtime.output import OutputWriter
+
+# Changes the memory, an exported global and the stack pointer
+PROGRAM = """
+(module
+  (import "env" "WriteInt" (func $wi (param i32 i32)))
+  (import "env" "memory" (memory 1))
+  (import "env" "sp" (global $sp (mut i32)))
+  (global $n (export "n") (mut i32) (i32.const 0))
+  (data (i32.const 0) "\\05\\00\\00\\00")
+  (func (export "Bump")
+    (i32.store (i32.const 0) (i32.add (i32.load (i32.const 0)) (i32.const 1)))
+    (global.set $n (i32.add (global.get $n) (i32.const 1)))
+    (global.set $sp (i32.sub (global.get $sp) (i32.const 4)))
+    (call $wi (i32.load (i32.const 0)) (i32.const 0))
+    (call $wi (global.get $n) (i32.const 2))
+    (call $wi (global.get $sp) (i32.const 6)))
+  (func (export "Grow")
+    (drop (memory.grow (i32.const 1)))))
+"""
+
+
+def call(session: Session, command: str) -> str:
+    stream = io.BytesIO()
+    session.call(command, ListSource([]), OutputWriter(stream, line_buffered=False))
+    return stream.getvalue().decode()
+
+
+def test_session():
+    engine = Engine()
+    session = Session(engine, Module(engine, PROGRAM))
+    expected = f"6 1{INITIAL_STACK_POINTER - 4:6d}"
+    assert call(session, "Bump") == expected
+    assert call(session, "Bump") == expected
+    assert session.instantiations == 1
+    # A memory that has grown cannot be restored: the module is instantiated
+    # again
+    call(session, "Grow")
+    assert call(session, "Bump") == expected
+    assert session.instantiations == 2  # noqa: PLR2004
+
+
+def test_failed_instantiation():
+    # The start function reads the input: there is none for the second
+    # instantiation
+    limits = RunLimits(metrics=True)
+    engine = limits.engine_options(EngineOptions()).engine()
+    module = Module(
+        engine,
+        """(module
+          (import "env" "ReadInt" (func $read (param i32)))
+          (import "env" "memory" (memory 1))
+          (func $start (call $read (i32.const 0)))
+          (start $start)
+          (func (export "Grow") (drop (memory.grow (i32.const 1)))))""",
+    )
+    session = Session(engine, module, ListSource([1]), limits=limits)
+    call(session, "Grow")
+    assert session.metrics is not None
+    with pytest.raises(Abort) as e:
+        call(session, "Grow")
+    assert e.value.code == ReturnCode.NO_MORE_INPUT
+    assert session.metrics is None